@@ -0,0 +1,252 @@
+# answer_table.py — vorberechnete Antworttabelle (mmap) für den ganzen Eingaberaum der Clean-Ansicht
+# - Offline-Build: jede Kombination euro_n 0–40 × ind_n 0–40 × exact_tail × Variantentyp
+# - Je Eintrag: Reihen-Code (ungekappt), Länge, Paletten, Tail/Letzte-Reihe-Flags, Wechsel, x-Momentsummen
+#   (daraus Achslast + Grog-Score für beliebige kg in O(1), ohne Layoutlogik)
+# - Binärdatei wird read-only per mmap geöffnet – alle Worker-Prozesse teilen sich den Page-Cache
+# - Fingerprint im Header über TABLE_VERSION + Quelltext der Builder/Kennzahlen (transitiv, nur was der Build
+#   wirklich aufruft): andere Änderungen an planner.py lassen die Tabelle gültig; veraltete werden ignoriert
+#   und in der Diagnose als „veraltet“ gemeldet (table_status)
+#
+# Build:  python answer_table.py build [--out answer_table.bin]
+# Info:   python answer_table.py info  [--path answer_table.bin]
+
+import argparse
+import hashlib
+import inspect
+import json
+import mmap
+import os
+import struct
+import types
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import planner
+from planner import (
+    TRAILER_LEN_CM, encode_rows, decode_rows, layout_metrics,
+    build_euro_exact_tail, layout_for_preset_euro_stable, layout_for_preset_industry,
+    build_euro_by_type, combine_with_industry_pos,
+)
+
+MAX_EURO = 40
+MAX_IND  = 40
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "answer_table.bin")
+
+# Variantentypen wie in DEFAULT_CFG (A–D) + Clean-Ansicht + Auto-Typen mit Default-Parametern
+KINDS: Tuple[Tuple[str, Dict], ...] = (
+    ("clean",           {}),
+    ("all_long",        {"industry_position": "front"}),
+    ("rear_block",      {"approx_block": 15, "industry_position": "front"}),
+    ("mixed_periodic",  {"period": 4, "industry_position": "front"}),
+    ("alt_block",       {"industry_position": "rear"}),
+    ("heavy_auto_rear", {"industry_position": "front"}),
+    ("light_auto_mix",  {"industry_position": "front"}),
+)
+KIND_INDEX = {name: i for i, (name, _) in enumerate(KINDS)}
+
+TABLE_VERSION = 2        # hochzählen, wenn sich die Bedeutung eines Eintrags ändert, ohne dass Builder-Code es zeigt
+# Einstiege in planner, die der Build aufruft – alles, was sie (transitiv) anfassen, geht in den Fingerprint
+_BUILD_ROOTS = ("build_euro_exact_tail", "layout_for_preset_euro_stable", "layout_for_preset_industry",
+                "build_euro_by_type", "combine_with_industry_pos", "encode_rows", "layout_metrics")
+
+_MAGIC   = b"PFAT"
+_VERSION = 2
+_HEADER  = struct.Struct("<4sHBBBI16s")     # magic, version, n_kinds, max_euro, max_ind, n_records, fingerprint
+_RECORD  = struct.Struct("<IBBBBBBHff")   # siehe Entry
+F_VALID, F_TAIL_SINGLE, F_LAST_NOT_FULL = 1, 2, 4
+
+class Entry(NamedTuple):
+    code_off: int
+    code_len: int
+    pallets: int
+    n_euro: int          # Euro-Rechtecke (nach cap_to_trailer)
+    n_ind: int
+    flags: int
+    switches: int        # Längs/Quer-Wechsel
+    used_cm: int
+    sx_euro: float       # Summe der x-Mittelpunkte (cm) aller Euro-Rechtecke
+    sx_ind: float
+
+def _build_deps() -> Dict[str, str]:
+    """planner-Name → Quelltext (Funktionen, Klassen) bzw. repr (Konstanten), transitiv ab _BUILD_ROOTS."""
+    out: Dict[str, str] = {}
+    todo = list(_BUILD_ROOTS)
+    while todo:
+        name = todo.pop()
+        if name in out or not hasattr(planner, name): continue
+        obj = getattr(planner, name)
+        fn = getattr(obj, "__wrapped__", obj)          # lru_cache
+        if isinstance(fn, (types.FunctionType, type)):
+            if fn.__module__ != planner.__name__: continue
+            out[name] = inspect.getsource(fn)
+            codes = ([fn.__code__] if isinstance(fn, types.FunctionType)
+                     else [f.__code__ for f in vars(fn).values() if isinstance(f, types.FunctionType)])
+            while codes:                                # inkl. verschachtelter Funktionen/Lambdas
+                c = codes.pop()
+                todo += c.co_names
+                codes += [k for k in c.co_consts if isinstance(k, types.CodeType)]
+        elif isinstance(obj, (int, float, str, tuple, dict)):
+            out[name] = repr(obj)
+    return out
+
+def fingerprint() -> bytes:
+    """Hash über TABLE_VERSION, KINDS und den Builder-Code – ändert sich die Layoutlogik, passt die Tabelle nicht mehr."""
+    deps = _build_deps()
+    src = "\n".join(f"{k}\n{deps[k]}" for k in sorted(deps))
+    return hashlib.sha256(f"{TABLE_VERSION}\n{KINDS!r}\n{src}".encode()).digest()[:16]
+
+def _index(euro_n: int, ind_n: int, exact_tail: bool, kind: int) -> int:
+    return ((euro_n * (MAX_IND + 1) + ind_n) * 2 + int(bool(exact_tail))) * len(KINDS) + kind
+
+# ------------------ Build ------------------
+def build_rows(euro_n: int, ind_n: int, exact_tail: bool, kind: str) -> List[Dict]:
+    """Genau die Reihen, die App bzw. generate_variants_from_config erzeugen würden."""
+    params = dict(KINDS[KIND_INDEX[kind]][1])
+    if kind == "clean":
+        rows: List[Dict] = []
+        if euro_n > 0:
+            rows += (build_euro_exact_tail(euro_n) if exact_tail else layout_for_preset_euro_stable(euro_n, singles_front=0))
+        if ind_n > 0:
+            rows += layout_for_preset_industry(ind_n)
+        return rows
+    euro_rows = build_euro_by_type(kind, euro_n, exact_tail, params)
+    return combine_with_industry_pos(euro_rows, ind_n, params.get("industry_position", "front"))
+
+def _entry_for(rows: List[Dict], code_off: int) -> Tuple[Entry, bytes]:
+    code = encode_rows(rows)   # ungekappt, wie die App sie erzeugt
+    m = layout_metrics(rows)
+    flags = F_VALID
+    if m.tail_single: flags |= F_TAIL_SINGLE
+    if not m.last_full: flags |= F_LAST_NOT_FULL
+    e = Entry(code_off, len(code), m.pallets, m.n_euro, m.n_ind, flags, m.switches,
+              m.used_cm, m.sx_euro, m.sx_ind)
+    return e, code
+
+def build(path: str = DEFAULT_PATH) -> Dict:
+    """Rechnet den gesamten Eingaberaum und schreibt die Tabelle atomar."""
+    n_records = (MAX_EURO + 1) * (MAX_IND + 1) * 2 * len(KINDS)
+    records = [b""] * n_records
+    blob = bytearray()
+    for euro_n in range(MAX_EURO + 1):
+        for ind_n in range(MAX_IND + 1):
+            for exact_tail in (False, True):
+                for k, (kind, _) in enumerate(KINDS):
+                    e, code = _entry_for(build_rows(euro_n, ind_n, exact_tail, kind), len(blob))
+                    blob += code
+                    records[_index(euro_n, ind_n, exact_tail, k)] = _RECORD.pack(*e)
+    header = _HEADER.pack(_MAGIC, _VERSION, len(KINDS), MAX_EURO, MAX_IND, n_records, fingerprint())
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(header); fh.write(b"".join(records)); fh.write(bytes(blob))
+    os.replace(tmp, path)
+    return {"path": path, "records": n_records,
+            "bytes": _HEADER.size + n_records * _RECORD.size + len(blob)}
+
+# ------------------ Lookup (mmap, read-only) ------------------
+class AnswerTable:
+    def __init__(self, path: str = DEFAULT_PATH):
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < _HEADER.size:
+            self._mm.close()
+            raise ValueError(f"{path}: unbekanntes Tabellenformat")
+        magic, version, n_kinds, max_e, max_i, n_records, fp = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION or (n_kinds, max_e, max_i) != (len(KINDS), MAX_EURO, MAX_IND):
+            raise ValueError(f"{path}: unbekanntes Tabellenformat")
+        self.fingerprint = fp
+        self._rec0 = _HEADER.size
+        self._blob0 = self._rec0 + n_records * _RECORD.size
+
+    @property
+    def is_current(self) -> bool:
+        return self.fingerprint == fingerprint()
+
+    def entry(self, euro_n: int, ind_n: int, exact_tail: bool, kind: str = "clean") -> Optional[Entry]:
+        if not (0 <= euro_n <= MAX_EURO and 0 <= ind_n <= MAX_IND) or kind not in KIND_INDEX:
+            return None
+        e = Entry(*_RECORD.unpack_from(self._mm, self._rec0 + _index(euro_n, ind_n, exact_tail, KIND_INDEX[kind]) * _RECORD.size))
+        return e if e.flags & F_VALID else None
+
+    def row_code(self, e: Entry) -> bytes:
+        start = self._blob0 + e.code_off
+        return self._mm[start:start + e.code_len]
+
+    def rows(self, euro_n: int, ind_n: int, exact_tail: bool, kind: str = "clean") -> Optional[List[Dict]]:
+        e = self.entry(euro_n, ind_n, exact_tail, kind)
+        if e is None: return None
+        return decode_rows(self.row_code(e))
+
+    def close(self):
+        self._mm.close()
+
+def axle_loads(e: Entry, kg_euro: int, kg_ind: int) -> Tuple[float, float, float]:
+    """Wie planner.estimate_axle_loads – aus den gespeicherten Momentsummen."""
+    if kg_euro <= 0 and kg_ind <= 0: return (0.0, 0.0, 0.0)
+    W = max(0, kg_euro) * e.n_euro + max(0, kg_ind) * e.n_ind
+    if W <= 0: return (0.0, 0.0, 0.0)
+    M = max(0, kg_euro) * e.sx_euro + max(0, kg_ind) * e.sx_ind
+    R_rear = M / float(TRAILER_LEN_CM)
+    return (max(0.0, W - R_rear), max(0.0, R_rear), float(W))
+
+def rear_share(e: Entry, kg_euro: int, kg_ind: int) -> float:
+    """Wie planner._weight_split_grog (kg=0 zählt als 1)."""
+    if e.n_euro + e.n_ind == 0: return 0.5
+    we, wi = (kg_euro or 1.0), (kg_ind or 1.0)
+    W = we * e.n_euro + wi * e.n_ind
+    if W <= 0: return 0.5
+    return max(0.0, min(1.0, (we * e.sx_euro + wi * e.sx_ind) / float(TRAILER_LEN_CM) / W))
+
+def grog_score(e: Entry, kg_euro: int = 0, kg_ind: int = 0, target_rear_share: float = 0.52,
+               w_tail_single: float = 1000.0, w_last_not_full: float = 80.0, w_unused_cm: float = 0.6,
+               w_rear_dev: float = 220.0, w_switch: float = 3.5) -> float:
+    """Wie planner.score_layout_grog – ohne Reihen anzufassen."""
+    s = 0.0
+    if e.flags & F_TAIL_SINGLE: s += w_tail_single
+    if e.flags & F_LAST_NOT_FULL: s += w_last_not_full
+    s += w_unused_cm * max(0, TRAILER_LEN_CM - e.used_cm)
+    dev = rear_share(e, kg_euro, kg_ind) - target_rear_share
+    s += w_rear_dev * (dev * dev)
+    s += w_switch * e.switches
+    return s
+
+_DEFAULT: Dict[str, Optional[AnswerTable]] = {}
+_STATUS: Dict[str, str] = {}
+
+def _default_path(path: Optional[str]) -> str:
+    return path or os.environ.get("PF_ANSWER_TABLE") or DEFAULT_PATH
+
+def default_table(path: Optional[str] = None) -> Optional[AnswerTable]:
+    """Prozessweit einmal öffnen; None, wenn keine (aktuelle) Tabelle vorhanden ist."""
+    path = _default_path(path)
+    if path not in _DEFAULT:
+        tbl, status = None, "aktuell"
+        try:
+            tbl = AnswerTable(path)
+            if not tbl.is_current:
+                tbl.close(); tbl, status = None, "veraltet"
+        except OSError:
+            status = "fehlt"
+        except ValueError:
+            status = "veraltet"
+        _DEFAULT[path], _STATUS[path] = tbl, status
+    return _DEFAULT[path]
+
+def table_status(path: Optional[str] = None) -> str:
+    """„aktuell“, „veraltet“ (Planungskern geändert → neu bauen) oder „fehlt“."""
+    default_table(path)
+    return _STATUS[_default_path(path)]
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Antworttabelle (Paletten Fuchs) bauen/prüfen")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build"); b.add_argument("--out", default=DEFAULT_PATH)
+    i = sub.add_parser("info");  i.add_argument("--path", default=DEFAULT_PATH)
+    args = ap.parse_args(argv)
+    if args.cmd == "build":
+        print(json.dumps(build(args.out), indent=2))
+    else:
+        print(json.dumps({"path": args.path, "bytes": os.path.getsize(args.path),
+                          "status": table_status(args.path),
+                          "kinds": [k for k, _ in KINDS]}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# anytime_search.py — Anytime-Optimierer für die Grog-Bestenliste (Zeitbudget, Hintergrund-Thread)
+# - Startet mit den Konfig-Varianten (sofort ein Ergebnis), sucht dann im Budget weiter:
+#   1) systematisch: je zulässiger 2-quer-Anzahl k Block vorne/hinten/verteilt, Industrie vorne/hinten
+#   2) lokal: zufällige Züge (2-quer verschieben, Industrie-Block umsetzen) auf den bisher besten Layouts,
+#      dazwischen Zufallsstarts; Ende bei Budget, Abbruch oder erschöpftem Suchraum
+# - Nur zulässige Layouts: exakte Palettenzahl nach dem Kappen, keine 1-quer im Heckfenster
+# - Ergebnisse über snapshot() (Versionszähler) – die UI zeichnet nur, wenn sich etwas verbessert hat
+# - cancel(): kooperativ, wird zwischen zwei Kandidaten geprüft
+# Kein Streamlit hier; die Einbindung (Platzhalter, Abbruch bei neuen Eingaben) liegt in app.py.
+
+import random
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from planner import (
+    TRAILER_LEN_CM, EURO_L_CM, EURO_W_CM, ROWS, encode_rows, decode_rows,
+    layout_for_preset_industry, layout_metrics, score_layout_grog, _weight_split_grog,
+)
+
+ANYTIME_BUDGET_S = 1.5
+_L, _T2, _T1 = 0, 1, 2          # Reihen-Codes (planner.ROWS)
+
+class Snapshot(NamedTuple):
+    version: int
+    best: List[Tuple[str, List[Dict], float, float]]   # wie grog_pick_best
+    evaluated: int
+    elapsed_s: float
+    done: bool
+
+class AnytimeOptimizer:
+    def __init__(self, variants: List[Tuple[str, List[Dict]]], euro_n: int, ind_n: int,
+                 kg_euro: int, kg_ind: int, target_rear_share: float,
+                 topk: int = 4, budget_s: float = ANYTIME_BUDGET_S, seed: int = 0):
+        self.seed_variants = list(variants)
+        self.euro_n, self.ind_n = int(euro_n), int(ind_n)
+        self.kg_euro, self.kg_ind = kg_euro, kg_ind
+        self.target = float(target_rear_share)
+        self.topk, self.budget_s = max(1, topk), float(budget_s)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._seen: Dict[bytes, float] = {}
+        self._best: List[Tuple[float, int, str, bytes]] = []   # (score, Reihenfolge, Titel, Code)
+        self._version = 0
+        self._evaluated = 0
+        self._t0 = 0.0
+        self._t_end: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pal_total = self.euro_n + self.ind_n
+        self._ind_code = encode_rows(layout_for_preset_industry(self.ind_n))
+
+    # ---- Steuerung ----
+    def start(self) -> "AnytimeOptimizer":
+        self._t0 = time.perf_counter()
+        for title, rows in self.seed_variants:   # Konfig-Varianten synchron: sofort ein Ergebnis
+            self._offer(title, encode_rows(rows), check=False)
+        self._thread = threading.Thread(target=self._run, name="pf-anytime", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def done(self) -> bool:
+        return self._t_end is not None
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None: self._thread.join(timeout)
+
+    def snapshot(self) -> Snapshot:
+        with self._lock:
+            best = [(title, decode_rows(code), sc, _weight_split_grog(decode_rows(code), self.kg_euro, self.kg_ind))
+                    for sc, _o, title, code in self._best]
+            end = self._t_end if self._t_end is not None else time.perf_counter()
+            return Snapshot(self._version, best, self._evaluated, end - self._t0, self._t_end is not None)
+
+    # ---- Bewertung ----
+    def _feasible(self, code: bytes) -> bool:
+        rows = decode_rows(code)
+        m = layout_metrics(rows)
+        return m.used_cm == sum(ROWS[c]["len_cm"] for c in code) and m.pallets == self._pal_total and not m.tail_single
+
+    def _offer(self, title: str, code: bytes, check: bool = True) -> Optional[float]:
+        if code in self._seen: return self._seen[code]
+        if check and not self._feasible(code):
+            self._seen[code] = float("inf"); return None
+        sc = score_layout_grog(decode_rows(code), kg_euro=self.kg_euro, kg_ind=self.kg_ind,
+                               target_rear_share=self.target)
+        self._seen[code] = sc
+        with self._lock:
+            self._evaluated += 1
+            if len(self._best) < self.topk or sc < self._best[-1][0]:
+                self._best.append((sc, self._evaluated, title, code))
+                self._best.sort()
+                del self._best[self.topk:]
+                self._version += 1
+        return sc
+
+    # ---- Suchraum ----
+    def _euro_ks(self) -> List[int]:
+        """Zulässige Anzahl 2-quer-Reihen: Rest durch 3 teilbar, Länge passt."""
+        n = self.euro_n
+        ind_len = sum(ROWS[c]["len_cm"] for c in self._ind_code)
+        ks = []
+        for k in range(0, n // 2 + 1):
+            if (n - 2 * k) % 3: continue
+            if ind_len + k * EURO_W_CM + (n - 2 * k) // 3 * EURO_L_CM <= TRAILER_LEN_CM:
+                ks.append(k)
+        return ks
+
+    def _compose(self, euro: List[int], ind_front: bool) -> bytes:
+        e = bytes(euro)
+        return self._ind_code + e if ind_front else e + self._ind_code
+
+    def _systematic(self):
+        for k in self._euro_ks():
+            longs = (self.euro_n - 2 * k) // 3
+            patterns = {
+                "2-quer vorne": [_T2] * k + [_L] * longs,
+                "2-quer hinten": [_L] * longs + [_T2] * k,
+            }
+            if k and longs:
+                step = (longs + k) / k   # gleichmäßig verteilt
+                spread = [_L] * longs
+                for j in range(k): spread.insert(min(len(spread), int(round(j * step))), _T2)
+                patterns["2-quer verteilt"] = spread
+            for name, euro in patterns.items():
+                for ind_front in ((True, False) if self.ind_n else (True,)):
+                    if self._cancel.is_set() or self._over_budget(): return
+                    suffix = f", Ind. {'vorne' if ind_front else 'hinten'}" if self.ind_n else ""
+                    self._offer(f"Suche – {k}× {name}{suffix}", self._compose(euro, ind_front))
+
+    def _mutate(self, code: bytes) -> bytes:
+        ic = self._ind_code
+        ind_front = bool(ic) and code[:len(ic)] == ic
+        euro = list(code[len(ic):] if ind_front else code[:len(code) - len(ic)])
+        move = self._rng.random()
+        if ic and move < 0.15:
+            ind_front = not ind_front
+        elif len(euro) >= 2:
+            # eine 2-quer-Reihe an eine andere Stelle verschieben (bzw. zwei Nachbarn tauschen)
+            trans = [i for i, c in enumerate(euro) if c == _T2]
+            if trans and move < 0.7:
+                i = self._rng.choice(trans); euro.pop(i)
+                euro.insert(self._rng.randrange(len(euro) + 1), _T2)
+            else:
+                i = self._rng.randrange(len(euro) - 1)
+                euro[i], euro[i + 1] = euro[i + 1], euro[i]
+        return self._compose(euro, ind_front)
+
+    def _random(self, ks: List[int]) -> bytes:
+        k = self._rng.choice(ks)
+        euro = [_L] * ((self.euro_n - 2 * k) // 3) + [_T2] * k
+        self._rng.shuffle(euro)
+        return self._compose(euro, self._rng.random() < 0.5)
+
+    def _local(self):
+        ks = self._euro_ks()
+        dup = 0
+        while not self._cancel.is_set() and not self._over_budget():
+            with self._lock:
+                pool = [code for _s, _o, _t, code in self._best]
+            if not pool: return
+            # meist Nachbarn der Besten, gelegentlich Neustart (gegen Festfahren auf einem Plateau)
+            if ks and self._rng.random() < 0.2:
+                code, title = self._random(ks), "Suche – Zufallsstart"
+            else:
+                code, title = self._mutate(self._rng.choice(pool)), "Suche – lokal verbessert"
+            if code in self._seen:
+                dup += 1
+                if dup > 5000: return   # Suchraum praktisch erschöpft
+                continue
+            dup = 0
+            self._offer(title, code)
+
+    def _over_budget(self) -> bool:
+        return time.perf_counter() - self._t0 > self.budget_s
+
+    def _run(self):
+        try:
+            if self.euro_n > 0 and not self._cancel.is_set():
+                self._systematic()
+                self._local()
+        finally:
+            with self._lock:
+                self._t_end = time.perf_counter()
@@ -7,347 +7,60 @@
 # - Gewicht: Block vorne/hinten, Verteilen (Hecklast), All-Heavy
 # - BONUS: Bei aktivem Gewicht zusätzliches 2×2 mit Gewichts-Logik
 # - Achslast-Schätzung (grob): Front/Rear basierend auf Hebelmodell (Stützen an den Enden des 1360-cm-Rahmens)
-
+# - Kaltstart: matplotlib/json erst bei Bedarf laden; Startprofil (Importzeiten, First Paint) abrufbar
+# - Grafik ohne pyplot (render.py: Figure-OO-API, begrenzter Render-Pool) – sicher bei parallelen Sitzungen
+# - Gemeinsamer Cache aller Sitzungen (shared_cache.py): Clean-Reihen, Varianten, Grog-Rangfolge, PNGs
+# - Darunter Platten-Cache (disk_cache.py) für Clean-Reihen, Varianten, PNGs: warm auch nach Neustart
+# - Planungskern (Layouts, Geometrie, Achslast, Grog, Varianten) liegt in planner.py
+# - Grog: Rangfolge über den ganzen Ziel-Heckanteil-Bereich vorberechnet (Knickstellen), Slider = Lookup
+# - Grog-Auswahl wahlweise als Pareto-Front (Einzel am Heck, freie Länge, ΔHeckanteil, Wechsel)
+#   oder robust: Achslast-Risiko bei streuenden Palettengewichten (weight_risk.py, Monte Carlo)
+# - Anytime-Suche: Grog-Top-4 im Hintergrund-Thread weiter verbessern (anytime_search.py); Platzhalter an Ort und
+#   Stelle, nachgezogen am Skriptende – die übrige Seite ist währenddessen vollständig und bedienbar
+# - Grog optional mit frei eingemischten Industrie-Reihen (Branch & Bound über alle Verschränkungen)
+# - Stapeln: Höhe, stapelbar, Auflast je Palettentyp → Stapel-Plan mit zweiter Lage (schraffiert) + Achslast
+# - Multi-Drop: 2–5 Stopps als Reihenblöcke in Entladereihenfolge (Stopp 1 am Heck), DP über die Blöcke
+# - Gewichtsansicht: 2D-Schwerpunkt (längs + seitlich), Warnung bei einseitiger Beladung
+# - Clean-Ansicht liest aus answer_table.bin (mmap), wenn gebaut: python answer_table.py build –
+#   Reihen, Achslast und Grog-Score Clean; Tabellenstatus (aktuell/veraltet/fehlt) im Diagnose-Panel
+# - Diagnose: Spans je Schritt (tracing.py) im aufklappbaren Panel, Export als Chrome-Trace
+# - Grafik standardmäßig aus dem Icon-Atlas (sprites.py, Pillow) statt matplotlib – PF_RENDER=matplotlib schaltet zurück
+# - Blumenwagen (CC-Container) als eigene Ladeeinheit in der Clean-Ansicht (Gewicht wie Industrie)
+# - Varianten-Raster seitenweise (gallery.py): nur die sichtbare Seite wird erzeugt und gezeichnet,
+#   die nächste im Hintergrund vorbereitet – auch Konfigs mit Hunderten Varianten bleiben flüssig
+# - Kapazitätsmatrix (capacity.py): alle Euro × Industrie auf einmal – passt/Achslast/bester Grog als Heatmap
+
+import startup_profile as sp   # zuerst: startet die Kaltstart-Uhr
+import time
 from typing import List, Dict, Optional, Tuple, Set
-import streamlit as st
-import json
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
+st = sp.timed_import("streamlit")
 
 st.set_page_config(page_title="Paletten Fuchs – Grafik & Gewicht", layout="centered")
 
-# ------------------ Geometrie / Konstanten ------------------
-TRAILER_LEN_CM = 1360
-TRAILER_W_CM   = 240
-
-EURO_L_CM, EURO_W_CM = 120, 80
-IND_L_CM,  IND_W_CM  = 120, 100
-
-# ------------------ Basis-Layoutfunktionen (Euro/Industrie) ------------------
-def euro_row_long() -> Dict:   return {"type": "EURO_3_LONG", "len_cm": EURO_L_CM, "pallets": 3}
-def euro_row_trans2() -> Dict: return {"type": "EURO_2_TRANS", "len_cm": EURO_W_CM, "pallets": 2}
-def euro_row_trans1() -> Dict: return {"type": "EURO_1_TRANS", "len_cm": EURO_W_CM, "pallets": 1}
-def ind_row2_long() -> Dict:   return {"type": "IND_ROW_2_LONG", "len_cm": IND_L_CM, "pallets": 2}
-def ind_single() -> Dict:      return {"type": "IND_SINGLE", "len_cm": IND_L_CM, "pallets": 1}
-
-def cap_to_trailer(rows: List[Dict]) -> List[Dict]:
-    out, s = [], 0
-    for r in rows:
-        L = r.get("len_cm", EURO_L_CM)
-        if s + L > TRAILER_LEN_CM: break
-        out.append(r); s += L
-    return out
-
-def rows_length_cm(rows: List[Dict]) -> int: return sum(r.get("len_cm", EURO_L_CM) for r in rows)
-def rows_pallets(rows: List[Dict]) -> int:   return sum(r.get("pallets", 0) for r in rows)
-
-# ------------------ Tail-Guard: keine Singles in letzten 4 Reihen ------------------
-def enforce_tail_no_single(rows: List[Dict], target_pal: int) -> List[Dict]:
-    rows = cap_to_trailer(list(rows))
-    n = len(rows)
-    if n > 0:
-        tail_start = max(0, n - 4)
-        cleaned = []
-        for i, r in enumerate(rows):
-            if i >= tail_start and r["type"] == "EURO_1_TRANS":
-                continue
-            cleaned.append(r)
-        rows = cleaned
-    if rows and rows[-1]["type"] == "EURO_1_TRANS":
-        rows.pop()
-
-    deficit = target_pal - rows_pallets(rows)
-    if deficit <= 0:
-        if deficit < 0:
-            base = layout_for_preset_euro_stable(target_pal, singles_front=0)
-            return cap_to_trailer(base)
-        return rows
-
-    insert_limit = max(0, len(rows) - 4)
-
-    def try_insert(row_factory, at_idx: int) -> bool:
-        new_rows = rows[:at_idx] + [row_factory()] + rows[at_idx:]
-        if rows_length_cm(new_rows) <= TRAILER_LEN_CM:
-            rows[:] = new_rows
-            return True
-        return False
-
-    if deficit % 3 == 2:
-        placed = False
-        for ins in range(0, insert_limit + 1):
-            if try_insert(euro_row_trans2, ins):
-                deficit -= 2; placed = True; break
-        if not placed and rows_length_cm(rows) + EURO_W_CM <= TRAILER_LEN_CM:
-            rows.append(euro_row_trans2()); deficit -= 2
-
-    while deficit >= 3 and rows_length_cm(rows) + EURO_L_CM <= TRAILER_LEN_CM:
-        rows = rows[:insert_limit] + [euro_row_long()] + rows[insert_limit:]
-        deficit -= 3
-
-    if deficit == 2 and rows_length_cm(rows) + EURO_W_CM <= TRAILER_LEN_CM:
-        rows = [euro_row_trans2()] + rows; deficit -= 2
-
-    if deficit != 0:
-        rows = cap_to_trailer(layout_for_preset_euro_stable(target_pal, singles_front=0))
-
-    n = len(rows); tail_start = max(0, n - 4)
-    if any(r["type"] == "EURO_1_TRANS" for r in rows[tail_start:]):
-        rows = cap_to_trailer(layout_for_preset_euro_stable(target_pal, singles_front=0))
-    return rows
-
-# ------------------ Euro-Layouts (stabil & exakt) ------------------
-def layout_for_preset_euro_stable(n: int, singles_front: int = 0) -> List[Dict]:
-    rows: List[Dict] = []; remaining = n
-    take = min(max(0, singles_front), 2, remaining)
-    for _ in range(take): rows.append(euro_row_trans1()); remaining -= 1
-
-    if remaining >= 2 and (remaining - 2) % 3 == 0:
-        rows.append(euro_row_trans2()); remaining -= 2
-
-    while remaining % 3 != 0 and any(r["type"] == "EURO_1_TRANS" for r in rows):
-        for i, r in enumerate(rows):
-            if r["type"] == "EURO_1_TRANS":
-                rows.pop(i); remaining += 1; break
-
-    if remaining > 0:
-        rows += [euro_row_long() for _ in range(remaining // 3)]
-
-    if rows_pallets(rows) != n:
-        if n >= 2 and (n - 2) % 3 == 0:
-            rows = [euro_row_trans2()] + [euro_row_long() for _ in range((n - 2) // 3)]
-        else:
-            rows = [euro_row_long() for _ in range(n // 3)]
-            rest = n % 3
-            if rest == 2: rows.insert(0, euro_row_trans2())
-            elif rest == 1: rows.insert(0, euro_row_trans1())
-    return enforce_tail_no_single(rows, n)
-
-def build_euro_exact_tail(n: int) -> List[Dict]:
-    if n <= 0: return []
-    s = max(0, 34 - n)   # minimale 1-quer
-    rem = n - s          # 3a + 2k = rem
-    a_max = rem // 3
-    if a_max % 2 == 1: a_max -= 1
-
-    a = -1
-    for cand in range(a_max, -1, -2):      # nur gerade a
-        if (rem - 3*cand) % 2 == 0:
-            a = cand; break
-    if a < 0:
-        return layout_for_preset_euro_stable(n, singles_front=0)
-
-    k = (rem - 3*a) // 2
-    rows: List[Dict] = []
-    s_front = s // 2; s_tailguard = s - s_front
-    for _ in range(s_front): rows.append(euro_row_trans1())
-    rows += [euro_row_long() for _ in range(a)]
-    rows += [euro_row_trans2() for _ in range(k)]
-    if s_tailguard > 0:
-        insert_at = max(0, len(rows) - 4)
-        rows = rows[:insert_at] + [euro_row_trans1() for _ in range(s_tailguard)] + rows[insert_at:]
-    return enforce_tail_no_single(rows, n)
-
-# ------------------ Industrie-Layout ------------------
-def layout_for_preset_industry(n: int) -> List[Dict]:
-    if n <= 0: return []
-    rows: List[Dict] = []
-    single = n % 2; full = n // 2
-    if single: rows.append(ind_single())
-    rows += [ind_row2_long() for _ in range(full)]
-    return rows
-
-# ------------------ Gewicht: Block/Verteilen ------------------
-def _cat_of_row(r: Dict) -> str:
-    t = r.get("type","")
-    return "EURO" if t.startswith("EURO_") else ("IND" if t.startswith("IND") else "OTHER")
-
-def reorder_rows_heavy(rows: List[Dict],
-                       heavy_euro_count: int,
-                       heavy_ind_count: int,
-                       side: str = "front",
-                       group_by_type: bool = True,
-                       type_order: Tuple[str,str] = ("EURO","IND")) -> List[Dict]:
-    if heavy_euro_count <= 0 and heavy_ind_count <= 0:
-        return rows
-
-    idx_iter = range(len(rows)) if side == "front" else reversed(range(len(rows)))
-    taken_idx_e, taken_idx_i = [], []
-    need_e, need_i = heavy_euro_count, heavy_ind_count
-
-    for i in idx_iter:
-        r = rows[i]; cat = _cat_of_row(r)
-        if cat == "EURO" and need_e > 0:
-            taken_idx_e.append(i); need_e -= r.get("pallets", 0)
-        elif cat == "IND" and need_i > 0:
-            taken_idx_i.append(i); need_i -= r.get("pallets", 0)
-        if need_e <= 0 and need_i <= 0: break
-
-    taken = set(taken_idx_e + taken_idx_i)
-    remaining = [r for j, r in enumerate(rows) if j not in taken]
-    block_e = [rows[j] for j in sorted(taken_idx_e)]
-    block_i = [rows[j] for j in sorted(taken_idx_i)]
-
-    if group_by_type:
-        block = []
-        for cat in type_order:
-            if cat == "EURO": block += block_e
-            elif cat == "IND": block += block_i
-    else:
-        block = [rows[j] for j in sorted(taken)]
-
-    return (block + remaining) if side == "front" else (remaining + block)
-
-def pick_heavy_rows_rear_biased(rows: List[Dict], heavy_total: int) -> Set[int]:
-    if heavy_total <= 0 or not rows: return set()
-    N = len(rows); scored = []
-    for i, r in enumerate(rows):
-        pos = (i + 1) / N
-        bias = 0.6*pos + 0.4*(pos**2)
-        typ = r.get("type","")
-        bonus = 0.08 if ("_1_" in typ or "_2_" in typ or "IND_SINGLE" in typ) else 0.0
-        scored.append((i, bias + bonus, r.get("pallets", 0)))
-    scored.sort(key=lambda t: t[1], reverse=True)
-    picked: Set[int] = set(); total = 0
-
-    def neighbors(k: int) -> bool: return (k-1 in picked) or (k+1 in picked)
-
-    for idx, _, pal in scored:
-        if total >= heavy_total: break
-        if neighbors(idx): continue
-        picked.add(idx); total += pal
-
-    if total < heavy_total:
-        for idx, _, pal in scored:
-            if total >= heavy_total: break
-            if idx in picked: continue
-            if ((idx-1 in picked) and (idx-2 in picked)) or ((idx+1 in picked) and (idx+2 in picked)):
-                continue
-            picked.add(idx); total += pal
-    return picked
+from planner import (
+    TRAILER_LEN_CM, TRAILER_W_CM, DEFAULT_CFG,
+    cap_to_trailer, rows_pallets,
+    layout_for_preset_euro_stable, build_euro_exact_tail, layout_for_preset_industry,
+    layout_for_preset_flower, FLOWER_MAX_PAL, reorder_rows_heavy, pick_heavy_rows_rear_biased,
+    rows_to_rects, rows_to_rects_with_row_index, rows_to_rects_with_weights,
+    estimate_axle_loads, caption_axle, score_layout_grog, _weight_split_grog,
+    PalletSpec, MAX_LOAD_HEIGHT_CM, can_stack, plan_stacked, estimate_axle_loads_stacked,
+    Stop, plan_multidrop, layout_metrics,
+    LIGHT_FACTOR, cog_2d, caption_cog,
+    grog_ranking, pareto_front, generate_variants_from_config, encode_rows, decode_rows, mix_industry_variants,
+)
+import answer_table
+from answer_table import default_table, table_status
+from anytime_search import AnytimeOptimizer, ANYTIME_BUDGET_S
+import tracing as tr
+from render import render_trailer_png
+from shared_cache import CACHE
+from disk_cache import DISK, code_fingerprint
+import gallery
+import planner
 
 # ------------------ Grafik ------------------
-COLOR_EURO_LONG = "#d9f2d9"
-COLOR_EURO_QUER = "#cfe8ff"
-COLOR_IND      = "#ffe2b3"
-EDGE           = "#4a4a4a"
-
-def rows_to_rects(rows: List[Dict]) -> List[Tuple[float,float,float,float,str,str,bool]]:
-    rects = []; x = 0
-    for r in rows:
-        t = r["type"]; L = r["len_cm"]
-        if t == "EURO_3_LONG":
-            for lane in range(3): rects.append((x, lane*80, 120, 80, COLOR_EURO_LONG, "EURO", False))
-            x += L
-        elif t == "EURO_2_TRANS":
-            for lane in range(2): rects.append((x, lane*120, 80, 120, COLOR_EURO_QUER, "EURO", False))
-            x += L
-        elif t == "EURO_1_TRANS":
-            rects.append((x, 60, 80, 120, COLOR_EURO_QUER, "EURO", False)); x += L
-        elif t == "IND_ROW_2_LONG":
-            rects.append((x, 20, 120, 100, COLOR_IND, "IND", False))
-            rects.append((x,120, 120, 100, COLOR_IND, "IND", False)); x += L
-        elif t == "IND_SINGLE":
-            rects.append((x, 70, 120, 100, COLOR_IND, "IND", False)); x += L
-    return rects
-
-def rows_to_rects_with_row_index(rows: List[Dict]):
-    rects = []; meta  = []; x = 0
-    for i, r in enumerate(rows):
-        t = r["type"]; L = r["len_cm"]
-        if t == "EURO_3_LONG":
-            for lane in range(3):
-                rects.append((x, lane*80, 120, 80, COLOR_EURO_LONG, "EURO"))
-                meta.append({"row_idx": i, "cat": "EURO"})
-            x += L
-        elif t == "EURO_2_TRANS":
-            for lane in range(2):
-                rects.append((x, lane*120, 80, 120, COLOR_EURO_QUER, "EURO"))
-                meta.append({"row_idx": i, "cat": "EURO"})
-            x += L
-        elif t == "EURO_1_TRANS":
-            rects.append((x, 60, 80, 120, COLOR_EURO_QUER, "EURO"))
-            meta.append({"row_idx": i, "cat": "EURO"})
-            x += L
-        elif t == "IND_ROW_2_LONG":
-            for y0 in (20, 120):
-                rects.append((x, y0, 120, 100, COLOR_IND, "IND"))
-                meta.append({"row_idx": i, "cat": "IND"})
-            x += L
-        elif t == "IND_SINGLE":
-            rects.append((x, 70, 120, 100, COLOR_IND, "IND"))
-            meta.append({"row_idx": i, "cat": "IND"})
-            x += L
-    return rects, meta
-
-def rows_to_rects_with_weights(rows: List[Dict],
-                               heavy_euro_count: int = 0, heavy_euro_side: str = "front",
-                               heavy_ind_count: int = 0,  heavy_ind_side: str  = "front"):
-    rects = []; x = 0; euro_rects = []; ind_rects  = []
-    for r in cap_to_trailer(rows):
-        t = r["type"]; L = r["len_cm"]
-        if t == "EURO_3_LONG":
-            for lane in range(3):
-                rects.append((x, lane*80, 120, 80, COLOR_EURO_LONG, "EURO", False))
-                euro_rects.append(len(rects)-1)
-            x += L
-        elif t == "EURO_2_TRANS":
-            for lane in range(2):
-                rects.append((x, lane*120, 80, 120, COLOR_EURO_QUER, "EURO", False))
-                euro_rects.append(len(rects)-1)
-            x += L
-        elif t == "EURO_1_TRANS":
-            rects.append((x, 60, 80, 120, COLOR_EURO_QUER, "EURO", False))
-            euro_rects.append(len(rects)-1)
-            x += L
-        elif t == "IND_ROW_2_LONG":
-            for y0 in (20, 120):
-                rects.append((x, y0, 120, 100, COLOR_IND, "IND", False))
-                ind_rects.append(len(rects)-1)
-            x += L
-        elif t == "IND_SINGLE":
-            rects.append((x, 70, 120, 100, COLOR_IND, "IND", False))
-            ind_rects.append(len(rects)-1)
-            x += L
-
-    euro_cnt = len(euro_rects)
-    if heavy_euro_count > 0 and euro_cnt > 0:
-        indices = (list(reversed(euro_rects)) if heavy_euro_side == "rear" else euro_rects)[:heavy_euro_count]
-        for idx in indices:
-            x0,y0,w0,h0,c0,cat0,_ = rects[idx]
-            rects[idx] = (x0,y0,w0,h0,c0,cat0,True)
-    euro_hvy = sum(1 for i in euro_rects if rects[i][6] is True)
-
-    ind_cnt = len(ind_rects)
-    if heavy_ind_count > 0 and ind_cnt > 0:
-        indices = (list(reversed(ind_rects)) if heavy_ind_side == "rear" else ind_rects)[:heavy_ind_count]
-        for idx in indices:
-            x0,y0,w0,h0,c0,cat0,_ = rects[idx]
-            rects[idx] = (x0,y0,w0,h0,c0,cat0,True)
-    ind_hvy = sum(1 for i in ind_rects if rects[i][6] is True)
-
-    return rects, euro_cnt, ind_cnt, euro_hvy, ind_hvy
-
-def estimate_axle_loads(rows: List[Dict], kg_euro: int, kg_ind: int) -> Tuple[float, float, float]:
-    if kg_euro <= 0 and kg_ind <= 0: return (0.0, 0.0, 0.0)
-    rects = rows_to_rects(cap_to_trailer(rows))
-    L = float(TRAILER_LEN_CM)
-    W = 0.0; M_about_front = 0.0
-    for (x, y, w, h, color, cat, hv) in rects:
-        wkg = kg_euro if cat == "EURO" else kg_ind
-        if wkg <= 0: continue
-        xc = x + w / 2.0
-        W += wkg; M_about_front += wkg * xc
-    if W <= 0: return (0.0, 0.0, 0.0)
-    R_rear = M_about_front / L
-    R_front = W - R_rear
-    return (max(0.0, R_front), max(0.0, R_rear), W)
-
-def caption_axle(front: float, rear: float, total: float) -> str:
-    if total <= 0: return ""
-    pf = 100.0 * front / total
-    pr = 100.0 * rear  / total
-    return f"Achslast (grob): Front ≈ **{front:.0f} kg** ({pf:.1f}%), Rear ≈ **{rear:.0f} kg** ({pr:.1f}%)."
-
+@tr.traced("draw_graph")
 def draw_graph(title: str,
                rows: List[Dict],
                figsize: Tuple[float,float] = (8, 1.7),
@@ -356,266 +69,114 @@ def draw_graph(title: str,
                kg_ind: int = 0,
                heavy_euro_count: int = 0, heavy_ind_count: int = 0, heavy_side: str = "front",
                heavy_rows: Optional[Set[int]] = None,
-               show_axle_note: bool = False):
-    if not weight_mode:
-        rects = rows_to_rects(cap_to_trailer(rows))
-        euro_cnt = sum(1 for *_,cat,_ in rects if cat=="EURO")
-        ind_cnt  = sum(1 for *_,cat,_ in rects if cat=="IND")
-        euro_hvy = ind_hvy = 0
-    elif heavy_rows is not None:
-        base, meta = rows_to_rects_with_row_index(cap_to_trailer(rows))
-        rects = []
-        euro_cnt = sum(1 for m in meta if m["cat"]=="EURO")
-        ind_cnt  = sum(1 for m in meta if m["cat"]=="IND")
-        euro_hvy = ind_hvy = 0
-        for (x,y,w,h,c,cat), m in zip(base, meta):
-            hv = (m["row_idx"] in heavy_rows)
-            if hv and cat=="EURO": euro_hvy += 1
-            if hv and cat=="IND":  ind_hvy  += 1
-            rects.append((x,y,w,h,c,cat,hv))
-    else:
-        rects, euro_cnt, ind_cnt, euro_hvy, ind_hvy = rows_to_rects_with_weights(
-            rows, heavy_euro_count=heavy_euro_count, heavy_euro_side=heavy_side,
-            heavy_ind_count=heavy_ind_count, heavy_ind_side=heavy_side
-        )
-
-    fig, ax = plt.subplots(figsize=figsize)
-    ax.add_patch(Rectangle((0, 0), TRAILER_LEN_CM, TRAILER_W_CM,
-                           fill=False, linewidth=2, edgecolor="#333"))
-
-    for (x, y, w, h, c, cat, hvy) in rects:
-        face = c; edge = "#4a4a4a"; lw = 0.8
-        if weight_mode and hvy:
-            edge = "#222222"; lw = 1.6
-            face = {"#d9f2d9":"#bfe6bf", "#cfe8ff":"#a8d7ff", "#ffe2b3":"#ffd089"}.get(c, c)
-        ax.add_patch(Rectangle((x, y), w, h, facecolor=face, edgecolor=edge, linewidth=lw))
+               show_axle_note: bool = False,
+               tiers: Optional[Tuple[int, ...]] = None,
+               sections: Optional[List[Tuple[float, str]]] = None,
+               light_factor: float = LIGHT_FACTOR,
+               axle: Optional[Tuple[float, float, float]] = None):
+    with tr.span("geometry"):
+        if not weight_mode:
+            rects = rows_to_rects(cap_to_trailer(rows))
+            euro_cnt = sum(1 for *_,cat,_ in rects if cat=="EURO")
+            ind_cnt  = sum(1 for *_,cat,_ in rects if cat!="EURO")
+            euro_hvy = ind_hvy = 0
+        elif heavy_rows is not None:
+            base, meta = rows_to_rects_with_row_index(cap_to_trailer(rows))
+            rects = []
+            euro_cnt = sum(1 for m in meta if m["cat"]=="EURO")
+            ind_cnt  = sum(1 for m in meta if m["cat"]!="EURO")
+            euro_hvy = ind_hvy = 0
+            for (x,y,w,h,c,cat), m in zip(base, meta):
+                hv = (m["row_idx"] in heavy_rows)
+                if hv and cat=="EURO": euro_hvy += 1
+                if hv and cat!="EURO": ind_hvy  += 1
+                rects.append((x,y,w,h,c,cat,hv))
+        else:
+            rects, euro_cnt, ind_cnt, euro_hvy, ind_hvy = rows_to_rects_with_weights(
+                rows, heavy_euro_count=heavy_euro_count, heavy_euro_side=heavy_side,
+                heavy_ind_count=heavy_ind_count, heavy_ind_side=heavy_side
+            )
 
-    ax.set_xlim(0, TRAILER_LEN_CM); ax.set_ylim(0, TRAILER_W_CM)
-    ax.set_aspect('equal'); ax.axis('off'); ax.set_title(title, fontsize=12, pad=6)
-    st.pyplot(fig); plt.close(fig)
+    with tr.span("render"):
+        png = render_trailer_png(title, rects, figsize=figsize, weight_mode=weight_mode,
+                                 tiers=tiers, sections=sections)
+    with tr.span("st.image"):
+        st.image(png, width="stretch")
+    sp.mark_first_paint()
 
     if (weight_mode or show_axle_note) and (kg_euro or kg_ind):
-        front, rear, total = estimate_axle_loads(rows, kg_euro, kg_ind)
+        front, rear, total = axle if axle is not None else estimate_axle_loads(rows, kg_euro, kg_ind)
         axl = caption_axle(front, rear, total)
         if weight_mode:
             total_e = euro_cnt * kg_euro
             total_i = ind_cnt  * kg_ind
             st.caption(
                 f"Gewicht: gesamt ≈ **{total_e + total_i:.0f} kg** "
-                f"(Euro: {euro_cnt}×{kg_euro}, Ind.: {ind_cnt}×{kg_ind}). {axl}"
+                f"(Euro: {euro_cnt}×{kg_euro}, Ind.: {ind_cnt}×{kg_ind}). {axl} "
+                + caption_cog(cog_2d(rects, kg_euro, kg_ind, light_factor))
+                + (f" (unmarkiert {light_factor*100:.0f} % von kg)"
+                   if light_factor < 1.0 and any(r[6] for r in rects) else "")
             )
         else:
             st.caption(axl)
 
-# ---------- GROG: Auto-Scorer & Auswahl ----------
-def _has_tail_single(rows: List[Dict]) -> bool:
-    rows = cap_to_trailer(rows)
-    n = len(rows); tail_start = max(0, n - 4)
-    return any(r["type"] == "EURO_1_TRANS" for r in rows[tail_start:])
-
-def _last_row_full(rows: List[Dict]) -> bool:
-    rows = cap_to_trailer(rows)
-    if not rows: return True
-    t = rows[-1]["type"]
-    return t not in ("EURO_1_TRANS", "IND_SINGLE")
-
-def _weight_split_grog(rows: List[Dict], kg_euro: int, kg_ind: int) -> float:
-    rects = rows_to_rects(cap_to_trailer(rows))
-    if not rects: return 0.5
-    L = float(TRAILER_LEN_CM)
-    W = 0.0; M_front = 0.0
-    for (x, y, w, h, color, cat, hv) in rects:
-        wkg = (kg_euro if cat == "EURO" else kg_ind) or 1.0
-        xc = x + w/2.0
-        W += wkg; M_front += wkg * xc
-    if W <= 0: return 0.5
-    rear = M_front / L
-    rear_share = max(0.0, min(1.0, rear / W))
-    return rear_share
-
-def score_layout_grog(rows: List[Dict],
-                      kg_euro: int = 0,
-                      kg_ind: int = 0,
-                      target_rear_share: float = 0.52,
-                      w_tail_single: float = 1000.0,
-                      w_last_not_full: float = 80.0,
-                      w_unused_cm: float = 0.6,
-                      w_rear_dev: float = 220.0,
-                      w_switch: float = 3.5) -> float:
-    rows = cap_to_trailer(rows)
-    s = 0.0
-    if _has_tail_single(rows): s += w_tail_single
-    if not _last_row_full(rows): s += w_last_not_full
-    unused = max(0, TRAILER_LEN_CM - rows_length_cm(rows))
-    s += w_unused_cm * unused
-    rear_share = _weight_split_grog(rows, kg_euro, kg_ind)
-    dev = rear_share - target_rear_share
-    s += w_rear_dev * (dev * dev)
-    def is_qu(tp):  return tp in ("EURO_2_TRANS", "EURO_1_TRANS")
-    switches = sum(1 for a, b in zip(rows, rows[1:])
-                   if ("Q" if is_qu(a["type"]) else "L") != ("Q" if is_qu(b["type"]) else "L"))
-    s += w_switch * switches
-    return s
-
-def grog_pick_best(variants: List[Tuple[str, List[Dict]]],
-                   kg_euro: int,
-                   kg_ind: int,
-                   target_rear_share: float,
-                   topk: int = 4) -> List[Tuple[str, List[Dict], float, float]]:
-    scored = []
-    for title, rows in variants:
-        sc = score_layout_grog(rows, kg_euro=kg_euro, kg_ind=kg_ind,
-                               target_rear_share=target_rear_share)
-        rear = _weight_split_grog(rows, kg_euro, kg_ind)
-        scored.append((title, rows, sc, rear))
-    scored.sort(key=lambda t: t[2])
-    return scored[:topk]
-
-# ------------------ Vordefinierte Varianten (Euro) + neue Typen ------------------
-def _choose_k_for_no_single(n: int, k_max: int) -> int:
-    k_cap = min(k_max, n // 2)
-    want = (3 - (n % 3)) % 3  # k ≡ -n (mod 3)
-    for k in range(k_cap, -1, -1):
-        if k % 3 == want:
-            return k
-    return 0
-
-def build_euro_all_long(n: int, exact_tail: bool) -> List[Dict]:
-    return build_euro_exact_tail(n) if exact_tail else layout_for_preset_euro_stable(n, singles_front=0)
-
-def build_euro_rear_2trans_block(n: int, approx_block: int, exact_tail: bool) -> List[Dict]:
-    if n <= 0: return []
-    if exact_tail: return build_euro_exact_tail(n)
-    k = _choose_k_for_no_single(n, k_max=max(0, approx_block))
-    if k == 0: return build_euro_all_long(n, exact_tail=False)
-    long_cnt = (n - 2*k) // 3
-    rows = [euro_row_long() for _ in range(long_cnt)] + [euro_row_trans2() for _ in range(k)]
-    return enforce_tail_no_single(rows, n)
-
-def build_euro_mixed_periodic(n: int, period: int, exact_tail: bool) -> List[Dict]:
-    if n <= 0: return []
-    if exact_tail: return build_euro_exact_tail(n)
-    approx_k = max(1, n // period)
-    k = _choose_k_for_no_single(n, k_max=approx_k)
-    if k == 0: return build_euro_all_long(n, exact_tail=False)
-    long_cnt = (n - 2*k) // 3
-    out: List[Dict] = []
-    quota = max(1e-9, long_cnt / (k + 1))
-    used_long = 0; used_k = 0
-    cursor = 0.0
-    while used_long + used_k < long_cnt + k:
-        if used_k < k and (used_long + used_k) >= cursor + quota * (used_k + 1):
-            out.append(euro_row_trans2()); used_k += 1
-        else:
-            out.append(euro_row_long()); used_long += 1
-    return enforce_tail_no_single(out, n)
-
-def build_euro_alt_pattern(n: int, exact_tail: bool) -> List[Dict]:
-    if n <= 0: return []
-    if exact_tail: return build_euro_exact_tail(n)
-    approx_block = max(1, n // 6)
-    return build_euro_rear_2trans_block(n, approx_block=approx_block, exact_tail=False)
-
-# --- NEU: recipe / heavy_auto_rear / light_auto_mix ---
-def build_euro_recipe(rowspec: list) -> List[Dict]:
-    rows: List[Dict] = []
-    for r in rowspec:
-        if r == 3: rows.append(euro_row_long())
-        elif r == 2: rows.append(euro_row_trans2())
-        elif r == 1: rows.append(euro_row_trans1())
-    return enforce_tail_no_single(rows, sum(rowspec))
-
-def build_euro_heavy_auto_rear(n: int, exact_tail: bool, params: dict) -> List[Dict]:
-    if n <= 0: return []
-    if exact_tail: return build_euro_exact_tail(n)
-    target_share = float(params.get("target_rear_share", 0.42))
-    min_k = int(params.get("min_k", 3))
-    max_k = n // 2
-    k_guess = max(min_k, min(max_k, int(round(target_share * n / 2.0))))
-    k = _choose_k_for_no_single(n, k_max=k_guess)
-    if k == 0: return build_euro_all_long(n, exact_tail=False)
-    long_cnt = (n - 2*k) // 3
-    rows = [euro_row_long() for _ in range(long_cnt)] + [euro_row_trans2() for _ in range(k)]
-    return enforce_tail_no_single(rows, n)
-
-def build_euro_light_auto_mix(n: int, exact_tail: bool, params: dict) -> List[Dict]:
-    if n <= 0: return []
-    period = int(params.get("period", 4))
-    return build_euro_mixed_periodic(n, period=period, exact_tail=exact_tail)
-
-def combine_with_industry_pos(euro_rows: List[Dict], ind_n: int, pos: str) -> List[Dict]:
-    if ind_n <= 0:
-        return euro_rows
-    ind_rows = layout_for_preset_industry(ind_n)
-    return cap_to_trailer(ind_rows + euro_rows) if pos == "front" else cap_to_trailer(euro_rows + ind_rows)
-
-def build_euro_by_type(t: str, n: int, exact_tail: bool, params: dict) -> List[Dict]:
-    if t == "recipe":          return build_euro_recipe(params.get("rows", []))
-    if t == "heavy_auto_rear": return build_euro_heavy_auto_rear(n, exact_tail, params)
-    if t == "light_auto_mix":  return build_euro_light_auto_mix(n, exact_tail, params)
-    if t == "all_long":        return build_euro_all_long(n, exact_tail=exact_tail)
-    if t == "rear_block":      return build_euro_rear_2trans_block(n, approx_block=int(params.get("approx_block", 15)), exact_tail=exact_tail)
-    if t == "mixed_periodic":  return build_euro_mixed_periodic(n, period=int(params.get("period", 4)), exact_tail=exact_tail)
-    if t == "alt_block":       return build_euro_alt_pattern(n, exact_tail=exact_tail)
-    return build_euro_all_long(n, exact_tail=exact_tail)
-
-# ------------------ JSON-Filter & Variantenerzeugung ------------------
-def _passes_variant_filters(v: dict, euro_n: int, ind_n: int, weight_mode: bool) -> Tuple[bool, str]:
-    if "n_exact" in v:
-        try:
-            if int(v["n_exact"]) != euro_n:
-                return False, f"n_exact={v['n_exact']} passt nicht zu Euro={euro_n}"
-        except Exception:
-            return False, "n_exact ungültig"
-
-    for key, val, cur in [
-        ("euro_min", v.get("euro_min"), euro_n),
-        ("euro_max", v.get("euro_max"), euro_n),
-        ("ind_min",  v.get("ind_min"),  ind_n),
-        ("ind_max",  v.get("ind_max"),  ind_n),
-    ]:
-        if val is not None:
-            try:
-                val_i = int(val)
-            except Exception:
-                return False, f"{key} ungültig"
-            if key.endswith("_min") and cur < val_i: return False, f"{key}={val_i} nicht erfüllt (ist {cur})"
-            if key.endswith("_max") and cur > val_i: return False, f"{key}={val_i} überschritten (ist {cur})"
-
-    if v.get("weight_required") is True and not weight_mode:
-        return False, "weight_required, aber Gewichtsmodus ist AUS"
-    if v.get("weight_forbidden") is True and weight_mode:
-        return False, "weight_forbidden, aber Gewichtsmodus ist AN"
-
-    return True, "ok"
-
-def generate_variants_from_config(cfg: dict, euro_n: int, ind_n: int, exact_tail: bool, weight_mode: bool=False):
-    variants = cfg.get("variants", [])
-    ind_pos_map = cfg.get("industry_position", {})
-    out = []
-    skipped = []
-    for idx, v in enumerate(variants):
-        ok, why = _passes_variant_filters(v, euro_n, ind_n, weight_mode)
-        title = v.get("title", f"Var {idx+1}")
-        if not ok:
-            skipped.append((title, why)); continue
-        vtype = v.get("type", "all_long")
-        euro_rows = build_euro_by_type(vtype, euro_n, exact_tail, v)
-        letter = chr(ord('A') + idx)
-        pos = v.get("industry_position", ind_pos_map.get(letter, "front"))
-        rows = combine_with_industry_pos(euro_rows, ind_n, pos)
-        out.append((title, rows))
-    return out, skipped, len(variants)
+# ------------------ Gemeinsamer Cache (alle Sitzungen) ------------------
+def _cfg_key(cfg: dict) -> str:
+    return "default" if cfg is DEFAULT_CFG else sp.lazy_import("json").dumps(cfg, sort_keys=True)
+
+def variants_cached(cfg: dict, euro_n: int, ind_n: int, exact_tail: bool, weight_mode: bool):
+    """generate_variants_from_config über CACHE – Reihen als Codes abgelegt, bei Treffer frisch dekodiert."""
+    def compute():
+        vs, skipped, total = generate_variants_from_config(cfg, euro_n, ind_n, exact_tail=exact_tail,
+                                                           weight_mode=weight_mode)
+        return tuple((t, encode_rows(r)) for t, r in vs), tuple(skipped), total
+    key = ("variants", _cfg_key(cfg), euro_n, ind_n, bool(exact_tail), bool(weight_mode))
+    codes, skipped, total = CACHE.get_or_compute(
+        key, lambda: DISK.get_or_compute("variants", code_fingerprint(planner), key, compute))
+    return [(t, decode_rows(c)) for t, c in codes], list(skipped), total
+
+def variants_paged(grid: str, cfg: dict, euro_n: int, ind_n: int, exact_tail: bool, weight_mode: bool,
+                   figsize: Optional[Tuple[float, float]] = None):
+    """Seitenwahl + Varianten der sichtbaren Seite -> (Varianten, Anzahl, Seite, Seiten).
+    Die nächste Seite wird im Hintergrund erzeugt und – mit figsize – schon gerendert (Clean-Geometrie)."""
+    n = gallery.count_variants(cfg, euro_n, ind_n, weight_mode)
+    pages = gallery.page_count(n)
+    page = 0
+    if pages > 1:
+        page = st.selectbox(f"Seite ({n} Varianten)", list(range(pages)), key=f"pf_page_{grid}",
+                            format_func=lambda p: f"{p + 1} / {pages}")
+    ck = _cfg_key(cfg)
+    vs = gallery.variants_page(cfg, ck, euro_n, ind_n, exact_tail, weight_mode, page)
+    if page + 1 < pages:
+        def render(title: str, rows: List[Dict]):
+            render_trailer_png(title, rows_to_rects(cap_to_trailer(rows)), figsize=figsize)
+        gallery.prefetch(cfg, ck, euro_n, ind_n, exact_tail, weight_mode, page + 1,
+                         render=render if figsize else None)
+    return vs, n, page, pages
+
+def caption_page(n: int, page: int, pages: int):
+    if pages > 1:
+        a = page * gallery.PER_PAGE
+        st.caption(f"Seite {page + 1} von {pages}: Varianten {a + 1}–{min(n, a + gallery.PER_PAGE)} von {n}. "
+                   "Erzeugt und gezeichnet wird nur die gewählte Seite.")
 
 # ------------------ UI ------------------
+sp.mark("ui_start")
+# Aufzeichnung nur, wenn das Diagnose-Panel (unten) an ist – der Wert steht schon vor dem Widget im Session-State
+if st.session_state.get("pf_diag"): tr.begin_run()
+else: tr.end_run()
 st.title("🦊 Paletten Fuchs – Grafik & Gewicht")
 st.subheader("Clean-Ansicht (Grafik) – Euro + Industrie")
 
-c1, c3 = st.columns([1,1])
+c1, c3, c4 = st.columns([1,1,1])
 with c1:
     euro_n = st.number_input("Euro-Paletten", 0, 40, 33, step=1)
 with c3:
     ind_n = st.number_input("Industrie-Paletten", 0, 40, 0, step=1)
+with c4:
+    flower_n = st.number_input("Blumenwagen (CC)", 0, FLOWER_MAX_PAL, 0, step=1,
+                               help=f"CC-Container 135 × 56,5 cm: 4 längs je Reihe, Rest quer vorne. Gewicht wie Industrie. "
+                                    f"Allein passen höchstens {FLOWER_MAX_PAL}.")
 
 exact_tail = st.toggle("Exakt bis hinten (Euro)", value=False,
                        help="Euro füllt exakt 1360 cm (Heck 0 cm), keine 1‑quer im Heck (letzte 4 Reihen), letzte Reihe voll.")
@@ -631,6 +192,11 @@ with st.expander("Gewicht & Modus (optional)", expanded=False):
                         index=0, horizontal=True)
     weight_mode = (mode != "Aus")
 
+    light_pct = st.slider("Schwerpunkt: unmarkierte Paletten wiegen (% von kg)", 0, 100,
+                          int(LIGHT_FACTOR * 100), step=5,
+                          help="Nur für den 2D-Schwerpunkt (längs + seitlich) in der Gewichtsansicht: "
+                               "schwer markierte Paletten zählen voll, die übrigen mit diesem Anteil.")
+
     # All-Heavy (neu)
     all_heavy = st.toggle("Schwer: alle Paletten sind schwer", value=False,
                           help="Markiert alle Paletten als schwer (unabhängig vom Modus).")
@@ -656,53 +222,146 @@ with st.expander("Gewicht & Modus (optional)", expanded=False):
         heavy_total = st.number_input("Gesamtanzahl schwere Paletten", 0, 200, 20, step=1,
                                       help="Euro + Industrie zusammen; werden hecklastig verteilt.")
 
-# 1) Clean-Reihen aufbauen
-rows_clean: List[Dict] = []
-if euro_n > 0:
-    rows_clean += (build_euro_exact_tail(euro_n) if exact_tail else layout_for_preset_euro_stable(euro_n, singles_front=0))
-if ind_n > 0:
-    rows_clean += layout_for_preset_industry(ind_n)
+# 1) Clean-Reihen aufbauen (vorberechnete Tabelle, falls gebaut und aktuell; sonst live)
+with tr.span("layout_clean"):
+    _answers = default_table()
+    clean_entry = _answers.entry(euro_n, ind_n, exact_tail) if _answers and not flower_n else None
+    rows_clean: Optional[List[Dict]] = decode_rows(_answers.row_code(clean_entry)) if clean_entry else None
+    if rows_clean is None:
+        def _clean_code() -> bytes:
+            rows: List[Dict] = []
+            if euro_n > 0:
+                rows += (build_euro_exact_tail(euro_n) if exact_tail else layout_for_preset_euro_stable(euro_n, singles_front=0))
+            if ind_n > 0:
+                rows += layout_for_preset_industry(ind_n)
+            rows += layout_for_preset_flower(flower_n)
+            return encode_rows(rows)
+        _key = ("clean", euro_n, ind_n, bool(exact_tail)) + ((flower_n,) if flower_n else ())
+        rows_clean = decode_rows(CACHE.get_or_compute(
+            _key, lambda: DISK.get_or_compute("clean", code_fingerprint(planner), _key, _clean_code)))
 
 # 2) Gewichtslogik anwenden (Clean-Vorschau)
-heavy_rows: Optional[Set[int]] = None
-rows_clean_weighted = list(rows_clean)
-if weight_mode:
-    if mode == "Block vorne":
-        rows_clean_weighted = reorder_rows_heavy(
-            rows_clean_weighted, hvy_e, hvy_i, side="front",
-            group_by_type=group_block, type_order=type_order
-        )
-    elif mode == "Block hinten":
-        rows_clean_weighted = reorder_rows_heavy(
-            rows_clean_weighted, hvy_e, hvy_i, side="rear",
-            group_by_type=group_block, type_order=type_order
-        )
-    elif mode == "Verteilen (Hecklast)":
-        total_pal = rows_pallets(rows_clean_weighted)
-        qty = min(heavy_total, total_pal)
-        if all_heavy:
+with tr.span("weight_logic"):
+    heavy_rows: Optional[Set[int]] = None
+    rows_clean_weighted = list(rows_clean)
+    if weight_mode:
+        if mode == "Block vorne":
+            rows_clean_weighted = reorder_rows_heavy(
+                rows_clean_weighted, hvy_e, hvy_i, side="front",
+                group_by_type=group_block, type_order=type_order
+            )
+        elif mode == "Block hinten":
+            rows_clean_weighted = reorder_rows_heavy(
+                rows_clean_weighted, hvy_e, hvy_i, side="rear",
+                group_by_type=group_block, type_order=type_order
+            )
+        elif mode == "Verteilen (Hecklast)":
+            total_pal = rows_pallets(rows_clean_weighted)
+            qty = min(heavy_total, total_pal)
+            if all_heavy:
+                heavy_rows = set(range(len(rows_clean_weighted)))
+            else:
+                heavy_rows = set(range(len(rows_clean_weighted))) if qty >= total_pal else pick_heavy_rows_rear_biased(rows_clean_weighted, qty)
+
+        if all_heavy and mode in ("Block vorne", "Block hinten"):
             heavy_rows = set(range(len(rows_clean_weighted)))
-        else:
-            heavy_rows = set(range(len(rows_clean_weighted))) if qty >= total_pal else pick_heavy_rows_rear_biased(rows_clean_weighted, qty)
-
-    if all_heavy and mode in ("Block vorne", "Block hinten"):
-        heavy_rows = set(range(len(rows_clean_weighted)))
 
-# 3) Zeichnen Clean
+# 3) Zeichnen Clean – Achslast und Grog-Score aus der Tabelle, solange die Gewichtslogik nichts umsortiert hat
 title_clean = f"Clean: {euro_n} Euro ({'exakt bis hinten' if exact_tail else 'stabil'}) + {ind_n} Industrie"
+if flower_n: title_clean += f" + {flower_n} Blumenwagen"
+rows_clean_shown = rows_clean_weighted if weight_mode else rows_clean
+kg_e_clean, kg_i_clean = (kg_euro, kg_ind) if weight_mode else (0, 0)
+if clean_entry is not None and encode_rows(rows_clean_shown) != encode_rows(rows_clean):
+    clean_entry = None
 draw_graph(
     title_clean + (" – (Gewichtsansicht)" if weight_mode else ""),
-    rows_clean_weighted if weight_mode else rows_clean,
+    rows_clean_shown,
     figsize=(8, 1.7),
     weight_mode=weight_mode,
-    kg_euro=kg_euro if weight_mode else 0,
-    kg_ind=kg_ind if weight_mode else 0,
+    kg_euro=kg_e_clean,
+    kg_ind=kg_i_clean,
     heavy_euro_count=hvy_e if (weight_mode and mode in ('Block vorne','Block hinten')) else 0,
     heavy_ind_count=hvy_i if (weight_mode and mode in ('Block vorne','Block hinten')) else 0,
     heavy_side=('rear' if mode=='Block hinten' else 'front'),
     heavy_rows=heavy_rows if weight_mode else None,
-    show_axle_note=True
+    show_axle_note=True,
+    light_factor=light_pct / 100.0,
+    axle=answer_table.axle_loads(clean_entry, kg_e_clean, kg_i_clean) if clean_entry else None,
 )
+if clean_entry is not None:
+    sc_clean = answer_table.grog_score(clean_entry, kg_e_clean, kg_i_clean)
+    rs_clean = answer_table.rear_share(clean_entry, kg_e_clean, kg_i_clean)
+else:
+    sc_clean = score_layout_grog(rows_clean_shown, kg_euro=kg_e_clean, kg_ind=kg_i_clean)
+    rs_clean = _weight_split_grog(rows_clean_shown, kg_e_clean, kg_i_clean)
+st.caption(f"Grog-Score Clean: {sc_clean:.1f} (Ziel-Heckanteil 52 %) · Heckanteil {rs_clean*100:.1f} %"
+           + ("" if weight_mode else " bei gleichen Gewichten"))
+placed_clean = rows_pallets(cap_to_trailer(rows_clean))
+if placed_clean < euro_n + ind_n + flower_n:
+    st.warning(f"Passt nicht auf {TRAILER_LEN_CM} cm: {placed_clean} von {euro_n + ind_n + flower_n} Ladeeinheiten "
+               "platziert – der Rest fehlt in der Grafik" + (" (Blumenwagen laden zuletzt)." if flower_n else "."))
+
+# 4) Stapeln (zweite Lage) – optional
+with st.expander("Stapeln (zweite Lage, optional)", expanded=False):
+    stack_on = st.toggle("Stapel-Plan berechnen", value=False,
+                         help="Niedrige, stapelbare Paletten: nur so viele oben, wie unten keinen Platz finden. "
+                              "Welche Plätze doppelt belegt werden, richtet sich nach dem Ziel-Heckanteil (52 %).")
+    if stack_on:
+        cS = st.columns(3)
+        with cS[0]:
+            h_e = st.number_input("Höhe Euro (cm)", 10, 300, 110, step=5)
+            st_e = st.checkbox("Euro stapelbar", value=True)
+            tl_e = st.number_input("Max. Auflast Euro (kg)", 0, 3000, 1000, step=50)
+        with cS[1]:
+            h_i = st.number_input("Höhe Industrie (cm)", 10, 300, 110, step=5)
+            st_i = st.checkbox("Industrie stapelbar", value=True)
+            tl_i = st.number_input("Max. Auflast Industrie (kg)", 0, 3000, 1000, step=50)
+        with cS[2]:
+            max_h = st.number_input("Max. Ladehöhe (cm)", 100, 400, MAX_LOAD_HEIGHT_CM, step=5)
+        spec_e, spec_i = PalletSpec(h_e, st_e, tl_e), PalletSpec(h_i, st_i, tl_i)
+        why = [f"{name}: {can_stack(spec, kg, max_h)[1]}"
+               for name, n, spec, kg in (("Euro", euro_n, spec_e, kg_euro), ("Industrie", ind_n, spec_i, kg_ind))
+               if n > 0 and not can_stack(spec, kg, max_h)[0]]
+        with tr.span("stack_plan"):
+            plan = plan_stacked(euro_n, ind_n, spec_e, spec_i, kg_euro, kg_ind, max_height_cm=max_h)
+        if plan is None:
+            st.warning("Passt auch gestapelt nicht auf 1360 cm." + (" (" + "; ".join(why) + ")" if why else ""))
+        else:
+            draw_graph(f"Stapel-Plan: {euro_n} Euro + {ind_n} Industrie – oben {plan.stacked_euro} Euro, "
+                       f"{plan.stacked_ind} Industrie", plan.rows, figsize=(8, 1.7), tiers=plan.tiers)
+            st.caption(caption_axle(*estimate_axle_loads_stacked(plan, kg_euro, kg_ind))
+                       + (" Nicht stapelbar → " + "; ".join(why) if why else ""))
+
+# 5) Mehrere Abladestellen – optional
+with st.expander("Mehrere Abladestellen (optional)", expanded=False):
+    drop_on = st.toggle("Multi-Drop planen", value=False,
+                        help="Stopp 1 wird zuerst entladen und steht am Heck, der letzte Stopp ganz vorne. "
+                             "Jeder Stopp bildet einen eigenen Reihenblock; optimiert wird die Achslastverteilung.")
+    if drop_on:
+        n_stops = st.number_input("Anzahl Stopps", 2, 5, 3, step=1)
+        stops = []
+        cD = st.columns(int(n_stops))
+        for k in range(int(n_stops)):
+            with cD[k]:
+                e_def = euro_n // n_stops + (1 if k < euro_n % n_stops else 0)
+                i_def = ind_n // n_stops + (1 if k < ind_n % n_stops else 0)
+                e_k = st.number_input(f"Stopp {k+1}: Euro", 0, 40, e_def, step=1, key=f"pf_drop{n_stops}_e{k}")
+                i_k = st.number_input(f"Stopp {k+1}: Ind.", 0, 40, i_def, step=1, key=f"pf_drop{n_stops}_i{k}")
+                stops.append(Stop(f"Stopp {k+1}", e_k, i_k))
+        with tr.span("multidrop", stops=len(stops)):
+            dplan = plan_multidrop(stops, kg_euro, kg_ind)
+        if dplan is None:
+            st.warning("Mit getrennten Stopp-Blöcken passt die Ladung nicht auf 1360 cm.")
+        else:
+            sections, x = [], 0
+            for k, (r, si) in enumerate(zip(dplan.rows, dplan.stop_of_row)):
+                if k == 0 or si != dplan.stop_of_row[k - 1]: sections.append((x, stops[si].name))
+                x += r["len_cm"]
+            draw_graph(f"Multi-Drop: {len(stops)} Stopps – Score {dplan.score:.1f} – Heck {dplan.rear_share*100:.0f}%",
+                       dplan.rows, figsize=(8, 1.7), kg_euro=kg_euro, kg_ind=kg_ind,
+                       show_axle_note=True, sections=sections)
+            if layout_metrics(dplan.rows).tail_single:
+                st.caption("Hinweis: ein Stopp mit 1 Euro-Palette braucht eine 1‑quer‑Reihe – sie liegt hier im Heckfenster.")
 
 # ------------------ Varianten-Konfiguration (JSON) ------------------
 st.markdown("##### Varianten-Konfiguration")
@@ -716,20 +375,10 @@ with conf_col2:
         help="Wenn aktiviert, werden die eingebauten Standard-Varianten verwendet und die hochgeladene JSON ignoriert."
     )
 
-DEFAULT_CFG = {
-    "variants": [
-        { "title": "Var A – alles längs",         "type": "all_long" },
-        { "title": "Var B – 2×quer Heckblock",    "type": "rear_block",     "approx_block": 15 },
-        { "title": "Var C – gemischt (Periodik)", "type": "mixed_periodic", "period": 4 },
-        { "title": "Var D – alternative Blockung","type": "alt_block" }
-    ],
-    "industry_position": { "A":"front","B":"front","C":"front","D":"rear" }
-}
-
 cfg_source = "Default"
 if cfg_file and not use_default_cfg:
     try:
-        cfg = json.load(cfg_file)
+        cfg = sp.lazy_import("json").load(cfg_file)
         cfg_source = f"Upload: {getattr(cfg_file, 'name', 'variants.json')}"
         st.success(f"Varianten-Konfiguration geladen ({cfg_source}).")
     except Exception as e:
@@ -746,26 +395,26 @@ show_cfg_debug = st.checkbox("Konfig-Debug anzeigen", value=False,
 show_variants = st.toggle("Vordefinierte Varianten (2×2) anzeigen", value=False,
                           help="Zeigt Varianten aus der JSON-Konfig basierend auf den obigen Eingaben.")
 if show_variants:
-    variants_dbg, skipped, total_cfg = generate_variants_from_config(
-        cfg, euro_n, ind_n, exact_tail=exact_tail, weight_mode=weight_mode
-    )
-    st.caption(f"Quelle: **{cfg_source}** – Varianten geladen: {len(variants_dbg)}/{total_cfg}")
-
     figsz = (6.6, 1.25)
+    with tr.span("variants", grid="debug"):
+        variants_dbg, n_dbg, page_dbg, pages_dbg = variants_paged(
+            "debug", cfg, euro_n, ind_n, exact_tail, weight_mode, figsize=figsz
+        )
+    st.caption(f"Quelle: **{cfg_source}** – Varianten geladen: {n_dbg}/{len(cfg.get('variants', []))}")
+
     cols_top = st.columns(2, gap="small")
     cols_bot = st.columns(2, gap="small")
     slots = [cols_top[0], cols_top[1], cols_bot[0], cols_bot[1]]
-    for i, (title_v, rows_v) in enumerate(variants_dbg[:4]):
+    for i, (title_v, rows_v) in enumerate(variants_dbg):
         with slots[i]:
             draw_graph(title_v, rows_v, figsize=figsz, weight_mode=False)
-    if len(variants_dbg) == 0:
+    if n_dbg == 0:
         st.info("Keine Varianten nach Filterung übrig. Prüfe n_exact / Min/Max / weight_required.")
-    elif len(variants_dbg) > 4:
-        st.info(f"In der Konfig sind {len(variants_dbg)} Varianten. Es werden die ersten 4 gezeigt.")
+    caption_page(n_dbg, page_dbg, pages_dbg)
     if show_cfg_debug:
         with st.expander("Debug: Geladene Konfig & verworfene Varianten", expanded=False):
             st.write("Verworfene Varianten (Grund):")
-            for t, why in skipped: st.write(f"- {t}: {why}")
+            for t, why in planner.variant_specs(cfg, euro_n, ind_n, weight_mode)[1]: st.write(f"- {t}: {why}")
             st.write("Roh-Konfig:"); st.json(cfg, expanded=False)
 
 # ---- Auto-Bestenliste (GROG) ----
@@ -773,11 +422,102 @@ st.markdown("#### Auto‑Bestenliste (Grog)")
 auto_on = st.toggle("Grog aktivieren", value=True,
                     help="Bewertet alle Varianten automatisch und zeigt die besten an.")
 target_rear = st.slider("Ziel‑Heckanteil (%)", 40, 65, 52, step=1) / 100.0
-
-all_variants, _sk, _tot = generate_variants_from_config(cfg, euro_n, ind_n, exact_tail=exact_tail, weight_mode=False)
-if auto_on and all_variants:
-    picked = grog_pick_best(all_variants, kg_euro=kg_euro, kg_ind=kg_ind,
-                            target_rear_share=target_rear, topk=4)
+grog_view = st.radio("Auswahl", ["Top 4 (Score)", "Pareto‑Front", "Robust (Gewicht ±)"], index=0, horizontal=True,
+                     help="Pareto‑Front: alle Varianten, die in keinem Ziel (Einzel am Heck, freie Länge, "
+                          "Abweichung Heckanteil, Wechsel) schlechter und in einem besser sind als eine andere. "
+                          "Robust: Score + Strafe für die Wahrscheinlichkeit einer Achslast-Überschreitung "
+                          "bei streuenden Palettengewichten (Monte Carlo).")
+anytime_on = st.toggle("Anytime‑Suche (im Hintergrund weiter verbessern)", value=False,
+                       help=f"Top 4: zeigt sofort die Konfig-Varianten und sucht dann bis zu {ANYTIME_BUDGET_S:.1f} s "
+                            "nach besseren Layouts; neue Eingaben brechen die laufende Suche ab.")
+mix_ind = st.toggle("Industrie frei einmischen (Suche)", value=False,
+                    help="Zusätzliche Kandidaten: Industrie-Reihen an beliebigen Stellen bzw. in mehreren Blöcken "
+                         "zwischen den Euro-Reihen – per Branch & Bound nach Grog bewertet.")
+
+with tr.span("variants", grid="grog"):
+    all_variants, _sk, _tot = variants_cached(cfg, euro_n, ind_n, exact_tail, False)
+if mix_ind and ind_n > 0 and all_variants:
+    with tr.span("grog_mix_industry"):
+        all_variants = all_variants + mix_industry_variants(all_variants, ind_n, kg_euro, kg_ind,
+                                                            target_rear_share=target_rear, topk=4)
+PARETO_MAX_SHOWN = 8
+
+def anytime_show(opt: AnytimeOptimizer, holders: list, status, shown: int) -> Tuple[int, bool]:
+    """Bestenliste in die Platzhalter zeichnen, falls sie sich seit `shown` verbessert hat -> (Version, fertig)."""
+    snap = opt.snapshot()
+    if snap.version != shown:
+        for ph, (title_v, rows_v, sc, rear) in zip(holders, snap.best):
+            with ph.container():
+                draw_graph(f"{title_v} – Score {sc:.1f} – Heck {rear*100:.0f}%", rows_v,
+                           figsize=(6.6, 1.25), weight_mode=False)
+    status.caption(f"Anytime‑Suche: {snap.evaluated} Layouts bewertet in {snap.elapsed_s:.1f} s"
+                   + (" – fertig." if snap.done else " …"))
+    return snap.version, snap.done
+
+anytime_live = None   # (Optimierer, Platzhalter, Status), wenn die Anytime-Suche in diesem Lauf aktiv ist
+if auto_on and all_variants and grog_view.startswith("Pareto"):
+    with tr.span("grog_pareto", n=len(all_variants)):
+        front = pareto_front(all_variants, kg_euro, kg_ind, target_rear_share=target_rear)
+    st.caption(f"Pareto‑Front: {len(front)} von {len(all_variants)} Varianten nicht dominiert"
+               + (f" – die ersten {PARETO_MAX_SHOWN} gezeigt." if len(front) > PARETO_MAX_SHOWN else "."))
+    figsz = (6.6, 1.25)
+    for k in range(0, min(len(front), PARETO_MAX_SHOWN), 2):
+        cols = st.columns(2, gap="small")
+        for col, (title_v, rows_v, (tail, unused, dev, sw)) in zip(cols, front[k:k + 2]):
+            with col:
+                draw_graph(f"{title_v} – frei {unused} cm – ΔHeck {dev*100:.0f}% – Wechsel {sw}"
+                           + (" – Einzel hinten" if tail else ""), rows_v,
+                           figsize=figsz, weight_mode=False)
+elif auto_on and all_variants and grog_view.startswith("Robust"):
+    wr = sp.lazy_import("weight_risk")   # numpy erst hier
+    cR = st.columns(3)
+    with cR[0]:
+        spread = st.slider("Streuung kg (±%)", 0, 40, int(wr.MC_REL_SPREAD * 100), step=5) / 100.0
+    with cR[1]:
+        lim_front = st.number_input("Grenze Front (kg)", 0, 40000, int(wr.AXLE_LIMIT_FRONT_KG), step=500)
+    with cR[2]:
+        lim_rear = st.number_input("Grenze Rear (kg)", 0, 40000, int(wr.AXLE_LIMIT_REAR_KG), step=500)
+    if kg_euro <= 0 and kg_ind <= 0:
+        st.info("Robust-Modus braucht kg/Euro oder kg/Industrie (unter „Gewicht & Modus“).")
+    else:
+        with tr.span("grog_robust", n=len(all_variants)):
+            picked = wr.grog_pick_robust(all_variants, kg_euro, kg_ind, target_rear, topk=4,
+                                         limit_front_kg=lim_front, limit_rear_kg=lim_rear, rel_spread=spread)
+        figsz = (6.6, 1.25)
+        cols_top = st.columns(2, gap="small")
+        cols_bot = st.columns(2, gap="small")
+        slots = [cols_top[0], cols_top[1], cols_bot[0], cols_bot[1]]
+        for i, (title_v, rows_v, sc, rear, risk) in enumerate(picked):
+            with slots[i]:
+                draw_graph(f"{title_v} – Score {sc:.1f} – P(Überlast) {risk.p_over*100:.0f}%", rows_v,
+                           figsize=figsz, weight_mode=False, show_axle_note=False)
+                st.caption(wr.caption_risk(risk))
+        n_txt = f"{wr.MC_SAMPLES:,}".replace(",", ".")
+        st.caption(f"{n_txt} Stichproben je Variante, Palettengewichte unabhängig normalverteilt "
+                   f"(±{spread*100:.0f} % ≙ 2σ).")
+elif auto_on and all_variants and anytime_on:
+    # Suche läuft im Thread; je Eingabe-Kombination genau eine (überlebt Reruns ohne Eingabeänderung)
+    key = (euro_n, ind_n, exact_tail, kg_euro, kg_ind, target_rear,
+           tuple((t, encode_rows(r)) for t, r in all_variants))
+    prev = st.session_state.get("pf_anytime")
+    if prev is None or prev[0] != key:
+        if prev is not None: prev[1].cancel()
+        opt = AnytimeOptimizer(all_variants, euro_n, ind_n, kg_euro, kg_ind, target_rear, topk=4).start()
+        st.session_state["pf_anytime"] = (key, opt)
+    else:
+        opt = prev[1]
+    cols_top = st.columns(2, gap="small")
+    cols_bot = st.columns(2, gap="small")
+    holders = [c.empty() for c in (cols_top[0], cols_top[1], cols_bot[0], cols_bot[1])]
+    anytime_live = (opt, holders, st.empty())
+    anytime_shown, anytime_done = anytime_show(*anytime_live, -1)   # Stand sofort; nachgezogen am Skriptende
+elif auto_on and all_variants:
+    # Rangfolge einmal über den ganzen Slider-Bereich; Slider bewegen = Lookup
+    with tr.span("grog_ranking", n=len(all_variants)):
+        ranking = CACHE.get_or_compute(
+            ("grog", tuple((t, encode_rows(r)) for t, r in all_variants), kg_euro, kg_ind),
+            lambda: grog_ranking(all_variants, kg_euro, kg_ind, t_lo=0.40, t_hi=0.65))
+        picked = ranking.top(target_rear, topk=4)
     figsz = (6.6, 1.25)
     cols_top = st.columns(2, gap="small")
     cols_bot = st.columns(2, gap="small")
@@ -786,40 +526,71 @@ if auto_on and all_variants:
         with slots[i]:
             draw_graph(f"{title_v} – Score {sc:.1f} – Heck {rear*100:.0f}%", rows_v,
                        figsize=figsz, weight_mode=False)
+    best_at = []
+    for title_v, _rows, _sc, _rear in picked:
+        spans = ", ".join(f"{a*100:.0f}–{b*100:.0f} %" for a, b in ranking.best_ranges(title_v))
+        if spans: best_at.append(f"{title_v}: {spans}")
+    if best_at:
+        st.caption("Platz 1 bei Ziel‑Heckanteil → " + " · ".join(best_at))
 elif auto_on and not all_variants:
     st.info("Keine Varianten vorhanden.")
+if anytime_live is None and "pf_anytime" in st.session_state:
+    st.session_state.pop("pf_anytime")[1].cancel()   # Anytime aus / andere Ansicht: laufende Suche beenden
+
+# ------------------ Kapazitätsmatrix (Was-wäre-wenn über alle Euro × Industrie) ------------------
+with st.expander("Kapazitätsmatrix: Euro × Industrie (optional)", expanded=False):
+    cap_on = st.toggle("Matrix berechnen", value=False,
+                       help="Für jede Kombination 0–40 Euro × 0–40 Industrie: Länge, passt (alle Paletten, "
+                            "Achslast-Grenzen), Achslast und bester Grog-Score – mit kg und Ziel-Heckanteil von oben.")
+    if cap_on:
+        cap = sp.lazy_import("capacity")   # numpy erst hier
+        cap_metric = st.radio("Heatmap", list(cap.METRICS), horizontal=True,
+                              format_func=lambda k: cap.METRICS[k][0])
+        with tr.span("capacity"):
+            cm = cap.capacity_matrix(cfg, exact_tail, kg_euro, kg_ind, target_rear, cfg_key=_cfg_key(cfg))
+            st.image(cap.heatmap_png(cm, cap_metric, mark=(euro_n, ind_n)))
+        mx = cm.max_euro_for(ind_n)
+        st.caption(f"Bei {ind_n} Industrie passen mit {kg_euro}/{kg_ind} kg höchstens **{mx} Euro** "
+                   f"(Achsgrenzen {cap.AXLE_LIMIT_FRONT_KG:.0f}/{cap.AXLE_LIMIT_REAR_KG:.0f} kg)."
+                   if mx >= 0 else f"Bei {ind_n} Industrie passt keine Kombination.")
+        if euro_n <= cap.MAX_EURO and ind_n <= cap.MAX_IND:
+            bv = int(cm.best_variant[euro_n, ind_n])
+            st.caption(f"Aktuell {euro_n} + {ind_n}: {int(cm.used_cm[euro_n, ind_n])} cm, "
+                       f"Front ≈ {cm.front_kg[euro_n, ind_n]:.0f} kg, Rear ≈ {cm.rear_kg[euro_n, ind_n]:.0f} kg"
+                       + (f", bester Grog: {cm.titles[bv]} (Score {cm.best_score[euro_n, ind_n]:.1f})" if bv >= 0 else "")
+                       + ("" if cm.fits[euro_n, ind_n] else " – **passt nicht**"))
 
 # ------------------ Varianten (2×2): IMMER anzeigen ------------------
 st.markdown("#### Vordefinierte Varianten (2×2)")
-variants_plain, _sk2, _tot2 = generate_variants_from_config(
-    cfg, euro_n, ind_n, exact_tail=exact_tail, weight_mode=False
-)
 figsz = (6.6, 1.25)
+with tr.span("variants", grid="plain"):
+    variants_plain, n_plain, page_plain, pages_plain = variants_paged(
+        "plain", cfg, euro_n, ind_n, exact_tail, False, figsize=figsz
+    )
 cols_top = st.columns(2, gap="small")
 cols_bot = st.columns(2, gap="small")
 slots = [cols_top[0], cols_top[1], cols_bot[0], cols_bot[1]]
-for i, (title_v, rows_v) in enumerate(variants_plain[:4]):
+for i, (title_v, rows_v) in enumerate(variants_plain):
     with slots[i]:
         draw_graph(title_v, rows_v, figsize=figsz, weight_mode=False, show_axle_note=False)
 
-if len(variants_plain) == 0:
+if n_plain == 0:
     st.info("Keine Varianten in der Konfig gefunden.")
-elif len(variants_plain) > 4:
-    st.caption(f"Es sind {len(variants_plain)} Varianten in der JSON. Momentan werden die ersten 4 gezeigt.")
+caption_page(n_plain, page_plain, pages_plain)
 
 # ===== Zusatz-Grid: Nur wenn Gewicht aktiv ist -> bevorzugt Heavy-Varianten aus JSON =====
 if weight_mode:
-    variants_heavy, _sk3, _tot3 = generate_variants_from_config(
-        cfg, euro_n, ind_n, exact_tail=exact_tail, weight_mode=True
-    )
-    if len(variants_heavy) == 0:
-        variants_heavy = variants_plain  # Fallback
     st.markdown("#### Varianten mit Gewichts-Logik (2×2)")
+    with tr.span("variants", grid="heavy"):
+        heavy_cfg = gallery.count_variants(cfg, euro_n, ind_n, True) > 0   # sonst Fallback: ohne Gewichtsfilter
+        variants_heavy, n_heavy, page_heavy, pages_heavy = variants_paged(
+            "heavy", cfg, euro_n, ind_n, exact_tail, heavy_cfg
+        )
     cols_top_w = st.columns(2, gap="small")
     cols_bot_w = st.columns(2, gap="small")
     slots_w = [cols_top_w[0], cols_top_w[1], cols_bot_w[0], cols_bot_w[1]]
 
-    for i, (title_v, rows_v) in enumerate(variants_heavy[:4]):
+    for i, (title_v, rows_v) in enumerate(variants_heavy):
         with slots_w[i]:
             if mode in ("Block vorne", "Block hinten"):
                 heavy_rows_v = set(range(len(rows_v))) if all_heavy else None
@@ -834,7 +605,8 @@ if weight_mode:
                     heavy_ind_count=hvy_i,
                     heavy_side=("rear" if mode=="Block hinten" else "front"),
                     heavy_rows=heavy_rows_v,
-                    show_axle_note=True
+                    show_axle_note=True,
+                    light_factor=light_pct / 100.0,
                 )
             elif mode == "Verteilen (Hecklast)":
                 total_pal_v = rows_pallets(rows_v)
@@ -851,11 +623,13 @@ if weight_mode:
                     kg_euro=kg_euro,
                     kg_ind=kg_ind,
                     heavy_rows=heavy_rows_v,
-                    show_axle_note=True
+                    show_axle_note=True,
+                    light_factor=light_pct / 100.0,
                 )
+    caption_page(n_heavy, page_heavy, pages_heavy)
 
 st.caption(
-    "Grafik 1360×240 cm. Grün=Euro längs (120×80), Blau=Euro quer (80×120), Orange=Industrie (120×100). "
+    "Grafik 1360×240 cm. Grün=Euro längs (120×80), Blau=Euro quer (80×120), Orange=Industrie (120×100), Rosa=Blumenwagen (135×57). "
     "Tail-Regel: In den letzten 4 Reihen keine Einzel-quer; letzte Reihe immer voll. "
     "„Exakt bis hinten (Euro)“ füllt 1360 cm ohne Heck-Luft. "
     "Varianten erweiterbar per JSON; Typen: all_long, rear_block, mixed_periodic, alt_block, "
@@ -863,3 +637,52 @@ st.caption(
     "Filter: n_exact / n_min / n_max / weight_required / weight_forbidden (+ euro_min/max, ind_min/max). "
     "Achslast-Schätzung ist grob (Hebelmodell)."
 )
+
+# ------------------ Startprofil (Kaltstart) ------------------
+if st.checkbox("Startprofil anzeigen", value=False,
+               help="Importzeiten je Modul und Zeit bis zur ersten Grafik (prozessweit, erster Start)."):
+    prof = sp.as_dict()
+    st.caption(f"First Paint: {prof['first_paint_ms']} ms · Importe gesamt: {prof['import_total_ms']} ms")
+    st.json(prof, expanded=False)
+    st.download_button("Startprofil (JSON) herunterladen",
+                       data=sp.lazy_import("json").dumps(prof, indent=2).encode("utf-8"),
+                       file_name="startup_profile.json", mime="application/json")
+
+# ------------------ Diagnose (Laufzeiten je Schritt) ------------------
+if st.checkbox("Diagnose: Laufzeiten je Schritt anzeigen", value=False, key="pf_diag",
+               help="Zeichnet bei jedem Lauf Spans auf (Layout, Varianten, Grog, Geometrie, Render, st.image). "
+                    "Ausgeschaltet ohne messbaren Overhead."):
+    events = tr.end_run()
+    with st.expander("Diagnose: dieser Lauf", expanded=True):
+        if not events:
+            st.caption("Aufzeichnung startet mit dem nächsten Lauf (Eingabe ändern oder neu laden).")
+        else:
+            top = [e for e in events if e.depth == 0]
+            st.caption(f"{len(events)} Spans · Summe oberste Ebene {sum(e.dur_us for e in top)/1000:.1f} ms")
+            cs = CACHE.stats()
+            st.caption(f"Gemeinsamer Cache: {cs['entries']} Einträge, {cs['bytes']/2**20:.1f} von "
+                       f"{cs['max_bytes']/2**20:.0f} MiB · Trefferquote {(cs['hit_rate'] or 0)*100:.0f} % "
+                       f"({cs['hits']} Treffer, {cs['misses']} neu, {cs['waits']} gewartet, "
+                       f"{cs['evictions']} verdrängt)")
+            ts = table_status()
+            st.caption(f"Antworttabelle (Clean): {ts}"
+                       + (" – neu bauen: python answer_table.py build" if ts == "veraltet" else ""))
+            ds = DISK.stats()
+            if DISK.enabled:
+                st.caption(f"Platten-Cache ({ds['root']}): {ds['hits']} Treffer, {ds['misses']} neu, "
+                           f"{ds['writes']} geschrieben, {ds['corrupt']} defekt verworfen")
+            lines = ["| Schritt | Anzahl | Summe ms | Max ms |", "|---|---:|---:|---:|"]
+            for r in tr.summary(events):
+                lines.append(f"| {'&nbsp;' * 4 * r['depth']}{r['span']} | {r['n']} | {r['total_ms']:.1f} | {r['max_ms']:.1f} |")
+            st.markdown("\n".join(lines), unsafe_allow_html=True)
+            st.download_button("Chrome-Trace (JSON) herunterladen",
+                               data=sp.lazy_import("json").dumps(tr.chrome_trace(events)).encode("utf-8"),
+                               file_name="paletten_fuchs_trace.json", mime="application/json",
+                               help="In chrome://tracing oder ui.perfetto.dev öffnen.")
+
+# ------------------ Anytime-Suche nachziehen (ganz am Ende: die Seite darüber ist schon vollständig) ------------------
+if anytime_live is not None:
+    while not anytime_done:
+        time.sleep(0.15)
+        # jeder st-Aufruf ist ein Abbruchpunkt: neue Eingaben beenden diese Schleife sofort
+        anytime_shown, anytime_done = anytime_show(*anytime_live, anytime_shown)
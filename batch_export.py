@@ -0,0 +1,239 @@
+# batch_export.py — Ladeblätter für viele Aufträge: ein mehrseitiges PDF oder ein ZIP mit PNGs
+# - Eingabe: Auftragsliste als JSON ([{...}] oder {"orders": [...]}) oder CSV mit Kopfzeile
+#   Felder wie plan_service (/plan) + "name" (Auftrag) + "plan": "clean" (Standard) | "grog" (bester Grog-Vorschlag)
+# - Je Auftrag eine Seite (A4 quer): Titel, Plan-Grafik, Paletten/Reihen/Länge, Gewicht, Achslast, Heckanteil
+# - Seiten entstehen parallel im Prozess-Pool; die Plan-Grafik kommt über render_trailer_png
+#   (Speicher-Cache je Worker + gemeinsamer Platten-Cache) – gleiche Pläne werden nur einmal gezeichnet
+# - Seite = Pillow-Raster (Grafik einkopiert, Text mit DejaVu Sans); PDF wird seitenweise mit eingebetteten JPEGs
+#   geschrieben, es liegen nie alle Seiten dekodiert im Speicher
+#
+# Lauf: python batch_export.py orders.json --pdf ladeplaene.pdf [--workers 4] [--dpi 150]
+#       python batch_export.py orders.csv  --zip ladeplaene.zip
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from planner import (
+    TRAILER_LEN_CM, cap_to_trailer, rows_length_cm, rows_pallets, rows_to_rects,
+    layout_for_preset_euro_stable, build_euro_exact_tail, layout_for_preset_industry,
+    generate_variants_from_config, grog_pick_best, estimate_axle_loads, _weight_split_grog,
+)
+from plan_service import normalize_request
+from sprites import font as _font
+
+PAGE_MM = (297, 210)          # A4 quer
+DEFAULT_DPI = 150
+JPEG_QUALITY = 85
+_INT_FIELDS = ("euro_n", "ind_n", "kg_euro", "kg_ind", "topk")
+
+# ------------------ Aufträge ------------------
+def _coerce_csv(row: Dict[str, str]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for k, v in row.items():
+        if k is None or v is None or v.strip() == "": continue
+        k, v = k.strip(), v.strip()
+        if k in _INT_FIELDS: out[k] = int(float(v))
+        elif k == "target_rear_share": out[k] = float(v.replace(",", "."))
+        elif k in ("exact_tail", "weight_mode"): out[k] = v.lower() in ("1", "true", "ja", "x", "yes")
+        else: out[k] = v
+    return out
+
+def parse_orders(data: bytes, filename: str = "") -> List[Dict]:
+    """JSON/CSV → geprüfte Aufträge (normalize_request + name + plan). Fehler → ValueError mit Zeilenangabe."""
+    text = data.decode("utf-8-sig")
+    is_csv = filename.lower().endswith(".csv") or not text.lstrip().startswith(("[", "{"))
+    if is_csv:
+        try:
+            dialect = csv.Sniffer().sniff(text.splitlines()[0] if text else ",", delimiters=",;\t")
+        except csv.Error:   # z. B. nur eine Spalte – kein Trenner zu erkennen
+            dialect = csv.excel
+        raw = list(csv.DictReader(io.StringIO(text), dialect=dialect))
+    else:
+        obj = json.loads(text)
+        raw = obj.get("orders") if isinstance(obj, dict) else obj
+        if not isinstance(raw, list): raise ValueError("JSON muss eine Liste oder {\"orders\": [...]} sein")
+    orders = []
+    for i, r in enumerate(raw, 1):
+        try:
+            if is_csv: r = _coerce_csv(r)
+            q = normalize_request(r)
+        except ValueError as e:
+            raise ValueError(f"Auftrag {i}: {e}") from None
+        q["name"] = str(r.get("name") or r.get("auftrag") or f"Auftrag {i}")
+        q["plan"] = str(r.get("plan", "clean")).lower()
+        if q["plan"] not in ("clean", "grog"): raise ValueError(f"Auftrag {i}: plan muss clean oder grog sein")
+        orders.append(q)
+    return orders
+
+def plan_rows(q: Dict) -> Tuple[str, List[Dict]]:
+    """(Variantenname, Reihen) für einen Auftrag – Clean wie in der App, sonst bester Grog-Vorschlag."""
+    euro_n, ind_n = q["euro_n"], q["ind_n"]
+    if q["plan"] == "grog":
+        variants, _sk, _tot = generate_variants_from_config(q["cfg"], euro_n, ind_n,
+                                                            exact_tail=q["exact_tail"], weight_mode=False)
+        best = grog_pick_best(variants, q["kg_euro"], q["kg_ind"], q["target_rear_share"], topk=1)
+        if best: return best[0][0], best[0][1]
+    rows: List[Dict] = []
+    if euro_n > 0:
+        rows += build_euro_exact_tail(euro_n) if q["exact_tail"] else layout_for_preset_euro_stable(euro_n, singles_front=0)
+    if ind_n > 0:
+        rows += layout_for_preset_industry(ind_n)
+    return f"Clean ({'exakt bis hinten' if q['exact_tail'] else 'stabil'})", rows
+
+# ------------------ Seite ------------------
+def sheet_lines(q: Dict, variant: str, rows: List[Dict]) -> List[str]:
+    capped = cap_to_trailer(rows)
+    rects = rows_to_rects(capped)
+    n_e = sum(1 for r in rects if r[5] == "EURO"); n_i = len(rects) - n_e
+    lines = [f"Plan: {variant}",
+             f"Paletten: {n_e} Euro + {n_i} Industrie = {n_e + n_i} (bestellt {q['euro_n']} + {q['ind_n']})",
+             f"Reihen: {len(capped)} · Ladelänge {rows_length_cm(capped)} von {TRAILER_LEN_CM} cm"]
+    if rows_pallets(capped) < rows_pallets(rows):
+        lines.append(f"ACHTUNG: {rows_pallets(rows) - rows_pallets(capped)} Paletten passen nicht auf den Trailer")
+    kg_e, kg_i = q["kg_euro"], q["kg_ind"]
+    if kg_e or kg_i:
+        front, rear, total = estimate_axle_loads(rows, kg_e, kg_i)
+        lines.append(f"Gewicht: ≈ {total:.0f} kg (Euro {n_e}×{kg_e} kg, Ind. {n_i}×{kg_i} kg)")
+        if total > 0:
+            lines.append(f"Achslast (grob): Front ≈ {front:.0f} kg ({100*front/total:.1f} %), "
+                         f"Rear ≈ {rear:.0f} kg ({100*rear/total:.1f} %)")
+        lines.append(f"Heckanteil: {_weight_split_grog(rows, kg_e, kg_i)*100:.0f} % "
+                     f"(Ziel {q['target_rear_share']*100:.0f} %)")
+    return lines
+
+@lru_cache(maxsize=64)
+def _plan_image(png: bytes, width: int):
+    """Plan-PNG dekodiert und auf Seitenbreite skaliert – je Worker einmal je Grafik (nicht verändern)."""
+    from PIL import Image
+    plan = Image.open(io.BytesIO(png)).convert("RGB")
+    return plan.resize((width, round(plan.height * width / plan.width)), Image.LANCZOS)
+
+def render_sheet(q: Dict, dpi: int = DEFAULT_DPI, fmt: str = "JPEG") -> bytes:
+    """Eine Seite als JPEG (für PDF) oder PNG (für ZIP). Läuft in Worker-Prozessen."""
+    from PIL import Image, ImageDraw
+    from render import render_trailer_png
+    W, H = (round(mm / 25.4 * dpi) for mm in PAGE_MM)
+    margin = round(12 / 25.4 * dpi)
+    page = Image.new("RGB", (W, H), "white")
+    d = ImageDraw.Draw(page)
+    y = margin
+    d.text((margin, y), f"Ladeplan – {q['name']}", font=_font(round(dpi * 0.22)), fill="black")
+    y += round(dpi * 0.38)
+    d.text((margin, y), time.strftime("%d.%m.%Y"), font=_font(round(dpi * 0.11)), fill="#555555")
+    y += round(dpi * 0.3)
+
+    variant, rows = plan_rows(q)
+    png = render_trailer_png("", rows_to_rects(cap_to_trailer(rows)), figsize=(8, 1.7))
+    plan = _plan_image(png, W - 2 * margin)
+    page.paste(plan, (margin, y))
+    y += plan.height + round(dpi * 0.25)
+
+    f = _font(round(dpi * 0.13))
+    for line in sheet_lines(q, variant, rows):
+        d.text((margin, y), line, font=f, fill="#b00020" if line.startswith("ACHTUNG") else "black")
+        y += round(dpi * 0.22)
+    d.text((margin, H - margin - round(dpi * 0.1)),
+           "Paletten Fuchs · Grün=Euro längs, Blau=Euro quer, Orange=Industrie · Achslast-Schätzung grob (Hebelmodell)",
+           font=_font(round(dpi * 0.09)), fill="#777777")
+    buf = io.BytesIO()
+    if fmt == "PNG": page.save(buf, "PNG", optimize=False)
+    else: page.save(buf, "JPEG", quality=JPEG_QUALITY, dpi=(dpi, dpi))
+    return buf.getvalue()
+
+def _render_job(args: Tuple[Dict, int, str]) -> bytes:
+    return render_sheet(*args)
+
+def render_sheets(orders: List[Dict], dpi: int = DEFAULT_DPI, fmt: str = "JPEG",
+                  workers: Optional[int] = None) -> Iterator[bytes]:
+    """Seiten in Auftragsreihenfolge; workers=0 → im aktuellen Prozess (z. B. in der App)."""
+    jobs = [(q, dpi, fmt) for q in orders]
+    if workers == 0 or len(orders) <= 1:
+        yield from map(_render_job, jobs); return
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=min(workers, len(orders))) as ex:
+        yield from ex.map(_render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+
+# ------------------ Ausgabe ------------------
+def _jpeg_size(data: bytes) -> Tuple[int, int]:
+    from PIL import Image
+    with Image.open(io.BytesIO(data)) as im: return im.size
+
+def write_pdf(pages: Iterable[bytes], fh: BinaryIO, dpi: int = DEFAULT_DPI) -> int:
+    """Minimales PDF: je Seite ein JPEG (DCTDecode) seitenfüllend. Schreibt fortlaufend, gibt Seitenzahl zurück."""
+    offsets: List[int] = []
+    pos = 0
+    def out(b: bytes):
+        nonlocal pos
+        fh.write(b); pos += len(b)
+    def obj(num: int, body: bytes, stream: Optional[bytes] = None):
+        while len(offsets) < num: offsets.append(0)
+        offsets[num - 1] = pos
+        out(f"{num} 0 obj\n".encode() + body)
+        if stream is not None: out(b"\nstream\n"); out(stream); out(b"\nendstream")
+        out(b"\nendobj\n")
+    out(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    kids = []
+    n = 0
+    for jpg in pages:
+        w, h = _jpeg_size(jpg)
+        pw, ph = w * 72.0 / dpi, h * 72.0 / dpi
+        base = 3 + 3 * n                      # 1 = Katalog, 2 = Seitenbaum
+        content = f"q {pw:.2f} 0 0 {ph:.2f} 0 0 cm /Im0 Do Q".encode()
+        obj(base, f"<< /Type /XObject /Subtype /Image /Width {w} /Height {h} /ColorSpace /DeviceRGB "
+                  f"/BitsPerComponent 8 /Filter /DCTDecode /Length {len(jpg)} >>".encode(), jpg)
+        obj(base + 1, f"<< /Length {len(content)} >>".encode(), content)
+        obj(base + 2, f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {pw:.2f} {ph:.2f}] "
+                      f"/Resources << /XObject << /Im0 {base} 0 R >> >> /Contents {base + 1} 0 R >>".encode())
+        kids.append(f"{base + 2} 0 R")
+        n += 1
+    obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    obj(2, f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {n} >>".encode())
+    xref = pos
+    out(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode())
+    for off in offsets: out(f"{off:010d} 00000 n \n".encode())
+    out(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return n
+
+def _safe_name(s: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in s).strip("_") or "auftrag"
+
+def export_pdf(orders: List[Dict], fh: BinaryIO, dpi: int = DEFAULT_DPI, workers: Optional[int] = None) -> int:
+    return write_pdf(render_sheets(orders, dpi, "JPEG", workers), fh, dpi)
+
+def export_zip(orders: List[Dict], fh: BinaryIO, dpi: int = DEFAULT_DPI, workers: Optional[int] = None) -> int:
+    n = 0
+    with zipfile.ZipFile(fh, "w", compression=zipfile.ZIP_STORED) as zf:   # PNG ist schon komprimiert
+        for i, (q, png) in enumerate(zip(orders, render_sheets(orders, dpi, "PNG", workers)), 1):
+            zf.writestr(f"{i:03d}_{_safe_name(q['name'])}.png", png); n += 1
+    return n
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Ladeblätter (PDF/ZIP) für eine Auftragsliste")
+    ap.add_argument("orders", help="JSON oder CSV")
+    g = ap.add_mutually_exclusive_group(required=True)
+    g.add_argument("--pdf"); g.add_argument("--zip")
+    ap.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    ap.add_argument("--workers", type=int, default=None, help="Prozesse (Standard: alle Kerne, 0 = ohne Pool)")
+    args = ap.parse_args(argv)
+    with open(args.orders, "rb") as fh:
+        orders = parse_orders(fh.read(), args.orders)
+    t = time.perf_counter()
+    target = args.pdf or args.zip
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        n = (export_pdf if args.pdf else export_zip)(orders, fh, args.dpi, args.workers)
+    os.replace(tmp, target)
+    print(f"{n} Seiten → {target} ({time.perf_counter() - t:.1f} s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+# bench.py — Benchmark-Suite: Layout-Bausteine, Varianten, Grog, Grafik, paletten-fuchs, custom_layouts
+# - Jeder Fall: einmal aufwärmen, dann `--repeat` Messreihen; je Reihe so viele Aufrufe, dass sie ≥ 20 ms dauert
+# - Ergebnis als JSON (Median/Min je Aufruf in µs) – Standard: bench_output.txt (in .gitignore)
+# - Vergleich gegen eine frühere Ausgabe: --baseline <json> [--threshold 0.20] → Exit-Code 1 bei Regression
+#
+# Lauf:       python bench.py [--group builders,variants,scoring,render,pf,custom] [--repeat 5]
+# Baseline:   cp bench_output.txt bench_base.json   (nach einem Lauf auf dem Referenzstand)
+# Vergleich:  python bench.py --baseline bench_base.json
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+if HERE not in sys.path: sys.path.insert(0, HERE)
+
+import planner as P
+
+DEFAULT_OUT = os.path.join(HERE, "bench_output.txt")
+MIN_SAMPLE_S = 0.02
+N_RANGE = range(0, 41)
+
+_CASES: List[Tuple[str, str, Callable[[], Callable[[], object]]]] = []   # (Gruppe, Name, Setup -> Aufruf)
+
+def case(group: str, name: str):
+    def deco(setup):
+        _CASES.append((group, name, setup)); return setup
+    return deco
+
+def _quiet_streamlit():
+    import streamlit  # noqa: F401 – Logger existieren erst nach dem Import
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"): logging.getLogger(name).setLevel(logging.ERROR)
+
+# ------------------ builders: n = 0–40 je Baustein ------------------
+def _sweep(fn):
+    return lambda: [fn(n) for n in N_RANGE]
+
+for _name, _fn in (
+    ("layout_for_preset_euro_stable", lambda n: P.layout_for_preset_euro_stable(n, singles_front=0)),
+    ("build_euro_exact_tail",         P.build_euro_exact_tail),
+    ("build_euro_all_long",           lambda n: P.build_euro_all_long(n, exact_tail=False)),
+    ("build_euro_rear_2trans_block",  lambda n: P.build_euro_rear_2trans_block(n, approx_block=15, exact_tail=False)),
+    ("build_euro_mixed_periodic",     lambda n: P.build_euro_mixed_periodic(n, period=4, exact_tail=False)),
+    ("build_euro_alt_pattern",        lambda n: P.build_euro_alt_pattern(n, exact_tail=False)),
+    ("build_euro_heavy_auto_rear",    lambda n: P.build_euro_heavy_auto_rear(n, exact_tail=False, params={})),
+    ("build_euro_light_auto_mix",     lambda n: P.build_euro_light_auto_mix(n, exact_tail=False, params={})),
+    ("build_euro_recipe",             lambda n: P.build_euro_recipe([3] * (n // 3) + [2] * (n % 3 == 2) + [1] * (n % 3 == 1))),
+    ("layout_for_preset_industry",    P.layout_for_preset_industry),
+):
+    case("builders", f"{_name}[0-40]")(lambda fn=_fn: _sweep(fn))
+
+@case("builders", "enforce_tail_no_single[0-40]")
+def _enforce():
+    # Eingabe mit Singles im Heck, damit der Guard wirklich arbeiten muss
+    inputs = [([P.euro_row_long()] * (n // 3) + [P.euro_row_trans1()] * (n % 3), n) for n in N_RANGE]
+    return lambda: [P.enforce_tail_no_single(rows, n) for rows, n in inputs]
+
+# ------------------ variants ------------------
+def _huge_cfg(n: int = 2000, seed: int = 7) -> dict:
+    rnd = random.Random(seed)
+    types = ["all_long", "rear_block", "mixed_periodic", "alt_block", "heavy_auto_rear", "light_auto_mix", "recipe"]
+    out = []
+    for i in range(n):
+        t = rnd.choice(types)
+        v = {"title": f"V{i}", "type": t, "industry_position": rnd.choice(["front", "rear"])}
+        if t == "rear_block": v["approx_block"] = rnd.randint(1, 15)
+        if t in ("mixed_periodic", "light_auto_mix"): v["period"] = rnd.randint(2, 8)
+        if t == "heavy_auto_rear": v["target_rear_share"] = round(rnd.uniform(0.3, 0.6), 2)
+        if t == "recipe": v["rows"] = [rnd.choice([3, 3, 2]) for _ in range(rnd.randint(5, 11))]
+        out.append(v)
+    return {"variants": out}
+
+@case("variants", "generate_variants_from_config[default,26+4]")
+def _gen_small():
+    return lambda: P.generate_variants_from_config(P.DEFAULT_CFG, 26, 4, exact_tail=False)
+
+@case("variants", "generate_variants_from_config[2000,26+4]")
+def _gen_huge():
+    cfg = _huge_cfg()
+    return lambda: P.generate_variants_from_config(cfg, 26, 4, exact_tail=False)
+
+# ------------------ scoring ------------------
+def _variants_huge():
+    return P.generate_variants_from_config(_huge_cfg(), 26, 4, exact_tail=False)[0]
+
+@case("scoring", "score_layout_grog[warm]")
+def _score_warm():
+    rows = P.generate_variants_from_config(P.DEFAULT_CFG, 26, 4, exact_tail=False)[0][2][1]
+    return lambda: P.score_layout_grog(rows, kg_euro=700, kg_ind=900)
+
+@case("scoring", "score_layout_grog[kalt]")
+def _score_cold():
+    rows = P.generate_variants_from_config(P.DEFAULT_CFG, 26, 4, exact_tail=False)[0][2][1]
+    def run():
+        P._metrics_for_code.cache_clear()
+        return P.score_layout_grog(rows, kg_euro=700, kg_ind=900)
+    return run
+
+@case("scoring", "grog_pick_best[2000]")
+def _pick():
+    vs = _variants_huge()
+    return lambda: P.grog_pick_best(vs, 700, 900, 0.52, topk=4)
+
+@case("scoring", "grog_ranking[2000,kalt]")
+def _ranking():
+    vs = _variants_huge()
+    def run():
+        P._grog_ranking_cached.cache_clear()
+        return P.grog_ranking(vs, 700, 900)
+    return run
+
+@case("scoring", "grog_ranking[2000,kg neu]")
+def _ranking_kg():
+    vs = _variants_huge()
+    kg = [600]
+    def run():   # jede kg-Änderung: Rangfolge neu (kg wiederholt sich nie → Cache-Fehltreffer), Kennzahlen warm
+        kg[0] += 1
+        return P.grog_ranking(vs, kg[0], 900)
+    return run
+
+@case("scoring", "pareto_front[2000]")
+def _pareto():
+    vs = _variants_huge()
+    return lambda: P.pareto_front(vs, 700, 900)
+
+@case("scoring", "capacity_matrix[41×41,kg neu]")
+def _capacity():
+    import capacity
+    capacity.capacity_matrix()   # Kennzahlen-Gitter einmal (gemeinsamer Cache), gemessen wird die Neuberechnung je kg
+    kg = [600]
+    def run():
+        kg[0] = 600 + (kg[0] + 10) % 400
+        return capacity.capacity_matrix(kg_euro=kg[0], kg_ind=900)
+    return run
+
+# ------------------ render: draw_graph aus app.py (Streamlit im Bare-Modus) ------------------
+_APP = {}
+
+def _app_module():
+    if "mod" not in _APP:
+        import importlib.util
+        _quiet_streamlit()
+        spec = importlib.util.spec_from_file_location("pf_bench_app", os.path.join(HERE, "app.py"))
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)   # ein kompletter Skriptlauf ohne Server; danach ist draw_graph nutzbar
+        _APP["mod"] = mod
+    return _APP["mod"]
+
+@case("render", "draw_graph[clean,33]")
+def _draw_clean():
+    app = _app_module()
+    rows = P.layout_for_preset_euro_stable(33)
+    return lambda: app.draw_graph("Bench", rows, figsize=(8, 1.7))
+
+@case("render", "draw_graph[gewicht,26+4]")
+def _draw_weight():
+    app = _app_module()
+    rows = P.generate_variants_from_config(P.DEFAULT_CFG, 26, 4, exact_tail=False)[0][1][1]
+    return lambda: app.draw_graph("Bench", rows, figsize=(6.6, 1.25), weight_mode=True, kg_euro=700,
+                                  kg_ind=900, heavy_euro_count=10, heavy_side="rear", show_axle_note=True)
+
+# ------------------ pf: paletten-fuchs Rasterplatzierung (ein Skriptlauf) ------------------
+def _pf_apptest(counts: List[int]):
+    from streamlit.testing.v1 import AppTest
+    _quiet_streamlit()
+    at = AppTest.from_file(os.path.join(HERE, "paletten-fuchs"), default_timeout=120)
+    at.run()
+    for idx, n in enumerate(counts):
+        at.checkbox(key=f"aktiv_{idx}").set_value(True); at.run()
+        at.number_input(key=f"a_{idx}").set_value(n)
+    return lambda: at.run()
+
+@case("pf", "paletten-fuchs[1 Typ, 40 Stk.]")
+def _pf_one():
+    return _pf_apptest([40])
+
+@case("pf", "paletten-fuchs[3 Typen, 3×15 Stk.]")
+def _pf_three():
+    return _pf_apptest([15, 15, 15])
+
+# ------------------ custom: custom_layouts Canvas-Commit ------------------
+@case("custom", "custom_layouts._commit_from_canvas[30 Objekte]")
+def _custom_commit():
+    _quiet_streamlit()
+    import streamlit as st
+    import custom_layouts as cl
+    cl._ensure()
+    st.session_state[cl._SS_LOCKED] = False
+    st.session_state[cl._SS_OBJS] = []
+    for k in range(30): cl._add(("EURO_LONG", "EURO_TRANS", "IND")[k % 3])
+    base = [dict(o) for o in st.session_state[cl._SS_OBJS]]
+    moved = {"objects": [dict(o, left=o["left"] + 13, top=o["top"] + 7) for o in base]}
+    def run():
+        st.session_state[cl._SS_OBJS] = [dict(o) for o in base]
+        cl._commit_from_canvas(moved)
+    return run
+
+# ------------------ Messen / Vergleichen ------------------
+def measure(fn: Callable[[], object], repeat: int) -> Dict:
+    fn()   # aufwärmen (Importe, Caches)
+    number = 1
+    while True:
+        t = time.perf_counter()
+        for _ in range(number): fn()
+        dt = time.perf_counter() - t
+        if dt >= MIN_SAMPLE_S or number >= 1 << 20: break
+        number *= 2 if dt <= 0 else max(2, int(MIN_SAMPLE_S / dt * 1.2))
+    samples = [dt / number]
+    for _ in range(repeat - 1):
+        t = time.perf_counter()
+        for _ in range(number): fn()
+        samples.append((time.perf_counter() - t) / number)
+    return {"median_us": round(statistics.median(samples) * 1e6, 2),
+            "min_us": round(min(samples) * 1e6, 2), "calls": number, "repeat": repeat}
+
+def run(groups: Optional[List[str]], repeat: int) -> Dict:
+    results: Dict[str, Dict] = {}
+    for group, name, setup in _CASES:
+        if groups and group not in groups: continue
+        key = f"{group}/{name}"
+        try:
+            results[key] = measure(setup(), repeat)
+        except Exception as e:   # ein kaputter Fall soll den Rest nicht verhindern
+            results[key] = {"error": f"{type(e).__name__}: {e}"}
+        r = results[key]
+        print(f"{key:<62} " + (f"{r['median_us']:>12.1f} µs" if "median_us" in r else r["error"]), flush=True)
+    return {"meta": {"python": platform.python_version(), "platform": platform.platform(),
+                     "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "repeat": repeat},
+            "results": results}
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Regressionen: Median langsamer als Baseline × (1 + threshold)."""
+    bad = []
+    print(f"\n{'Fall':<62} {'Baseline':>12} {'Jetzt':>12} {'Faktor':>8}")
+    for key, cur in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if not base or "median_us" not in base or "median_us" not in cur: continue
+        ratio = cur["median_us"] / base["median_us"] if base["median_us"] > 0 else 1.0
+        flag = ""
+        if ratio > 1.0 + threshold: flag = "  REGRESSION"; bad.append(key)
+        print(f"{key:<62} {base['median_us']:>12.1f} {cur['median_us']:>12.1f} {ratio:>7.2f}×{flag}")
+    return bad
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark-Suite Paletten Fuchs")
+    ap.add_argument("--group", default="", help="Kommagetrennt: builders,variants,scoring,render,pf,custom")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--out", default=DEFAULT_OUT)
+    ap.add_argument("--baseline", default=None, help="frühere JSON-Ausgabe zum Vergleich")
+    ap.add_argument("--threshold", type=float, default=0.20, help="erlaubte Verlangsamung (0.20 = +20 %)")
+    args = ap.parse_args(argv)
+    groups = [g for g in args.group.split(",") if g] or None
+    current = run(groups, max(1, args.repeat))
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(current, fh, ensure_ascii=False, indent=2)
+    print(f"\n→ {args.out}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            bad = compare(current, json.load(fh), args.threshold)
+        if bad:
+            print(f"\n{len(bad)} Regression(en) über {args.threshold*100:.0f} %")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
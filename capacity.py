@@ -0,0 +1,204 @@
+# capacity.py — Kapazitätsmatrix: alle Euro × Industrie-Kombinationen auf einmal („was passt noch drauf?“)
+# - Je (euro_n, ind_n): Clean-Layout (wie die App) + jede Konfig-Variante → kg-unabhängige Kennzahlen
+#   (Länge, Rechteckzahlen, x-Momentsummen, fester Grog-Anteil). Einmal je Konfig/exact_tail gerechnet,
+#   im gemeinsamen Cache + Platten-Cache
+# - Für konkrete kg und Ziel-Heckanteil: Achslast, Heckanteil und bester Grog-Score als NumPy-Ausdrücke über
+#   die ganze Matrix – dieselben Momentsummen wie planner.estimate_axle_loads/_rear_share_of, keine Schleife
+# - Grog-Score = fester Anteil (Tail, letzte Reihe, freie Länge, Wechsel) + w_rear_dev·(Heck − Ziel)²;
+#   der feste Anteil ist score_layout_grog mit Ziel = eigener Heckanteil (Abweichung 0)
+# - passt = Clean-Layout ≤ 1360 cm mit allen Paletten und Achslasten unter den Grenzen (weight_risk)
+# - heatmap_png: Matrix als Heatmap (Pillow), eine Kennzahl je Bild, aktuelle Eingabe umrandet
+#
+# Lauf: python capacity.py [--kg-euro 700 --kg-ind 900 --exact-tail]   → Tabelle max. Euro je Industrie
+
+import argparse
+import inspect
+import sys
+from typing import Dict, List, NamedTuple, Optional
+
+import planner
+from planner import (
+    TRAILER_LEN_CM, DEFAULT_CFG, layout_metrics, rows_length_cm,
+    variant_specs, build_variant, score_layout_grog, _weight_split_grog,
+)
+import answer_table
+from answer_table import build_rows
+from disk_cache import DISK, code_fingerprint
+from shared_cache import CACHE
+from weight_risk import AXLE_LIMIT_FRONT_KG, AXLE_LIMIT_REAR_KG
+
+MAX_EURO = 40
+MAX_IND = 40
+_W_REAR_DEV = inspect.signature(score_layout_grog).parameters["w_rear_dev"].default
+_N = ("n_euro", "n_ind", "sx_euro", "sx_ind")
+
+class CapacityMatrix(NamedTuple):
+    """Arrays der Form (MAX_EURO+1, MAX_IND+1); Index [euro_n, ind_n]."""
+    used_cm: "np.ndarray"        # Clean-Layout, ungekappt
+    fits: "np.ndarray"           # bool: alle Paletten drauf, Länge + Achslasten ok
+    front_kg: "np.ndarray"
+    rear_kg: "np.ndarray"
+    rear_share: "np.ndarray"     # Clean-Layout, Heckanteil des Gewichts
+    best_score: "np.ndarray"     # bester Grog-Score über alle Varianten (inf: keine passende Variante)
+    best_variant: "np.ndarray"   # Index in titles, -1: keine
+    titles: List[str]
+
+    def max_euro_for(self, ind_n: int) -> int:
+        """Größte Euro-Zahl, die bei ind_n Industrie noch passt (-1: nicht einmal 0 Euro)."""
+        ok = self.fits[:, ind_n].nonzero()[0]
+        return int(ok[-1]) if len(ok) else -1
+
+    def to_json(self) -> Dict:
+        import numpy as np
+        best = np.where(np.isfinite(self.best_score), np.round(self.best_score, 2), -1.0)
+        return {"max_euro": MAX_EURO, "max_ind": MAX_IND, "titles": self.titles,
+                "used_cm": self.used_cm.tolist(), "fits": self.fits.tolist(),
+                "front_kg": np.round(self.front_kg, 1).tolist(), "rear_kg": np.round(self.rear_kg, 1).tolist(),
+                "rear_share": np.round(self.rear_share, 4).tolist(),
+                "best_score": best.tolist(), "best_variant": self.best_variant.tolist(),
+                "max_euro_for_ind": [self.max_euro_for(i) for i in range(MAX_IND + 1)]}
+
+# ------------------ kg-unabhängige Kennzahlen (einmal je Konfig) ------------------
+def _grid_compute(cfg: dict, exact_tail: bool) -> Dict[str, list]:
+    """Flache Listen (marshal-bar): clean_* je Paar, var_* je Paar × Variante (Variante fehlt → fixed = None)."""
+    n_var = len(cfg.get("variants", []))
+    g: Dict[str, list] = {k: [] for k in ("clean_used", "clean_pallets") + tuple("clean_" + f for f in _N)
+                          + ("var_fixed",) + tuple("var_" + f for f in _N)}
+    for e in range(MAX_EURO + 1):
+        for i in range(MAX_IND + 1):
+            rows = build_rows(e, i, exact_tail, "clean")
+            m = layout_metrics(rows)
+            g["clean_used"].append(rows_length_cm(rows))
+            g["clean_pallets"].append(m.pallets)   # nach cap_to_trailer – Builder lassen Überzähliges weg
+            for f in _N: g["clean_" + f].append(float(getattr(m, f)))
+            by_idx = dict(variant_specs(cfg, e, i, False)[0])
+            for idx in range(n_var):
+                if idx not in by_idx:
+                    g["var_fixed"].append(None)
+                    for f in _N: g["var_" + f].append(0.0)
+                    continue
+                _t, vrows = build_variant(cfg, idx, by_idx[idx], e, i, exact_tail)
+                vm = layout_metrics(vrows)
+                g["var_fixed"].append(score_layout_grog(vrows, target_rear_share=_weight_split_grog(vrows, 0, 0)))
+                for f in _N: g["var_" + f].append(float(getattr(vm, f)))
+    return g
+
+def _grid(cfg: dict, cfg_key: str, exact_tail: bool):
+    import numpy as np
+    key = ("capacity", cfg_key, bool(exact_tail), MAX_EURO, MAX_IND)
+    def load():
+        g = DISK.get_or_compute("capacity", code_fingerprint(planner, answer_table, sys.modules[__name__]), key,
+                                lambda: _grid_compute(cfg, exact_tail))
+        shape, vshape = (MAX_EURO + 1, MAX_IND + 1), (MAX_EURO + 1, MAX_IND + 1, len(cfg.get("variants", [])))
+        out = {k: np.asarray(v, dtype=float).reshape(shape) for k, v in g.items() if k.startswith("clean_")}
+        out.update({k: np.asarray(v, dtype=float).reshape(vshape) for k, v in g.items() if k.startswith("var_")
+                    and k != "var_fixed"})
+        out["var_fixed"] = np.asarray([np.inf if v is None else v for v in g["var_fixed"]], dtype=float).reshape(vshape)
+        for a in out.values(): a.flags.writeable = False   # liegt im gemeinsamen Cache
+        return out
+    return CACHE.get_or_compute(key, load)
+
+# ------------------ Matrix für konkrete Gewichte ------------------
+def capacity_matrix(cfg: Optional[dict] = None, exact_tail: bool = False, kg_euro: int = 700, kg_ind: int = 900,
+                    target_rear_share: float = 0.52, cfg_key: Optional[str] = None,
+                    limit_front_kg: float = AXLE_LIMIT_FRONT_KG,
+                    limit_rear_kg: float = AXLE_LIMIT_REAR_KG) -> CapacityMatrix:
+    """Alle (euro_n, ind_n) auf einmal. cfg_key: Cache-Schlüssel für cfg (Standard: JSON von cfg)."""
+    import numpy as np
+    cfg = DEFAULT_CFG if cfg is None else cfg
+    if cfg_key is None:
+        import json
+        cfg_key = "default" if cfg is DEFAULT_CFG else json.dumps(cfg, sort_keys=True)
+    g = _grid(cfg, cfg_key, exact_tail)
+    L = float(TRAILER_LEN_CM)
+
+    # Achslast Clean (wie estimate_axle_loads: kg ≤ 0 zählt 0)
+    we, wi = max(0, kg_euro), max(0, kg_ind)
+    W = we * g["clean_n_euro"] + wi * g["clean_n_ind"]
+    rear_kg = np.where(W > 0, (we * g["clean_sx_euro"] + wi * g["clean_sx_ind"]) / L, 0.0)
+    front_kg = np.maximum(0.0, W - rear_kg)
+    rear_share = np.where(W > 0, rear_kg / np.where(W > 0, W, 1.0), 0.5)
+    asked = np.add.outer(np.arange(MAX_EURO + 1), np.arange(MAX_IND + 1))
+    fits = ((g["clean_used"] <= TRAILER_LEN_CM) & (g["clean_pallets"] == asked)
+            & (front_kg <= limit_front_kg) & (rear_kg <= limit_rear_kg))
+
+    # Grog über alle Varianten (wie _rear_share_of: kg = 0 zählt 1)
+    ge, gi = float(kg_euro or 1.0), float(kg_ind or 1.0)
+    Wv = ge * g["var_n_euro"] + gi * g["var_n_ind"]
+    rv = np.clip((ge * g["var_sx_euro"] + gi * g["var_sx_ind"]) / L / np.where(Wv > 0, Wv, 1.0), 0.0, 1.0)
+    rv = np.where(g["var_n_euro"] + g["var_n_ind"] > 0, np.where(Wv > 0, rv, 0.5), 0.5)
+    score = g["var_fixed"] + _W_REAR_DEV * (rv - target_rear_share) ** 2
+    if score.shape[2]:
+        best_variant = np.argmin(score, axis=2)
+        best_score = np.take_along_axis(score, best_variant[..., None], axis=2)[..., 0]
+        best_variant = np.where(np.isfinite(best_score), best_variant, -1)
+    else:
+        best_score = np.full(W.shape, np.inf); best_variant = np.full(W.shape, -1)
+    titles = [v.get("title", f"Var {k+1}") for k, v in enumerate(cfg.get("variants", []))]
+    return CapacityMatrix(g["clean_used"].astype(int), fits, front_kg, rear_kg, rear_share,
+                          best_score, best_variant, titles)
+
+# ------------------ Heatmap (Pillow, ohne matplotlib) ------------------
+METRICS = {   # Name → (Beschriftung, Wert aus der Matrix, klein = gut)
+    "free_cm": ("Freie Länge (cm)", lambda cm: TRAILER_LEN_CM - cm.used_cm, False),
+    "best_score": ("Bester Grog-Score", lambda cm: cm.best_score, True),
+    "rear_share": ("Heckanteil Clean (%)", lambda cm: cm.rear_share * 100.0, False),
+}
+_STOPS = ((0.0, (26, 152, 80)), (0.5, (254, 224, 139)), (1.0, (215, 48, 39)))   # grün → gelb → rot
+
+def _colormap(t: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+    out = np.zeros(t.shape + (3,))
+    for (a, ca), (b, cb) in zip(_STOPS, _STOPS[1:]):
+        m = (t >= a) & (t <= b)
+        u = ((t - a) / (b - a))[..., None]
+        out = np.where(m[..., None], np.asarray(ca) * (1 - u) + np.asarray(cb) * u, out)
+    return out.astype("uint8")
+
+def heatmap_png(cm: CapacityMatrix, metric: str = "free_cm", mark: Optional[tuple] = None, cell: int = 14) -> bytes:
+    """Matrix als Heatmap: x = Industrie, y = Euro (0 unten); passt nicht → grau; mark = (euro_n, ind_n)."""
+    import io
+    import numpy as np
+    from PIL import Image, ImageDraw
+    from sprites import font
+    label, get, low_good = METRICS[metric]
+    v = np.asarray(get(cm), dtype=float)
+    ok = cm.fits & np.isfinite(v)
+    lo, hi = (float(v[ok].min()), float(v[ok].max())) if ok.any() else (0.0, 1.0)
+    t = np.clip((v - lo) / ((hi - lo) or 1.0), 0.0, 1.0)
+    rgb = np.where(ok[..., None], _colormap(t if low_good else 1.0 - t), np.uint8(215))
+    grid = Image.fromarray(np.ascontiguousarray(rgb[::-1]), "RGB").resize(
+        (rgb.shape[1] * cell, rgb.shape[0] * cell), Image.NEAREST)
+    f = font(max(9, cell - 3))
+    ml, mb, mt = 4 * cell, 3 * cell, 2 * cell
+    img = Image.new("RGB", (grid.width + ml + cell, grid.height + mb + mt), "white")
+    img.paste(grid, (ml, mt))
+    d = ImageDraw.Draw(img)
+    for k in range(0, MAX_IND + 1, 5):
+        d.text((ml + k * cell + cell / 2, mt + grid.height + 3), str(k), font=f, fill="black", anchor="ma")
+    for k in range(0, MAX_EURO + 1, 5):
+        d.text((ml - 4, mt + (MAX_EURO - k) * cell + cell / 2), str(k), font=f, fill="black", anchor="rm")
+    d.text((ml + grid.width / 2, img.height - 4), "Industrie-Paletten", font=f, fill="black", anchor="md")
+    d.text((4, mt - 6), "Euro", font=f, fill="black", anchor="ld")
+    d.text((ml + grid.width, mt - 6), f"{label}: {lo:.0f} … {hi:.0f} (grau: passt nicht)", font=f, fill="#444444", anchor="rd")
+    if mark is not None and 0 <= mark[0] <= MAX_EURO and 0 <= mark[1] <= MAX_IND:
+        x0, y0 = ml + mark[1] * cell, mt + (MAX_EURO - mark[0]) * cell
+        d.rectangle([x0 - 1, y0 - 1, x0 + cell, y0 + cell], outline="black", width=2)
+    buf = io.BytesIO()
+    img.save(buf, "PNG", compress_level=1)
+    return buf.getvalue()
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Kapazitätsmatrix Euro × Industrie (Paletten Fuchs)")
+    ap.add_argument("--kg-euro", type=int, default=700)
+    ap.add_argument("--kg-ind", type=int, default=900)
+    ap.add_argument("--target", type=float, default=0.52)
+    ap.add_argument("--exact-tail", action="store_true")
+    args = ap.parse_args(argv)
+    cm = capacity_matrix(None, args.exact_tail, args.kg_euro, args.kg_ind, args.target)
+    print("Industrie  max. Euro")
+    for i in range(MAX_IND + 1):
+        print(f"{i:9d}  {cm.max_euro_for(i):9d}")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,22 @@
 # custom_layouts.py — Presets-Editor (stabil, Snap, pfid, default gesperrt)
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
+import sys
+import time
 import streamlit as st
 
-try:
-    from streamlit_drawable_canvas import st_canvas
-    _HAS_CANVAS = True
-except Exception as _e:
-    st.warning(f"Drawable-Canvas nicht verfügbar: {_e!s}")
-    _HAS_CANVAS = False
+# Drawable-Canvas erst laden, wenn der Editor gezeigt wird (Kaltstart); Ergebnis wird gemerkt
+_CANVAS: Dict[str, Any] = {"fn": None, "err": None, "tried": False}
+
+def _load_canvas():
+    if not _CANVAS["tried"]:
+        _CANVAS["tried"] = True
+        try:
+            import startup_profile as sp
+            _CANVAS["fn"] = sp.lazy_import("streamlit_drawable_canvas").st_canvas
+        except Exception as _e:
+            _CANVAS["err"] = _e
+    return _CANVAS["fn"]
 
 TRAILER_LEN_CM = 1360
 TRAILER_W_CM   = 240
@@ -28,6 +36,9 @@ _SS_NEXTPID  = "pf_next_pid"      # fortlaufende, persistente ID
 _SS_LOCKED   = "pf_locked"        # True => gesperrt (kein Drag)
 _SS_EDIT     = "pf_edit_drag"     # True => Edit/Drag-Modus aktiv
 _SS_SNAP_X   = "pf_snap_x"        # X-Raster (cm)
+_SS_AUTO_MSG = "pf_auto_msg"      # Ergebnis-Hinweis vom Auto-Vervollständigen
+_SS_HIST     = "pf_history"       # Undo/Redo-Verlauf (_History)
+_SS_SKIPCOMMIT = "pf_skip_commit" # True => nächsten Canvas-Commit auslassen (nach Undo/Redo)
 
 def _ensure():
     if _SS_PRESETS not in st.session_state: st.session_state[_SS_PRESETS] = []
@@ -38,6 +49,9 @@ def _ensure():
     if _SS_LOCKED not in st.session_state:  st.session_state[_SS_LOCKED]  = True   # <<< standard: gesperrt
     if _SS_EDIT not in st.session_state:    st.session_state[_SS_EDIT]    = False  # <<< Drag aus
     if _SS_SNAP_X not in st.session_state:  st.session_state[_SS_SNAP_X]  = 10
+    if _SS_AUTO_MSG not in st.session_state: st.session_state[_SS_AUTO_MSG] = ""
+    if _SS_HIST not in st.session_state:    st.session_state[_SS_HIST]    = _History(past=[], future=[])
+    if _SS_SKIPCOMMIT not in st.session_state: st.session_state[_SS_SKIPCOMMIT] = False
 
 def get_active_meta() -> UserMeta:
     _ensure()
@@ -94,10 +108,134 @@ def _fabric_rect(pfid: int, x: int, y: int, w: int, h: int, label: str, selectab
         "scaleX": 1, "scaleY": 1,
     }
 
+# ---------- Undo/Redo (persistente Snapshots, Structural Sharing) ----------
+# Ein Snapshot ist ein Tupel aus Chunks eingefrorener Objekte. Unveränderte Objekte (per pfid)
+# und Chunks (per Identität ihrer Objekte) werden vom Vorgänger-Snapshot per Referenz übernommen,
+# egal an welcher Position – ein Schritt kostet nur die neuen Chunks/Objekte. Chunk-Grenzen hängen
+# an der pfid (nicht am Index), Löschen/Einfügen vorne verschiebt also nicht alle Chunks.
+# Undo/Redo setzt nur den Zustand zurück, ohne Snap/Packing.
+# Budget: Referenzzähler je Objekt/Chunk über past + future; Bytes werden erst frei, wenn der
+# letzte Snapshot, der sie teilt, aus dem Verlauf fällt.
+_HIST_CHUNK        = 8            # mittlere Chunk-Größe
+_HIST_CHUNK_MAX    = 4 * _HIST_CHUNK
+_HIST_BUDGET_BYTES = 256 * 1024   # pro Session
+_HIST_MAX_STEPS    = 200
+
+@dataclass
+class _Snap:
+    chunks: tuple           # tuple[tuple[frozen_obj, ...], ...]
+    flags: tuple            # (next_idx, next_pid, locked, edit)
+
+@dataclass
+class _History:
+    past: list
+    future: list
+    last: Optional[_Snap] = None   # zuletzt erzeugter Snapshot = Sharing-Basis
+    used_bytes: int = 0            # belegt von allen Snapshots in past + future (geteilte Teile einmal)
+    refs: Dict[int, list] = field(default_factory=dict)   # id(Teil) -> [Anzahl Snapshots, Bytes, Teil]
+
+def _freeze(o: Dict[str, Any]) -> tuple:
+    return tuple(sorted(o.items()))
+
+def _chunk_end(pfid: Any) -> bool:
+    """Inhaltsabhängige Chunk-Grenze: hinter jedem Objekt, dessen pfid-Hash darauf fällt."""
+    return hash(pfid) % _HIST_CHUNK == _HIST_CHUNK - 1
+
+def _snapshot(base: Optional[_Snap]) -> _Snap:
+    objs = st.session_state[_SS_OBJS]
+    old_chunks = base.chunks if base else ()
+    by_pid = {dict(f).get("pfid"): f for ch in old_chunks for f in ch}
+    by_members = {tuple(map(id, ch)): ch for ch in old_chunks}
+    chunks, cur = [], []
+    for o in objs:
+        f = _freeze(o)
+        prev = by_pid.get(o.get("pfid"))
+        if prev is not None and prev == f:
+            f = prev                                      # geteilt
+        cur.append(f)
+        if _chunk_end(o.get("pfid")) or len(cur) >= _HIST_CHUNK_MAX:
+            chunks.append(tuple(cur)); cur = []
+    if cur:
+        chunks.append(tuple(cur))
+    chunks = [by_members.get(tuple(map(id, ch)), ch) for ch in chunks]   # geteilt
+    flags = (st.session_state[_SS_NEXTIDX], st.session_state[_SS_NEXTPID],
+             st.session_state[_SS_LOCKED], st.session_state[_SS_EDIT])
+    return _Snap(chunks=tuple(chunks), flags=flags)
+
+def _parts(snap: _Snap):
+    """(Teil, Bytes) je Chunk-Tupel, Chunk und eingefrorenem Objekt des Snapshots."""
+    yield snap.chunks, sys.getsizeof(snap.chunks)
+    for ch in snap.chunks:
+        yield ch, sys.getsizeof(ch)
+        for f in ch:
+            yield f, sys.getsizeof(f) + sum(sys.getsizeof(kv) for kv in f)
+
+def _retain(h: _History, snap: _Snap):
+    for part, size in _parts(snap):
+        r = h.refs.get(id(part))
+        if r is None:
+            h.refs[id(part)] = [1, size, part]; h.used_bytes += size
+        else:
+            r[0] += 1
+
+def _release(h: _History, snap: _Snap):
+    for part, _size in _parts(snap):
+        r = h.refs[id(part)]
+        r[0] -= 1
+        if r[0] == 0:
+            del h.refs[id(part)]; h.used_bytes -= r[1]
+
+def _restore(snap: _Snap):
+    st.session_state[_SS_OBJS] = [dict(f) for ch in snap.chunks for f in ch]
+    (st.session_state[_SS_NEXTIDX], st.session_state[_SS_NEXTPID],
+     st.session_state[_SS_LOCKED], st.session_state[_SS_EDIT]) = snap.flags
+    # Canvas liefert im nächsten Rerun noch den alten Stand – der darf den Restore nicht überschreiben
+    st.session_state[_SS_SKIPCOMMIT] = True
+
+def _record():
+    """Vor jeder Änderung aufrufen: aktuellen Stand auf den Undo-Stack, Redo verwerfen."""
+    h: _History = st.session_state[_SS_HIST]
+    snap = _snapshot(h.last)
+    h.past.append(snap); h.last = snap
+    _retain(h, snap)
+    for s in h.future: _release(h, s)
+    h.future.clear()
+    _trim(h)
+
+def _trim(h: _History):
+    """Älteste Undo-Schritte verwerfen, bis Budget und Schrittzahl passen."""
+    while h.past and (h.used_bytes > _HIST_BUDGET_BYTES or len(h.past) > _HIST_MAX_STEPS):
+        _release(h, h.past.pop(0))
+
+def _undo():
+    _ensure()
+    h: _History = st.session_state[_SS_HIST]
+    if not h.past: return
+    cur = _snapshot(h.last)
+    h.future.append(cur); _retain(h, cur)
+    prev = h.past.pop(); _release(h, prev)
+    _trim(h)
+    h.last = prev
+    _restore(prev)
+
+def _redo():
+    _ensure()
+    h: _History = st.session_state[_SS_HIST]
+    if not h.future: return
+    cur = _snapshot(h.last)
+    h.past.append(cur); _retain(h, cur)
+    nxt = h.future.pop(); _release(h, nxt)
+    _trim(h)
+    h.last = nxt
+    _restore(nxt)
+
 # ---------- Stable commit (kein Springen) ----------
 def _commit_from_canvas(json_data: Optional[Dict[str, Any]]):
     """Übernimmt aktuellen Canvas-Stand stabil: match per pfid, snap X + Y(L/M/R), Reihenfolge bleibt."""
     _ensure()
+    if st.session_state[_SS_SKIPCOMMIT]:
+        st.session_state[_SS_SKIPCOMMIT] = False
+        return
     if st.session_state[_SS_LOCKED] or not json_data:
         return
     by_id = {o.get("pfid"): o for o in (json_data.get("objects") or []) if isinstance(o, dict) and o.get("type") == "rect"}
@@ -119,6 +257,8 @@ def _commit_from_canvas(json_data: Optional[Dict[str, Any]]):
             base.update({"left": x, "top": y, "width": w, "height": h, "name": name})
         new_list.append(base)
 
+    if new_list != st.session_state[_SS_OBJS]:
+        _record()   # nur echte Drags landen im Verlauf
     st.session_state[_SS_OBJS] = new_list
 
 # ---------- Commands ----------
@@ -138,6 +278,7 @@ def _add(kind: str):
     elif kind == "IND": w,h,name = 120,100,"Industrie"
     else: return
 
+    _record()
     idx = st.session_state[_SS_NEXTIDX]
     gap = 8
     per = max(1, TRAILER_LEN_CM // (w + gap))
@@ -154,12 +295,14 @@ def _delete_last():
     _ensure()
     if st.session_state[_SS_LOCKED]: return
     if st.session_state[_SS_OBJS]:
+        _record()
         st.session_state[_SS_OBJS].pop()
         st.session_state[_SS_NEXTIDX] = max(0, st.session_state[_SS_NEXTIDX]-1)
 
 def _delete_all():
     _ensure()
     if st.session_state[_SS_LOCKED]: return
+    _record()
     st.session_state[_SS_OBJS] = []
     st.session_state[_SS_NEXTIDX] = 0
 
@@ -168,6 +311,7 @@ def _align(scope_last: bool, pos: str):
     if st.session_state[_SS_LOCKED]: return
     objs = st.session_state[_SS_OBJS]
     if not objs: return
+    _record()
     targets = [len(objs)-1] if scope_last else list(range(len(objs)))
     step_x = st.session_state[_SS_SNAP_X]
     for i in targets:
@@ -184,6 +328,7 @@ def _align(scope_last: bool, pos: str):
 
 def _set_locked(flag: bool):
     _ensure()
+    _record()
     st.session_state[_SS_LOCKED] = bool(flag)
     # Drag-Modus automatisch aus, wenn gesperrt
     if flag:
@@ -199,6 +344,7 @@ def _set_locked(flag: bool):
 
 def _set_edit(flag: bool):
     _ensure()
+    _record()
     st.session_state[_SS_EDIT] = bool(flag) and (not st.session_state[_SS_LOCKED])
     # Objekte togglen
     new = []
@@ -209,6 +355,108 @@ def _set_edit(flag: bool):
         new.append(q)
     st.session_state[_SS_OBJS] = new
 
+# ---------- Auto-Vervollständigen (Packing um fixierte Objekte) ----------
+_AUTO_BUDGET_S = 0.15   # Suchzeit-Budget, bleibt sicher unter einem Rerun (200 ms)
+
+# Formate je Art: (w, h, name) – w entlang Länge, h quer; Euro in beiden Richtungen
+_AUTO_SHAPES = {
+    "EURO_LONG":  (120, 80, "Euro"),
+    "EURO_TRANS": (80, 120, "Euro"),
+    "IND":        (120, 100, "Industrie"),
+}
+
+def _lanes(h: int) -> List[int]:
+    """Y-Positionen L/M/R – identisch zu _snap_xy, damit nach dem Commit nichts springt."""
+    return sorted({0, (TRAILER_W_CM - h) // 2, TRAILER_W_CM - h})
+
+def _ceil_grid(v: int, step: int) -> int:
+    if step <= 1: return int(v)
+    return -(-int(v) // step) * step
+
+def _overlaps(x: int, y: int, w: int, h: int, boxes: List[tuple]) -> bool:
+    for (bx, by, bw, bh) in boxes:
+        if x < bx + bw and bx < x + w and y < by + bh and by < y + h:
+            return True
+    return False
+
+def _place_first_fit(boxes: List[tuple], kinds: List[str], step_x: int) -> Optional[tuple]:
+    """Bottom-Left-Fit: kleinstes x (dann y) über alle erlaubten Formate. -> (x, y, kind) oder None."""
+    xs = sorted({0} | {_ceil_grid(bx + bw, step_x) for (bx, by, bw, bh) in boxes})
+    best = None
+    for kind in kinds:
+        w, h, _ = _AUTO_SHAPES[kind]
+        for x in xs:
+            if x + w > TRAILER_LEN_CM: break
+            if best is not None and x > best[0]: break
+            hit = next((y for y in _lanes(h) if not _overlaps(x, y, w, h, boxes)), None)
+            if hit is not None:
+                if best is None or (x, hit) < best[:2]:
+                    best = (x, hit, kind)
+                break
+    return best
+
+def _pack_fill(fixed: List[tuple], euro_n: int, ind_n: int, step_x: int,
+               budget_s: float = _AUTO_BUDGET_S) -> tuple:
+    """
+    Füllt die freie Fläche um `fixed` (x, y, w, h) mit euro_n Euro + ind_n Industrie.
+    Kleine Strategiesuche (Reihenfolge × Euro-Ausrichtung), jede Strategie ist ein Greedy-BL-Fit;
+    gewählt wird: meiste platzierte Paletten, dann kürzeste belegte Länge. Stoppt am Zeitbudget.
+    -> (placed [(x, y, w, h, name)], fehlend_euro, fehlend_ind)
+    """
+    t0 = time.perf_counter()
+    euro_prefs = (["EURO_LONG"], ["EURO_TRANS"], ["EURO_LONG", "EURO_TRANS"])
+    orders = ("IND_FIRST", "EURO_FIRST")
+    best = None
+    for order in orders:
+        for pref in euro_prefs:
+            boxes = list(fixed); placed = []
+            queue = (["IND"] * ind_n + ["EURO"] * euro_n) if order == "IND_FIRST" else (["EURO"] * euro_n + ["IND"] * ind_n)
+            miss_e = miss_i = 0
+            for item in queue:
+                hit = _place_first_fit(boxes, pref if item == "EURO" else ["IND"], step_x)
+                if hit is None:
+                    if item == "EURO": miss_e += 1
+                    else: miss_i += 1
+                    continue
+                x, y, kind = hit
+                w, h, name = _AUTO_SHAPES[kind]
+                boxes.append((x, y, w, h)); placed.append((x, y, w, h, name))
+            used = max((p[0] + p[2] for p in placed), default=0)
+            key = (miss_e + miss_i, used)
+            if best is None or key < best[0]:
+                best = (key, placed, miss_e, miss_i)
+            if time.perf_counter() - t0 > budget_s:
+                return best[1], best[2], best[3]
+    return best[1], best[2], best[3]
+
+def _autocomplete(euro_total: int, ind_total: int):
+    """Vorhandene Objekte bleiben fix; Rest bis zur Zielmenge wird automatisch gepackt."""
+    _ensure()
+    if st.session_state[_SS_LOCKED]: return
+    objs = st.session_state[_SS_OBJS]
+    fixed, have_e, have_i = [], 0, 0
+    for o in objs:
+        name = o.get("name") or "Custom"
+        w,h = _fix_size(name, int(o.get("width") or 0), int(o.get("height") or 0))
+        fixed.append((int(o.get("left") or 0), int(o.get("top") or 0), w, h))
+        if name == "Euro": have_e += 1
+        elif name == "Industrie": have_i += 1
+
+    need_e = max(0, int(euro_total) - have_e)
+    need_i = max(0, int(ind_total) - have_i)
+    placed, miss_e, miss_i = _pack_fill(fixed, need_e, need_i, st.session_state[_SS_SNAP_X])
+    if placed: _record()
+
+    for (x, y, w, h, name) in placed:
+        pfid = st.session_state[_SS_NEXTPID]; st.session_state[_SS_NEXTPID] += 1
+        objs.append(_fabric_rect(pfid, x, y, w, h, name, selectable=st.session_state[_SS_EDIT]))
+        st.session_state[_SS_NEXTIDX] += 1
+
+    if miss_e or miss_i:
+        st.session_state[_SS_AUTO_MSG] = f"Kein Platz mehr für {miss_e} Euro / {miss_i} Industrie."
+    else:
+        st.session_state[_SS_AUTO_MSG] = f"{len(placed)} Paletten automatisch ergänzt."
+
 # ---------- Public UI ----------
 def render_manager(title: str = "Eigene Layouts (Presets-Editor)", show_expander: bool = True) -> List[Dict[str, Any]]:
     _ensure()
@@ -216,7 +464,9 @@ def render_manager(title: str = "Eigene Layouts (Presets-Editor)", show_expander
 
     ct = st.expander(title, expanded=show_expander) if show_expander else st.container()
     with ct:
-        if not _HAS_CANVAS:
+        st_canvas = _load_canvas()
+        if st_canvas is None:
+            st.warning(f"Drawable-Canvas nicht verfügbar: {_CANVAS['err']!s}")
             st.info("Canvas nicht verfügbar.")
             return []
 
@@ -259,6 +509,12 @@ def render_manager(title: str = "Eigene Layouts (Presets-Editor)", show_expander
             _commit_from_canvas(canvas_result.json_data)
 
         # Buttons – wirken jetzt auf stabilen, gesnappten Stand
+        hist = st.session_state[_SS_HIST]
+        u1,u2,u3 = st.columns([1,1,2])
+        with u1: st.button("↶ Rückgängig", on_click=_undo, disabled=not hist.past)
+        with u2: st.button("↷ Wiederholen", on_click=_redo, disabled=not hist.future)
+        with u3: st.caption(f"Verlauf: {len(hist.past)} Schritte · {hist.used_bytes/1024:.1f} KiB")
+
         b1,b2,b3,b4,b5 = st.columns(5)
         with b1: st.button("➕ Euro längs 120×80", on_click=_add, args=("EURO_LONG",), disabled=st.session_state[_SS_LOCKED])
         with b2: st.button("➕ Euro quer 80×120",  on_click=_add, args=("EURO_TRANS",), disabled=st.session_state[_SS_LOCKED])
@@ -273,6 +529,16 @@ def render_manager(title: str = "Eigene Layouts (Presets-Editor)", show_expander
         with s2: st.button("◎ Mitte",  on_click=_align, args=(scope=="zuletzt","mid"),   disabled=st.session_state[_SS_LOCKED])
         with s3: st.button("⟹ Rechts", on_click=_align, args=(scope=="zuletzt","right"), disabled=st.session_state[_SS_LOCKED])
 
+        # Auto-Vervollständigen: vorhandene Objekte = fix, Rest wird gepackt
+        a1,a2,a3 = st.columns([1,1,1.4])
+        with a1: auto_e = st.number_input("Ziel Euro (gesamt)", 0, 40, 33, step=1, key="pf_auto_euro")
+        with a2: auto_i = st.number_input("Ziel Industrie (gesamt)", 0, 40, 0, step=1, key="pf_auto_ind")
+        with a3: st.button("⚡ Rest automatisch auffüllen", on_click=_autocomplete, args=(auto_e, auto_i),
+                           disabled=st.session_state[_SS_LOCKED],
+                           help="Vorhandene Paletten bleiben fix; fehlende werden um sie herum gepackt.")
+        if st.session_state[_SS_AUTO_MSG]:
+            st.caption(st.session_state[_SS_AUTO_MSG])
+
         # Rückgabe (Export)
         items = []
         for o in st.session_state[_SS_OBJS]:
@@ -0,0 +1,171 @@
+# disk_cache.py — persistenter Ergebnis-Cache auf der Platte (überlebt Neustart/Redeploy)
+# - Inhaltsadressiert: Datei = sha256(Namensraum, Code-Fingerprint, Eingaben) → <dir>/<ns>/<ab>/<hash>.bin
+# - Fingerprint: Quelltext der beteiligten Module + Python-/matplotlib-Version – neue Version = neue Schlüssel,
+#   alte Einträge werden unerreichbar und verschwinden über die Größenbegrenzung
+# - Eintrag: kleiner Kopf (Magic, Länge, CRC32) + Nutzdaten (marshal bzw. vom Aufrufer kodierte Bytes);
+#   kaputte/abgeschnittene Dateien zählen als Fehlzugriff und werden gelöscht
+# - Atomar: in eine Temp-Datei im selben Verzeichnis schreiben, dann os.replace – mehrere Worker-Prozesse
+#   können gleichzeitig lesen und schreiben, ein Leser sieht nie eine halbe Datei
+# - Größe begrenzt (PF_DISK_CACHE_MB, Standard 512 MiB): gelegentlicher Aufräumlauf, älteste (mtime) zuerst;
+#   Treffer frischen die mtime auf
+# - Ort: PF_DISK_CACHE (Standard .pf_cache neben der App); PF_DISK_CACHE=off schaltet ab
+
+import hashlib
+import marshal
+import os
+import struct
+import sys
+import threading
+import zlib
+from typing import Any, Callable, Dict, Iterable, Optional
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pf_cache")
+DEFAULT_MAX_MB = 512
+CLEANUP_EVERY = 200          # Schreibvorgänge je Prozess zwischen zwei Aufräumläufen
+_CLEAN_TO = 0.9              # aufräumen bis auf 90 % der Grenze
+
+_MAGIC = b"PFDC"
+_HEAD = struct.Struct("<4sII")    # magic, Länge, crc32
+
+_FP: Dict[tuple, str] = {}
+
+def code_fingerprint(*modules: Any, extra: str = "") -> str:
+    """Hash über den Quelltext der Module (+ Python-Version, extra); je Prozess einmal gerechnet."""
+    names = tuple(getattr(m, "__name__", str(m)) for m in modules) + (extra,)
+    if names not in _FP:
+        h = hashlib.sha256(sys.version.encode() + extra.encode())
+        for m in modules:
+            path = getattr(m, "__file__", None)
+            if path:
+                with open(path, "rb") as fh: h.update(fh.read())
+        _FP[names] = h.hexdigest()[:16]
+    return _FP[names]
+
+class DiskCache:
+    def __init__(self, root: Optional[str], max_bytes: int):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "corrupt": 0, "errors": 0, "removed": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def _path(self, ns: str, fingerprint: str, key: Any) -> str:
+        h = hashlib.sha256(f"{ns}\0{fingerprint}\0{key!r}".encode("utf-8")).hexdigest()
+        return os.path.join(self.root, ns, h[:2], h + ".bin")
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock: self._stats[name] += n
+
+    def load(self, ns: str, fingerprint: str, key: Any) -> Optional[bytes]:
+        if not self.enabled: return None
+        path = self._path(ns, fingerprint, key)
+        try:
+            with open(path, "rb") as fh: blob = fh.read()
+        except OSError:
+            self._count("misses"); return None
+        if len(blob) >= _HEAD.size:
+            magic, n, crc = _HEAD.unpack_from(blob)
+            data = blob[_HEAD.size:]
+            if magic == _MAGIC and n == len(data) and zlib.crc32(data) == crc:
+                try: os.utime(path)   # LRU über mtime
+                except OSError: pass
+                self._count("hits")
+                return data
+        self._count("corrupt")
+        try: os.unlink(path)
+        except OSError: pass
+        return None
+
+    def store(self, ns: str, fingerprint: str, key: Any, data: bytes) -> bool:
+        if not self.enabled: return False
+        path = self._path(ns, fingerprint, key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "wb") as fh:
+                fh.write(_HEAD.pack(_MAGIC, len(data), zlib.crc32(data))); fh.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            self._count("errors")
+            try: os.unlink(tmp)
+            except OSError: pass
+            return False
+        with self._lock:
+            self._stats["writes"] += 1
+            self._writes += 1
+            due = self._writes % CLEANUP_EVERY == 0
+        if due: self.cleanup()
+        return True
+
+    def get_or_compute(self, ns: str, fingerprint: str, key: Any, compute: Callable[[], Any],
+                       dumps: Callable[[Any], bytes] = marshal.dumps,
+                       loads: Callable[[bytes], Any] = marshal.loads) -> Any:
+        data = self.load(ns, fingerprint, key)
+        if data is not None:
+            try:
+                return loads(data)
+            except (ValueError, EOFError, TypeError):
+                self._count("corrupt")
+        value = compute()
+        try:
+            self.store(ns, fingerprint, key, dumps(value))
+        except (ValueError, TypeError):   # nicht serialisierbar: nur nicht speichern
+            self._count("errors")
+        return value
+
+    def _files(self) -> Iterable[os.DirEntry]:
+        stack = [self.root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for e in it:
+                        if e.is_dir(follow_symlinks=False): stack.append(e.path)
+                        elif e.name.endswith(".bin") or e.name.endswith(".tmp"): yield e
+            except OSError:
+                continue
+
+    def cleanup(self) -> Dict[str, int]:
+        """Älteste Einträge löschen, bis die Summe unter 90 % der Grenze liegt. Parallel aus mehreren Prozessen ok."""
+        if not self.enabled: return {"files": 0, "bytes": 0, "removed": 0}
+        entries = []
+        for e in self._files():
+            try:
+                st = e.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, e.path))
+        total = sum(sz for _t, sz, _p in entries)
+        removed = 0
+        if total > self.max_bytes:
+            for _t, sz, path in sorted(entries):
+                if total <= self.max_bytes * _CLEAN_TO: break
+                try:
+                    os.unlink(path); removed += 1
+                except FileNotFoundError:
+                    pass   # ein anderer Prozess war schneller
+                except OSError:
+                    continue
+                total -= sz
+        self._count("removed", removed)
+        return {"files": len(entries) - removed, "bytes": total, "removed": removed}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+        s.update(root=self.root, max_bytes=self.max_bytes)
+        return s
+
+def _from_env() -> DiskCache:
+    root = os.environ.get("PF_DISK_CACHE", DEFAULT_DIR)
+    if root.strip().lower() in ("", "0", "off", "none"): root = None
+    try:
+        mb = float(os.environ.get("PF_DISK_CACHE_MB", DEFAULT_MAX_MB))
+    except ValueError:
+        mb = DEFAULT_MAX_MB
+    return DiskCache(root, int(max(1.0, mb) * 1024 * 1024))
+
+DISK = _from_env()
@@ -0,0 +1,70 @@
+# gallery.py — Varianten-Galerie seitenweise: nur die sichtbare Seite wird gebaut und gezeichnet
+# - variants_page: eine Seite (PER_PAGE Varianten) über planner.generate_variants_page – gefiltert werden alle
+#   (billig), gebaut nur die der Seite; abgelegt als Reihen-Codes im gemeinsamen Cache + Platten-Cache
+# - prefetch: die nächste Seite im Hintergrund-Thread bauen und (optional) ihre Grafiken rendern –
+#   landet im gemeinsamen Cache, der Klick auf „weiter“ ist dann nur noch ein Lookup
+# - Ein Prefetch-Thread je Prozess (eigenes Modul, app.py wird bei jedem Rerun neu ausgeführt);
+#   gleiche Seite wird nicht doppelt eingeplant, Fehler im Hintergrund werden verschluckt (Seite rechnet dann live)
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import planner
+from planner import generate_variants_page, variant_specs, encode_rows, decode_rows
+from disk_cache import DISK, code_fingerprint
+from shared_cache import CACHE
+
+PER_PAGE = 4
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pending: Set[tuple] = set()
+_lock = threading.Lock()
+
+def count_variants(cfg: dict, euro_n: int, ind_n: int, weight_mode: bool) -> int:
+    """Anzahl passender Varianten (nur Filter, keine Layouts)."""
+    return len(variant_specs(cfg, euro_n, ind_n, weight_mode)[0])
+
+def page_count(n: int, per_page: int = PER_PAGE) -> int:
+    return max(1, -(-n // per_page))
+
+def variants_page(cfg: dict, cfg_key: str, euro_n: int, ind_n: int, exact_tail: bool, weight_mode: bool,
+                  page: int, per_page: int = PER_PAGE) -> List[Tuple[str, List[Dict]]]:
+    """Varianten einer Seite (Titel, Reihen); cfg_key identifiziert cfg im Cache."""
+    def compute():
+        vs, _n, _sk, _tot = generate_variants_page(cfg, euro_n, ind_n, exact_tail, weight_mode, page, per_page)
+        return tuple((t, encode_rows(r)) for t, r in vs)
+    key = ("variants_page", cfg_key, euro_n, ind_n, bool(exact_tail), bool(weight_mode), page, per_page)
+    codes = CACHE.get_or_compute(
+        key, lambda: DISK.get_or_compute("variants_page", code_fingerprint(planner), key, compute))
+    return [(t, decode_rows(c)) for t, c in codes]
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None: _pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pf-prefetch")
+    return _pool
+
+def prefetch(cfg: dict, cfg_key: str, euro_n: int, ind_n: int, exact_tail: bool, weight_mode: bool,
+             page: int, per_page: int = PER_PAGE,
+             render: Optional[Callable[[str, List[Dict]], None]] = None) -> bool:
+    """Seite `page` im Hintergrund vorbereiten; render(title, rows) füllt den PNG-Cache. False = schon eingeplant."""
+    key = (cfg_key, euro_n, ind_n, bool(exact_tail), bool(weight_mode), page, per_page, render is not None)
+    with _lock:
+        if key in _pending: return False
+        _pending.add(key)
+
+    def job():
+        try:
+            for title, rows in variants_page(cfg, cfg_key, euro_n, ind_n, exact_tail, weight_mode, page, per_page):
+                if render is not None: render(title, rows)
+        except Exception:
+            pass
+        finally:
+            with _lock: _pending.discard(key)
+    _executor().submit(job)
+    return True
+
+def pending() -> int:
+    with _lock: return len(_pending)
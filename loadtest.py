@@ -0,0 +1,219 @@
+# loadtest.py — Lasttest: N gleichzeitige Sitzungen gegen app.py (headless, streamlit.testing AppTest)
+# - Je Sitzung ein eigener Prozess mit einem AppTest; alle starten gemeinsam (Barriere). AppTest setzt bei
+#   jedem Lauf eine prozessweite Runtime (Runtime._instance) und räumt sie danach ab – zwei AppTests in
+#   Threads desselben Prozesses stören sich, deshalb Prozesse statt Threads
+# - Realistische Schritte, je Sitzung zufällig (Seed): Palettenzahlen ändern, Ziel-Heckanteil schieben,
+#   kg ändern, variants.json hochladen / wieder auf Default
+# - Canvas-Sitzungen (Anteil --canvas): Drag im Presets-Editor; die Drawable-Canvas-Komponente lässt sich
+#   headless nicht bedienen, daher läuft der echte Commit-Pfad (custom_layouts._commit_from_canvas) mit
+#   verschobenen Objekten in einem Mini-Skript
+# - Ausgabe: p50/p95/p99 der Rerun-Latenz (gesamt und je Aktion), Fehler, RSS je Sitzung
+#   (Zuwachs des Sitzungsprozesses nach einem Aufwärmlauf – Importe zählen nicht mit)
+#
+# Lauf: python loadtest.py [--sessions 8] [--steps 12] [--canvas 0.25] [--seed 0] [--out loadtest.json]
+
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+if HERE not in sys.path: sys.path.insert(0, HERE)
+
+APP_PATH = os.path.join(HERE, "app.py")
+RUN_TIMEOUT_S = 120
+
+# Mini-Skript für Canvas-Sitzungen: gleicher Session-State und Commit wie render_manager() nach einem Drag
+_CANVAS_SCRIPT = """
+import streamlit as st
+import custom_layouts as cl
+cl._ensure()
+if not st.session_state[cl._SS_OBJS]:
+    st.session_state[cl._SS_LOCKED] = False
+    for k in range(st.session_state.get("lt_objs", 24)):
+        cl._add(("EURO_LONG", "EURO_TRANS", "IND")[k % 3])
+dx, dy = st.session_state.get("lt_drag", (0, 0))
+objs = st.session_state[cl._SS_OBJS]
+cl._commit_from_canvas({"objects": [dict(o, left=o["left"] + dx, top=o["top"] + dy) for o in objs]})
+st.caption(f"{len(st.session_state[cl._SS_OBJS])} Objekte")
+"""
+
+def _quiet_streamlit():
+    import streamlit  # noqa: F401
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"): logging.getLogger(name).setLevel(logging.ERROR)
+
+def _rss_kb() -> int:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * (os.sysconf("SC_PAGE_SIZE") // 1024)
+    except (OSError, ValueError, AttributeError):
+        import resource   # Fallback: Spitzenwert statt aktuellem RSS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def _variants_json(rnd: random.Random) -> bytes:
+    from planner import DEFAULT_CFG
+    vs = [dict(v) for v in DEFAULT_CFG["variants"]]
+    vs.append({"title": f"Upload Rezept {rnd.randint(1, 99)}", "type": "recipe",
+               "rows": [rnd.choice([3, 3, 2]) for _ in range(rnd.randint(6, 11))]})
+    return json.dumps({"variants": vs}).encode("utf-8")
+
+def _by_label(widgets, prefix: str):
+    for w in widgets:
+        if w.label.startswith(prefix): return w
+    raise LookupError(prefix)
+
+# ------------------ Sitzungen ------------------
+class AppSession:
+    kind = "app"
+    ACTIONS = ("euro_n", "ind_n", "heckanteil", "heckanteil", "kg", "upload")
+
+    def __init__(self, idx: int, seed: int):
+        from streamlit.testing.v1 import AppTest
+        self.idx = idx
+        self.rnd = random.Random(seed * 1000 + idx)
+        self.at = AppTest.from_file(APP_PATH, default_timeout=RUN_TIMEOUT_S)
+        self.uploaded = False
+
+    def first(self) -> str:
+        self.at.run()
+        return "start"
+
+    def step(self) -> str:
+        at, rnd = self.at, self.rnd
+        action = rnd.choice(self.ACTIONS)
+        if action == "euro_n":
+            _by_label(at.number_input, "Euro-Paletten").set_value(rnd.randint(0, 40))
+        elif action == "ind_n":
+            _by_label(at.number_input, "Industrie-Paletten").set_value(rnd.choice([0, 0, 2, 4, 6, 8]))
+        elif action == "heckanteil":
+            _by_label(at.slider, "Ziel").set_value(rnd.randint(40, 65))
+        elif action == "kg":
+            _by_label(at.number_input, "kg/Euro").set_value(rnd.randrange(300, 1200, 10))
+        else:
+            up = at.file_uploader[0]
+            if self.uploaded: up.set_value(None); action = "upload_weg"
+            else: up.set_value(("variants.json", _variants_json(rnd), "application/json"))
+            self.uploaded = not self.uploaded
+        at.run()
+        return action
+
+    def errors(self) -> List[str]:
+        return [str(e.value)[:200] for e in self.at.exception]
+
+class CanvasSession(AppSession):
+    kind = "canvas"
+
+    def __init__(self, idx: int, seed: int):
+        from streamlit.testing.v1 import AppTest
+        self.idx = idx
+        self.rnd = random.Random(seed * 1000 + idx)
+        self.at = AppTest.from_string(_CANVAS_SCRIPT, default_timeout=RUN_TIMEOUT_S)
+
+    def step(self) -> str:
+        self.at.session_state["lt_drag"] = (self.rnd.randint(-40, 40), self.rnd.randint(-30, 30))
+        self.at.run()
+        return "canvas_drag"
+
+# ------------------ Ablauf ------------------
+def _percentiles(xs: List[float]) -> Dict[str, float]:
+    if not xs: return {}
+    if len(xs) == 1: q = [xs[0]] * 99
+    else: q = statistics.quantiles(xs, n=100, method="inclusive")
+    return {"n": len(xs), "p50_ms": round(q[49], 1), "p95_ms": round(q[94], 1),
+            "p99_ms": round(q[98], 1), "max_ms": round(max(xs), 1)}
+
+def _worker(idx: int, canvas: bool, steps: int, seed: int, barrier, out):
+    try:
+        _quiet_streamlit()
+        AppSession(-1, seed).first()   # Aufwärmen: Importe (matplotlib, numpy …) nicht der Sitzung anrechnen
+        rss0 = _rss_kb()
+        s = CanvasSession(idx, seed) if canvas else AppSession(idx, seed)
+        barrier.wait()
+        samples = []
+        for k in range(steps + 1):
+            t = time.perf_counter()
+            action = s.first() if k == 0 else s.step()
+            samples.append((s.kind, action, (time.perf_counter() - t) * 1000.0))
+        out.put({"idx": idx, "kind": s.kind, "samples": samples, "rss_kb": _rss_kb() - rss0,
+                 "errors": s.errors()})
+    except Exception as e:   # Sitzung gescheitert: trotzdem melden, sonst wartet run() ewig
+        barrier.abort()
+        out.put({"idx": idx, "kind": "canvas" if canvas else "app", "samples": [], "rss_kb": 0,
+                 "errors": [f"{type(e).__name__}: {e}"]})
+
+def run(sessions: int, steps: int, canvas_share: float, seed: int) -> Dict:
+    ctx = mp.get_context("spawn")
+    n_canvas = int(round(sessions * canvas_share))
+    barrier = ctx.Barrier(sessions + 1)
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(i, i < n_canvas, steps, seed, barrier, out), daemon=True)
+             for i in range(sessions)]
+    for p in procs: p.start()
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        pass
+    t0 = time.perf_counter()
+    results = [out.get() for _ in procs]
+    wall = time.perf_counter() - t0
+    for p in procs: p.join()
+    results.sort(key=lambda r: r["idx"])
+
+    samples = [smp for r in results for smp in r["samples"]]
+    reruns = [ms for kind, a, ms in samples if a != "start"]
+    per_action: Dict[str, List[float]] = {}
+    for kind, a, ms in samples: per_action.setdefault(a, []).append(ms)
+    rss = [r["rss_kb"] for r in results if r["samples"]]
+    return {
+        "meta": {"sessions": sessions, "canvas_sessions": n_canvas, "steps": steps, "seed": seed,
+                 "python": sys.version.split()[0], "cpus": os.cpu_count(),
+                 "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "rerun": _percentiles(reruns),
+        "by_action": {a: _percentiles(v) for a, v in sorted(per_action.items())},
+        "throughput_reruns_per_s": round(len(samples) / wall, 2) if wall > 0 else None,
+        "wall_s": round(wall, 2),
+        "memory": {"per_session_kb": {f"{r['kind']}#{r['idx']}": r["rss_kb"] for r in results},
+                   "mean_kb": round(statistics.mean(rss), 1) if rss else None,
+                   "max_kb": max(rss) if rss else None},
+        "errors": {f"{r['kind']}#{r['idx']}": r["errors"] for r in results if r["errors"]},
+    }
+
+def _print(res: Dict):
+    m = res["meta"]
+    print(f"{m['sessions']} Sitzungen ({m['canvas_sessions']} Canvas) × {m['steps']} Schritte – "
+          f"{res['wall_s']} s, {res['throughput_reruns_per_s']} Reruns/s")
+    print(f"\n{'Aktion':<14} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, p in [("Rerun gesamt", res["rerun"])] + list(res["by_action"].items()):
+        if p: print(f"{name:<14} {p['n']:>5} {p['p50_ms']:>9.1f} {p['p95_ms']:>9.1f} {p['p99_ms']:>9.1f} {p['max_ms']:>9.1f}")
+    mem = res["memory"]
+    if mem["mean_kb"] is not None:
+        print(f"\nRSS je Sitzung: Mittel {mem['mean_kb']/1024:.1f} MiB, Max {mem['max_kb']/1024:.1f} MiB "
+              f"(CPUs: {res['meta']['cpus']})")
+    for who, errs in res["errors"].items():
+        print(f"Fehler {who}: {errs[0]}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Lasttest Paletten Fuchs (mehrere Sitzungen, headless)")
+    ap.add_argument("--sessions", type=int, default=8)
+    ap.add_argument("--steps", type=int, default=12, help="Interaktionen je Sitzung nach dem ersten Lauf")
+    ap.add_argument("--canvas", type=float, default=0.25, help="Anteil Canvas-Sitzungen (0–1)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default=None, help="Ergebnis zusätzlich als JSON schreiben")
+    args = ap.parse_args(argv)
+    res = run(max(1, args.sessions), max(0, args.steps), min(1.0, max(0.0, args.canvas)), args.seed)
+    _print(res)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(res, fh, ensure_ascii=False, indent=2)
+    return 1 if res["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
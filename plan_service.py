@@ -0,0 +1,311 @@
+# plan_service.py — lokaler HTTP/JSON-Planungsdienst für Paletten Fuchs (z. B. für das TMS)
+# - asyncio-Server (nur Standardbibliothek), HTTP/1.1 mit Keep-Alive
+# - CPU-Arbeit (Varianten, Grog, Achslast) läuft im Prozess-Pool; Anfragen werden gebündelt
+# - Warme Caches: LRU im Server-Prozess + lru_cache je Worker (bleibt zwischen Aufrufen erhalten)
+#   + Platten-Cache (disk_cache.py) – von allen Workern geteilt, überlebt Neustarts
+#
+# Endpunkte:
+#   POST /plan        {"euro_n": 33, "ind_n": 0, "exact_tail": false, "kg_euro": 700, "kg_ind": 900,
+#                      "target_rear_share": 0.52, "topk": 4, "cfg": {...optional variants.json...}}
+#   POST /plan/batch  {"requests": [ {...}, {...} ]}
+#   POST /capacity    {"exact_tail": false, "kg_euro": 700, "kg_ind": 900, "target_rear_share": 0.52, "cfg": {...}}
+#                     → Matrix über alle euro_n 0–40 × ind_n 0–40 (capacity.py)
+#   GET  /health, GET /stats
+#
+# Start:   python plan_service.py --port 8765 --workers 4
+# Offline: PlanService(workers=0) und await svc.handle("POST", "/plan", body) – ohne Socket/Pool
+#          (/capacity rechnet dann in einem Thread, nie auf der Event-Loop).
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import planner
+from disk_cache import DISK, code_fingerprint
+from planner import (
+    DEFAULT_CFG, rows_length_cm, rows_pallets,
+    generate_variants_from_config, grog_pick_best, estimate_axle_loads,
+)
+
+_LIMITS = {"euro_n": (0, 40), "ind_n": (0, 40), "kg_euro": (0, 2000), "kg_ind": (0, 2500), "topk": (1, 50)}
+
+# ------------------ Planung (rein, picklebar) ------------------
+def normalize_request(req: Any, fields: Optional[Tuple[str, ...]] = None) -> Dict:
+    """Prüft und vervollständigt eine Anfrage. Ungültiges -> ValueError (wird zu HTTP 400).
+    fields: nur diese Felder prüfen und liefern (Standard: alle für /plan)."""
+    if not isinstance(req, dict):
+        raise ValueError("Anfrage muss ein JSON-Objekt sein")
+    q: Dict[str, Any] = {}
+    defaults = {"euro_n": 33, "ind_n": 0, "kg_euro": 700, "kg_ind": 900, "topk": 4}
+    for key, (lo, hi) in _LIMITS.items():
+        if fields is not None and key not in fields: continue
+        val = req.get(key, defaults[key])
+        if isinstance(val, bool) or not isinstance(val, (int, float)) or int(val) != val:
+            raise ValueError(f"{key} muss eine ganze Zahl sein")
+        if not lo <= val <= hi:
+            raise ValueError(f"{key}={val} außerhalb {lo}–{hi}")
+        q[key] = int(val)
+    share = req.get("target_rear_share", 0.52)
+    if isinstance(share, bool) or not isinstance(share, (int, float)) or not 0.0 <= share <= 1.0:
+        raise ValueError("target_rear_share muss zwischen 0 und 1 liegen")
+    q["target_rear_share"] = float(share)
+    q["exact_tail"] = bool(req.get("exact_tail", False))
+    q["weight_mode"] = bool(req.get("weight_mode", False))
+    cfg = req.get("cfg", DEFAULT_CFG)
+    if not isinstance(cfg, dict) or not isinstance(cfg.get("variants", []), list):
+        raise ValueError("cfg muss ein variants.json-Objekt sein")
+    q["cfg"] = cfg
+    return q if fields is None else {k: q[k] for k in fields}
+
+def request_key(q: Dict) -> str:
+    return json.dumps(q, sort_keys=True, separators=(",", ":"))
+
+@lru_cache(maxsize=4096)
+def _plan_cached(key: str) -> Dict:
+    return DISK.get_or_compute("plan", code_fingerprint(planner, sys.modules[__name__]), key,
+                               lambda: _plan_compute(key),
+                               dumps=lambda r: json.dumps(r, separators=(",", ":")).encode("utf-8"),
+                               loads=json.loads)
+
+def _plan_compute(key: str) -> Dict:
+    q = json.loads(key)
+    variants, skipped, total = generate_variants_from_config(
+        q["cfg"], q["euro_n"], q["ind_n"], exact_tail=q["exact_tail"], weight_mode=q["weight_mode"])
+    picked = grog_pick_best(variants, kg_euro=q["kg_euro"], kg_ind=q["kg_ind"],
+                            target_rear_share=q["target_rear_share"], topk=q["topk"]) if variants else []
+    out = []
+    for title, rows, score, rear in picked:
+        front_kg, rear_kg, total_kg = estimate_axle_loads(rows, q["kg_euro"], q["kg_ind"])
+        out.append({
+            "title": title, "rows": rows, "score": round(score, 3), "rear_share": round(rear, 4),
+            "length_cm": rows_length_cm(rows), "pallets": rows_pallets(rows),
+            "axle": {"front_kg": round(front_kg, 1), "rear_kg": round(rear_kg, 1), "total_kg": round(total_kg, 1)},
+        })
+    return {"variants": out, "skipped": [{"title": t, "reason": why} for t, why in skipped],
+            "total_cfg": total}
+
+def plan(req: Any) -> Dict:
+    """Eine Anfrage planen (synchron). Ergebnis ist gecacht – nicht verändern."""
+    return _plan_cached(request_key(normalize_request(req)))
+
+_CAPACITY_FIELDS = ("exact_tail", "kg_euro", "kg_ind", "target_rear_share", "cfg")
+
+@lru_cache(maxsize=64)
+def capacity_for(key: str) -> Dict:
+    """Kapazitätsmatrix als JSON für einen normalisierten Schlüssel (nur _CAPACITY_FIELDS)."""
+    import capacity
+    q = json.loads(key)
+    return capacity.capacity_matrix(q["cfg"], q["exact_tail"], q["kg_euro"], q["kg_ind"], q["target_rear_share"],
+                                    cfg_key=json.dumps(q["cfg"], sort_keys=True)).to_json()
+
+class PlanningError(Exception):
+    """Planung für eine gültige Anfrage fehlgeschlagen (HTTP 422)."""
+
+def plan_many(keys: List[str]) -> List[Dict]:
+    """Worker-Einstieg für einen Batch bereits normalisierter Anfragen. Fehler bleiben je Anfrage."""
+    out = []
+    for k in keys:
+        try:
+            out.append(_plan_cached(k))
+        except Exception as e:
+            out.append({"_error": f"{type(e).__name__}: {e}"})
+    return out
+
+# ------------------ Batching + Caches ------------------
+class _Batcher:
+    """Sammelt Anfragen max_wait_s lang (oder bis max_batch) und verteilt sie als Blöcke auf den Pool."""
+
+    def __init__(self, pool: Optional[ProcessPoolExecutor], workers: int,
+                 max_batch: int = 64, max_wait_s: float = 0.002):
+        self.pool, self.workers = pool, max(1, workers)
+        self.max_batch, self.max_wait_s = max_batch, max_wait_s
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.batches = 0
+
+    async def submit(self, key: str) -> Dict:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((key, fut))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_s, self._flush)
+        return await fut
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel(); self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        # gleiche Anfragen im Batch nur einmal rechnen
+        uniq = list(dict.fromkeys(k for k, _ in batch))
+        size = max(1, -(-len(uniq) // self.workers))
+        for start in range(0, len(uniq), size):
+            chunk = uniq[start:start + size]
+            in_chunk = set(chunk)
+            waiters = [(k, f) for k, f in batch if k in in_chunk]
+            asyncio.ensure_future(self._run(chunk, waiters))
+
+    async def _run(self, chunk: List[str], waiters: List[Tuple[str, asyncio.Future]]):
+        loop = asyncio.get_running_loop()
+        try:
+            if self.pool is None:
+                results = plan_many(chunk)
+            else:
+                results = await loop.run_in_executor(self.pool, plan_many, chunk)
+            by_key = dict(zip(chunk, results))
+            for k, f in waiters:
+                if f.done(): continue
+                res = by_key[k]
+                if "_error" in res: f.set_exception(PlanningError(res["_error"]))
+                else: f.set_result(res)
+        except Exception as e:
+            for _, f in waiters:
+                if not f.done(): f.set_exception(e)
+
+class PlanService:
+    def __init__(self, workers: int = os.cpu_count() or 1, cache_size: int = 2048,
+                 max_batch: int = 64, max_wait_s: float = 0.002):
+        self.pool = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+        self.batcher = _Batcher(self.pool, workers, max_batch=max_batch, max_wait_s=max_wait_s)
+        self.cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self.cache_size = cache_size
+        self.stats = {"requests": 0, "plans": 0, "cache_hits": 0, "errors": 0, "started": time.time()}
+
+    async def plan(self, req: Any) -> Dict:
+        key = request_key(normalize_request(req))
+        self.stats["plans"] += 1
+        hit = self.cache.get(key)
+        if hit is not None:
+            self.cache.move_to_end(key); self.stats["cache_hits"] += 1
+            return hit
+        res = await self.batcher.submit(key)
+        self.cache[key] = res
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return res
+
+    async def capacity(self, req: Any) -> Dict:
+        """Kapazitätsmatrix – immer außerhalb der Event-Loop (Pool bzw. Thread), das kalte Gitter dauert Sekunden."""
+        key = request_key(normalize_request(req, _CAPACITY_FIELDS))
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, capacity_for, key)
+        except Exception as e:
+            raise PlanningError(f"{type(e).__name__}: {e}") from e
+
+    async def handle(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        """HTTP-unabhängige Verarbeitung: -> (status, json_payload)."""
+        self.stats["requests"] += 1
+        try:
+            if method == "GET" and path == "/health":
+                return 200, {"ok": True}
+            if method == "GET" and path == "/stats":
+                return 200, dict(self.stats, batches=self.batcher.batches, cache_entries=len(self.cache))
+            if path not in ("/plan", "/plan/batch", "/capacity"):
+                return 404, {"error": f"unbekannter Pfad {path}"}
+            if method != "POST":
+                return 405, {"error": "nur POST"}
+            try:
+                req = json.loads(body or b"{}")
+            except ValueError:
+                return 400, {"error": "ungültiges JSON"}
+            if path == "/plan":
+                return 200, await self.plan(req)
+            if path == "/capacity":
+                return 200, await self.capacity(req)
+            reqs = req.get("requests") if isinstance(req, dict) else None
+            if not isinstance(reqs, list):
+                return 400, {"error": "requests muss eine Liste sein"}
+            results = await asyncio.gather(*(self.plan(r) for r in reqs), return_exceptions=True)
+            return 200, {"results": [{"error": str(r)} if isinstance(r, Exception) else r for r in results]}
+        except ValueError as e:
+            self.stats["errors"] += 1
+            return 400, {"error": str(e)}
+        except PlanningError as e:
+            self.stats["errors"] += 1
+            return 422, {"error": str(e)}
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+# ------------------ HTTP (asyncio streams) ------------------
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error"}
+_MAX_BODY = 4 * 1024 * 1024
+
+async def _serve_conn(svc: PlanService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            parts = line.decode("latin-1").split()
+            if len(parts) < 2:
+                break
+            method, path = parts[0].upper(), parts[1].split("?", 1)[0]
+            headers = {}
+            while True:
+                h = await reader.readline()
+                if h in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = h.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length") or 0)
+            if length > _MAX_BODY:
+                status, payload = 413, {"error": "Anfrage zu groß"}
+                body = b""
+            else:
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, payload = await svc.handle(method, path, body)
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+            data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            keep = headers.get("connection", "").lower() != "close" and status != 413
+            writer.write(
+                f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\nContent-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep else 'close'}\r\n\r\n".encode("latin-1") + data)
+            await writer.drain()
+            if not keep:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, workers: int = os.cpu_count() or 1):
+    svc = PlanService(workers=workers)
+    server = await asyncio.start_server(lambda r, w: _serve_conn(svc, r, w), host, port)
+    print(f"Paletten-Fuchs Planungsdienst auf http://{host}:{port} (Worker: {workers})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        svc.close()
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Lokaler HTTP/JSON-Planungsdienst (Paletten Fuchs)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="Prozess-Pool-Größe; 0 = im Server-Prozess rechnen")
+    args = ap.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
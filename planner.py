@@ -0,0 +1,1179 @@
+# planner.py — Paletten Fuchs Planungskern (ohne Streamlit/matplotlib)
+# - Reihen-Bausteine (Euro/Industrie/Blumenwagen), Tail-Guard, stabile & exakte Euro-Layouts
+# - Gewicht: Block/Verteilen, Geometrie (Rechtecke), Achslast-Schätzung
+# - GROG-Scorer, Variantentypen, JSON-Filter & Variantenerzeugung
+# - Reihen sind internierte, unveränderliche Row-Objekte; Layouts lassen sich als Bytes-Code
+#   (encode_rows/decode_rows) hashen, vergleichen und als Cache-Schlüssel nutzen
+# Genutzt von app.py (UI) und plan_service.py (HTTP) – daher hier keine UI-Importe.
+
+import bisect
+import heapq
+import time
+from functools import lru_cache
+from typing import List, Dict, NamedTuple, Optional, Tuple, Set
+
+# ------------------ Geometrie / Konstanten ------------------
+TRAILER_LEN_CM = 1360
+TRAILER_W_CM   = 240
+
+EURO_L_CM, EURO_W_CM = 120, 80
+IND_L_CM,  IND_W_CM  = 120, 100
+FLOWER_L_CM, FLOWER_W_CM = 135, 57   # CC-Container (Blumenwagen) 135 × 56,5 cm, Breite aufgerundet
+FLOWER_MAX_PAL = TRAILER_LEN_CM // FLOWER_L_CM * 4   # 40 – zehn 4er-Reihen, für einen Querwagen bleibt kein Platz
+
+# ------------------ Reihen-Code (interniert, unveränderlich, hashbar) ------------------
+class Row(dict):
+    """
+    Eine Reihe als internierter, schreibgeschützter dict (Kompatibilitätssicht für r["type"], r.get(...),
+    JSON). Jeder Reihentyp existiert genau einmal; `code` ist sein Byte im Layout-Code.
+    """
+    __slots__ = ("code",)
+
+    def __init__(self, code: int, **fields):
+        super().__init__(**fields)
+        self.code = code
+
+    def __hash__(self): return self.code
+    def __reduce__(self): return (_row_by_code, (self.code,))
+    def __copy__(self): return self
+    def __deepcopy__(self, memo): return self
+
+    def _readonly(self, *a, **kw): raise TypeError("Row ist unveränderlich")
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+ROWS: Tuple[Row, ...] = (
+    Row(0, type="EURO_3_LONG",    len_cm=EURO_L_CM, pallets=3),
+    Row(1, type="EURO_2_TRANS",   len_cm=EURO_W_CM, pallets=2),
+    Row(2, type="EURO_1_TRANS",   len_cm=EURO_W_CM, pallets=1),
+    Row(3, type="IND_ROW_2_LONG", len_cm=IND_L_CM,  pallets=2),
+    Row(4, type="IND_SINGLE",     len_cm=IND_L_CM,  pallets=1),
+    Row(5, type="FLOWER_4_LONG",  len_cm=FLOWER_L_CM, pallets=4),   # 4 Wagen längs nebeneinander (228 cm)
+    Row(6, type="FLOWER_1_TRANS", len_cm=FLOWER_W_CM, pallets=1),   # 1 Wagen quer
+)
+ROW_BY_TYPE: Dict[str, Row] = {r["type"]: r for r in ROWS}
+
+def _row_by_code(code: int) -> Row: return ROWS[code]
+
+def encode_rows(rows: List[Dict]) -> bytes:
+    """Layout -> kompakter Code (1 Byte je Reihe). Auch für alte Reihen-dicts (per type)."""
+    return bytes(r.code if isinstance(r, Row) else ROW_BY_TYPE[r["type"]].code for r in rows)
+
+def decode_rows(code: bytes) -> List[Row]:
+    """Code -> Liste internierter Reihen (teilt sich alle Row-Objekte)."""
+    return [ROWS[c] for c in code]
+
+# ------------------ Basis-Layoutfunktionen (Euro/Industrie) ------------------
+def euro_row_long() -> Dict:   return ROWS[0]
+def euro_row_trans2() -> Dict: return ROWS[1]
+def euro_row_trans1() -> Dict: return ROWS[2]
+def ind_row2_long() -> Dict:   return ROWS[3]
+def ind_single() -> Dict:      return ROWS[4]
+def flower_row4_long() -> Dict: return ROWS[5]
+def flower_single() -> Dict:   return ROWS[6]
+
+def cap_to_trailer(rows: List[Dict]) -> List[Dict]:
+    out, s = [], 0
+    for r in rows:
+        L = r.get("len_cm", EURO_L_CM)
+        if s + L > TRAILER_LEN_CM: break
+        out.append(r); s += L
+    return out
+
+def rows_length_cm(rows: List[Dict]) -> int: return sum(r.get("len_cm", EURO_L_CM) for r in rows)
+def rows_pallets(rows: List[Dict]) -> int:   return sum(r.get("pallets", 0) for r in rows)
+
+# ------------------ Tail-Guard: keine Singles in letzten 4 Reihen ------------------
+# Regeln: keine 1-quer in den letzten 4 Reihen, letzte Reihe voll, Länge ≤ 1360, exakte Palettenzahl.
+# Ein Durchlauf mit laufenden Summen (Länge/Paletten), ein einziger Splice, keine Rekursion.
+EURO_MAX_PAL = TRAILER_LEN_CM * 3 // EURO_L_CM   # 34 – 3-längs und 2-quer haben dieselbe Dichte (40 cm/Palette)
+
+def _canonical_euro(n: int) -> List[Dict]:
+    """
+    Regelkonformes Standard-Layout direkt konstruiert (früher: Rückfall auf layout_for_preset_euro_stable).
+    n%3==0: nur längs · n%3==2: 1× 2-quer vorne · n%3==1: 1-quer vorne, wenn ≥4 Reihen folgen und es passt,
+    sonst 2× 2-quer vorne. Mehr als EURO_MAX_PAL passt nicht – dann das volle Layout mit EURO_MAX_PAL.
+    """
+    n = max(0, min(n, EURO_MAX_PAL))
+    if n == 0: return []
+    if n == 1: return [euro_row_trans1()]   # einzig mögliche Belegung
+    rest = n % 3
+    if rest == 0: return [euro_row_long()] * (n // 3)
+    if rest == 2: return [euro_row_trans2()] + [euro_row_long()] * (n // 3)
+    longs = n // 3
+    if longs >= 4 and EURO_W_CM + longs * EURO_L_CM <= TRAILER_LEN_CM:
+        return [euro_row_trans1()] + [euro_row_long()] * longs
+    return [euro_row_trans2(), euro_row_trans2()] + [euro_row_long()] * (longs - 1)
+
+def enforce_tail_no_single(rows: List[Dict], target_pal: int) -> List[Dict]:
+    # 1) kappen + Singles im Heckfenster entfernen, Summen laufend mitführen
+    capped: List[Dict] = []; length = 0
+    for r in rows:
+        L = r.get("len_cm", EURO_L_CM)
+        if length + L > TRAILER_LEN_CM: break
+        capped.append(r); length += L
+    tail_start = max(0, len(capped) - 4)
+    out: List[Dict] = []; length = 0; pal = 0
+    for i, r in enumerate(capped):
+        if i >= tail_start and r["type"] == "EURO_1_TRANS":
+            continue
+        out.append(r); length += r.get("len_cm", EURO_L_CM); pal += r.get("pallets", 0)
+    if out and out[-1]["type"] == "EURO_1_TRANS":
+        r = out.pop(); length -= r.get("len_cm", EURO_L_CM); pal -= r.get("pallets", 0)
+
+    deficit = target_pal - pal
+    if deficit < 0: return _canonical_euro(target_pal)
+    if deficit == 0: return out
+
+    # 2) Fehlmenge auffüllen: 2-quer vorne, 3-längs als Block vor dem Heckfenster, ggf. 2-quer vorne
+    insert_limit = max(0, len(out) - 4)
+    front: List[Dict] = []
+    if deficit % 3 == 2 and length + EURO_W_CM <= TRAILER_LEN_CM:
+        front.append(euro_row_trans2()); length += EURO_W_CM; deficit -= 2
+    n_long = 0
+    if deficit >= 3:
+        n_long = min(deficit // 3, max(0, (TRAILER_LEN_CM - length) // EURO_L_CM))
+        length += n_long * EURO_L_CM; deficit -= 3 * n_long
+    if deficit == 2 and length + EURO_W_CM <= TRAILER_LEN_CM:
+        lead = [euro_row_trans2()]; length += EURO_W_CM; deficit -= 2
+    else:
+        lead = []
+    if deficit != 0: return _canonical_euro(target_pal)
+
+    seq = front + out          # Längs-Block sitzt an Index insert_limit der Folge inkl. vorderem 2-quer
+    result = lead + seq[:insert_limit] + [euro_row_long()] * n_long + seq[insert_limit:]
+
+    # 3) Heckfenster prüfen (nur die letzten 4 Reihen)
+    if any(r["type"] == "EURO_1_TRANS" for r in result[-4:]):
+        return _canonical_euro(target_pal)
+    return result
+
+# ------------------ Euro-Layouts (stabil & exakt) ------------------
+def layout_for_preset_euro_stable(n: int, singles_front: int = 0) -> List[Dict]:
+    rows: List[Dict] = []; remaining = n
+    take = min(max(0, singles_front), 2, remaining)
+    for _ in range(take): rows.append(euro_row_trans1()); remaining -= 1
+
+    if remaining >= 2 and (remaining - 2) % 3 == 0:
+        rows.append(euro_row_trans2()); remaining -= 2
+
+    while remaining % 3 != 0 and any(r["type"] == "EURO_1_TRANS" for r in rows):
+        for i, r in enumerate(rows):
+            if r["type"] == "EURO_1_TRANS":
+                rows.pop(i); remaining += 1; break
+
+    if remaining > 0:
+        rows += [euro_row_long() for _ in range(remaining // 3)]
+
+    if rows_pallets(rows) != n:
+        if n >= 2 and (n - 2) % 3 == 0:
+            rows = [euro_row_trans2()] + [euro_row_long() for _ in range((n - 2) // 3)]
+        else:
+            rows = [euro_row_long() for _ in range(n // 3)]
+            rest = n % 3
+            if rest == 2: rows.insert(0, euro_row_trans2())
+            elif rest == 1: rows.insert(0, euro_row_trans1())
+    return enforce_tail_no_single(rows, n)
+
+def build_euro_exact_tail(n: int) -> List[Dict]:
+    if n <= 0: return []
+    s = max(0, 34 - n)   # minimale 1-quer
+    rem = n - s          # 3a + 2k = rem
+    a_max = rem // 3
+    if a_max % 2 == 1: a_max -= 1
+
+    a = -1
+    for cand in range(a_max, -1, -2):      # nur gerade a
+        if (rem - 3*cand) % 2 == 0:
+            a = cand; break
+    if a < 0:
+        return layout_for_preset_euro_stable(n, singles_front=0)
+
+    k = (rem - 3*a) // 2
+    rows: List[Dict] = []
+    s_front = s // 2; s_tailguard = s - s_front
+    for _ in range(s_front): rows.append(euro_row_trans1())
+    rows += [euro_row_long() for _ in range(a)]
+    rows += [euro_row_trans2() for _ in range(k)]
+    if s_tailguard > 0:
+        insert_at = max(0, len(rows) - 4)
+        rows = rows[:insert_at] + [euro_row_trans1() for _ in range(s_tailguard)] + rows[insert_at:]
+    return enforce_tail_no_single(rows, n)
+
+# ------------------ Industrie-Layout ------------------
+def layout_for_preset_industry(n: int) -> List[Dict]:
+    if n <= 0: return []
+    rows: List[Dict] = []
+    single = n % 2; full = n // 2
+    if single: rows.append(ind_single())
+    rows += [ind_row2_long() for _ in range(full)]
+    return rows
+
+def layout_for_preset_flower(n: int) -> List[Dict]:
+    """Blumenwagen: volle 4er-Reihen, Rest (1–3) als quer gestellte Einzelwagen vorne (57 cm je Wagen)."""
+    if n <= 0: return []
+    return [flower_single() for _ in range(n % 4)] + [flower_row4_long() for _ in range(n // 4)]
+
+# ------------------ Gewicht: Block/Verteilen ------------------
+def _cat_of_row(r: Dict) -> str:
+    t = r.get("type","")
+    if t.startswith("EURO_"): return "EURO"
+    if t.startswith("IND"): return "IND"
+    return "FLOWER" if t.startswith("FLOWER_") else "OTHER"
+
+def reorder_rows_heavy(rows: List[Dict],
+                       heavy_euro_count: int,
+                       heavy_ind_count: int,
+                       side: str = "front",
+                       group_by_type: bool = True,
+                       type_order: Tuple[str,str] = ("EURO","IND")) -> List[Dict]:
+    if heavy_euro_count <= 0 and heavy_ind_count <= 0:
+        return rows
+
+    idx_iter = range(len(rows)) if side == "front" else reversed(range(len(rows)))
+    taken_idx_e, taken_idx_i = [], []
+    need_e, need_i = heavy_euro_count, heavy_ind_count
+
+    for i in idx_iter:
+        r = rows[i]; cat = _cat_of_row(r)
+        if cat == "EURO" and need_e > 0:
+            taken_idx_e.append(i); need_e -= r.get("pallets", 0)
+        elif cat == "IND" and need_i > 0:
+            taken_idx_i.append(i); need_i -= r.get("pallets", 0)
+        if need_e <= 0 and need_i <= 0: break
+
+    taken = set(taken_idx_e + taken_idx_i)
+    remaining = [r for j, r in enumerate(rows) if j not in taken]
+    block_e = [rows[j] for j in sorted(taken_idx_e)]
+    block_i = [rows[j] for j in sorted(taken_idx_i)]
+
+    if group_by_type:
+        block = []
+        for cat in type_order:
+            if cat == "EURO": block += block_e
+            elif cat == "IND": block += block_i
+    else:
+        block = [rows[j] for j in sorted(taken)]
+
+    return (block + remaining) if side == "front" else (remaining + block)
+
+def pick_heavy_rows_rear_biased(rows: List[Dict], heavy_total: int) -> Set[int]:
+    if heavy_total <= 0 or not rows: return set()
+    N = len(rows); scored = []
+    for i, r in enumerate(rows):
+        pos = (i + 1) / N
+        bias = 0.6*pos + 0.4*(pos**2)
+        typ = r.get("type","")
+        bonus = 0.08 if ("_1_" in typ or "_2_" in typ or "IND_SINGLE" in typ) else 0.0
+        scored.append((i, bias + bonus, r.get("pallets", 0)))
+    scored.sort(key=lambda t: t[1], reverse=True)
+    picked: Set[int] = set(); total = 0
+
+    def neighbors(k: int) -> bool: return (k-1 in picked) or (k+1 in picked)
+
+    for idx, _, pal in scored:
+        if total >= heavy_total: break
+        if neighbors(idx): continue
+        picked.add(idx); total += pal
+
+    if total < heavy_total:
+        for idx, _, pal in scored:
+            if total >= heavy_total: break
+            if idx in picked: continue
+            if ((idx-1 in picked) and (idx-2 in picked)) or ((idx+1 in picked) and (idx+2 in picked)):
+                continue
+            picked.add(idx); total += pal
+    return picked
+
+# ------------------ Geometrie (Rechtecke je Palette) ------------------
+COLOR_EURO_LONG = "#d9f2d9"
+COLOR_EURO_QUER = "#cfe8ff"
+COLOR_IND      = "#ffe2b3"
+COLOR_FLOWER   = "#f6d3e6"
+COLOR_HEAVY = {COLOR_EURO_LONG: "#bfe6bf", COLOR_EURO_QUER: "#a8d7ff",   # Schwer: kräftigere Fläche je Farbe
+               COLOR_IND: "#ffd089", COLOR_FLOWER: "#efb4d4"}
+EDGE           = "#4a4a4a"
+
+def rows_to_rects(rows: List[Dict]) -> List[Tuple[float,float,float,float,str,str,bool]]:
+    rects = []; x = 0
+    for r in rows:
+        t = r["type"]; L = r["len_cm"]
+        if t == "EURO_3_LONG":
+            for lane in range(3): rects.append((x, lane*80, 120, 80, COLOR_EURO_LONG, "EURO", False))
+            x += L
+        elif t == "EURO_2_TRANS":
+            for lane in range(2): rects.append((x, lane*120, 80, 120, COLOR_EURO_QUER, "EURO", False))
+            x += L
+        elif t == "EURO_1_TRANS":
+            rects.append((x, 60, 80, 120, COLOR_EURO_QUER, "EURO", False)); x += L
+        elif t == "IND_ROW_2_LONG":
+            rects.append((x, 20, 120, 100, COLOR_IND, "IND", False))
+            rects.append((x,120, 120, 100, COLOR_IND, "IND", False)); x += L
+        elif t == "IND_SINGLE":
+            rects.append((x, 70, 120, 100, COLOR_IND, "IND", False)); x += L
+        elif t == "FLOWER_4_LONG":
+            for lane in range(4): rects.append((x, 6 + lane*57, 135, 57, COLOR_FLOWER, "FLOWER", False))
+            x += L
+        elif t == "FLOWER_1_TRANS":
+            rects.append((x, 52, 57, 135, COLOR_FLOWER, "FLOWER", False)); x += L
+    return rects
+
+def rows_to_rects_with_row_index(rows: List[Dict]):
+    rects = []; meta  = []; x = 0
+    for i, r in enumerate(rows):
+        t = r["type"]; L = r["len_cm"]
+        if t == "EURO_3_LONG":
+            for lane in range(3):
+                rects.append((x, lane*80, 120, 80, COLOR_EURO_LONG, "EURO"))
+                meta.append({"row_idx": i, "cat": "EURO"})
+            x += L
+        elif t == "EURO_2_TRANS":
+            for lane in range(2):
+                rects.append((x, lane*120, 80, 120, COLOR_EURO_QUER, "EURO"))
+                meta.append({"row_idx": i, "cat": "EURO"})
+            x += L
+        elif t == "EURO_1_TRANS":
+            rects.append((x, 60, 80, 120, COLOR_EURO_QUER, "EURO"))
+            meta.append({"row_idx": i, "cat": "EURO"})
+            x += L
+        elif t == "IND_ROW_2_LONG":
+            for y0 in (20, 120):
+                rects.append((x, y0, 120, 100, COLOR_IND, "IND"))
+                meta.append({"row_idx": i, "cat": "IND"})
+            x += L
+        elif t == "IND_SINGLE":
+            rects.append((x, 70, 120, 100, COLOR_IND, "IND"))
+            meta.append({"row_idx": i, "cat": "IND"})
+            x += L
+        elif t == "FLOWER_4_LONG":
+            for lane in range(4):
+                rects.append((x, 6 + lane*57, 135, 57, COLOR_FLOWER, "FLOWER"))
+                meta.append({"row_idx": i, "cat": "FLOWER"})
+            x += L
+        elif t == "FLOWER_1_TRANS":
+            rects.append((x, 52, 57, 135, COLOR_FLOWER, "FLOWER"))
+            meta.append({"row_idx": i, "cat": "FLOWER"})
+            x += L
+    return rects, meta
+
+def rows_to_rects_with_weights(rows: List[Dict],
+                               heavy_euro_count: int = 0, heavy_euro_side: str = "front",
+                               heavy_ind_count: int = 0,  heavy_ind_side: str  = "front"):
+    rects = []; x = 0; euro_rects = []; ind_rects  = []
+    for r in cap_to_trailer(rows):
+        t = r["type"]; L = r["len_cm"]
+        if t == "EURO_3_LONG":
+            for lane in range(3):
+                rects.append((x, lane*80, 120, 80, COLOR_EURO_LONG, "EURO", False))
+                euro_rects.append(len(rects)-1)
+            x += L
+        elif t == "EURO_2_TRANS":
+            for lane in range(2):
+                rects.append((x, lane*120, 80, 120, COLOR_EURO_QUER, "EURO", False))
+                euro_rects.append(len(rects)-1)
+            x += L
+        elif t == "EURO_1_TRANS":
+            rects.append((x, 60, 80, 120, COLOR_EURO_QUER, "EURO", False))
+            euro_rects.append(len(rects)-1)
+            x += L
+        elif t == "IND_ROW_2_LONG":
+            for y0 in (20, 120):
+                rects.append((x, y0, 120, 100, COLOR_IND, "IND", False))
+                ind_rects.append(len(rects)-1)
+            x += L
+        elif t == "IND_SINGLE":
+            rects.append((x, 70, 120, 100, COLOR_IND, "IND", False))
+            ind_rects.append(len(rects)-1)
+            x += L
+        elif t == "FLOWER_4_LONG":   # Blumenwagen: Gewichtsklasse wie Industrie
+            for lane in range(4):
+                rects.append((x, 6 + lane*57, 135, 57, COLOR_FLOWER, "FLOWER", False))
+                ind_rects.append(len(rects)-1)
+            x += L
+        elif t == "FLOWER_1_TRANS":
+            rects.append((x, 52, 57, 135, COLOR_FLOWER, "FLOWER", False))
+            ind_rects.append(len(rects)-1)
+            x += L
+
+    euro_cnt = len(euro_rects)
+    if heavy_euro_count > 0 and euro_cnt > 0:
+        indices = (list(reversed(euro_rects)) if heavy_euro_side == "rear" else euro_rects)[:heavy_euro_count]
+        for idx in indices:
+            x0,y0,w0,h0,c0,cat0,_ = rects[idx]
+            rects[idx] = (x0,y0,w0,h0,c0,cat0,True)
+    euro_hvy = sum(1 for i in euro_rects if rects[i][6] is True)
+
+    ind_cnt = len(ind_rects)
+    if heavy_ind_count > 0 and ind_cnt > 0:
+        indices = (list(reversed(ind_rects)) if heavy_ind_side == "rear" else ind_rects)[:heavy_ind_count]
+        for idx in indices:
+            x0,y0,w0,h0,c0,cat0,_ = rects[idx]
+            rects[idx] = (x0,y0,w0,h0,c0,cat0,True)
+    ind_hvy = sum(1 for i in ind_rects if rects[i][6] is True)
+
+    return rects, euro_cnt, ind_cnt, euro_hvy, ind_hvy
+
+# ------------------ Layout-Kennzahlen (je Layout-Code einmal gerechnet) ------------------
+class LayoutMetrics(NamedTuple):
+    pallets: int
+    n_euro: int           # Euro-Rechtecke
+    n_ind: int            # Industrie + Blumenwagen (Gewicht je Stück: kg_ind)
+    used_cm: int
+    tail_single: bool     # 1-quer in den letzten 4 Reihen
+    last_full: bool
+    switches: int         # Längs/Quer-Wechsel
+    sx_euro: float        # Summe der x-Mittelpunkte (cm) aller Euro-Rechtecke
+    sx_ind: float
+
+@lru_cache(maxsize=16384)
+def _metrics_for_code(code: bytes) -> LayoutMetrics:
+    rows = decode_rows(code)
+    rects = rows_to_rects(rows)
+    sx_e = sx_i = 0.0; n_e = n_i = 0
+    for (x, y, w, h, color, cat, hv) in rects:
+        if cat == "EURO": sx_e += x + w / 2.0; n_e += 1
+        else:             sx_i += x + w / 2.0; n_i += 1
+    tail_start = max(0, len(rows) - 4)
+    def is_qu(tp):  return tp in ("EURO_2_TRANS", "EURO_1_TRANS")
+    return LayoutMetrics(
+        pallets=rows_pallets(rows), n_euro=n_e, n_ind=n_i, used_cm=rows_length_cm(rows),
+        tail_single=any(r["type"] == "EURO_1_TRANS" for r in rows[tail_start:]),
+        last_full=(not rows) or rows[-1]["type"] not in ("EURO_1_TRANS", "IND_SINGLE", "FLOWER_1_TRANS"),
+        switches=sum(1 for a, b in zip(rows, rows[1:]) if is_qu(a["type"]) != is_qu(b["type"])),
+        sx_euro=sx_e, sx_ind=sx_i,
+    )
+
+def layout_metrics(rows: List[Dict]) -> LayoutMetrics:
+    """Kennzahlen des (auf den Trailer gekappten) Layouts – gecacht über den Layout-Code."""
+    return _metrics_for_code(encode_rows(cap_to_trailer(rows)))
+
+def estimate_axle_loads(rows: List[Dict], kg_euro: int, kg_ind: int) -> Tuple[float, float, float]:
+    if kg_euro <= 0 and kg_ind <= 0: return (0.0, 0.0, 0.0)
+    m = layout_metrics(rows)
+    L = float(TRAILER_LEN_CM)
+    we = kg_euro if kg_euro > 0 else 0; wi = kg_ind if kg_ind > 0 else 0
+    W = float(we * m.n_euro + wi * m.n_ind)
+    M_about_front = we * m.sx_euro + wi * m.sx_ind
+    if W <= 0: return (0.0, 0.0, 0.0)
+    R_rear = M_about_front / L
+    R_front = W - R_rear
+    return (max(0.0, R_front), max(0.0, R_rear), W)
+
+def caption_axle(front: float, rear: float, total: float) -> str:
+    if total <= 0: return ""
+    pf = 100.0 * front / total
+    pr = 100.0 * rear  / total
+    return f"Achslast (grob): Front ≈ **{front:.0f} kg** ({pf:.1f}%), Rear ≈ **{rear:.0f} kg** ({pr:.1f}%)."
+
+# ------------------ Schwerpunkt 2D (längs + seitlich) ------------------
+# Ein Durchlauf über die Rechtecke: Gewicht, x- und y-Moment. Seitlich: Hebelmodell zwischen y=0 (links)
+# und y=240 (rechts). Bei gleichen Gewichten liegt jeder Reihentyp mittig (y=120) – einseitig wird es nur
+# durch Schwer-Markierung. Unmarkierte Paletten zählen dann mit `light_factor` × kg (Annahme, in der UI einstellbar).
+# Nur Anzeige: Grog-Varianten tragen keine Schwer-Markierung, liegen seitlich also immer mittig – kein Scorer-Term.
+LIGHT_FACTOR = 0.5
+LATERAL_TOL  = 0.05     # mehr als 55/45 links/rechts wird markiert
+
+class Cog2D(NamedTuple):
+    x_cm: float
+    y_cm: float
+    total: float
+    rear_share: float
+    left_share: float
+
+    @property
+    def lateral_dev(self) -> float:
+        return abs(self.left_share - 0.5)
+
+def _rect_weight(cat: str, heavy: bool, kg_euro: int, kg_ind: int, light_factor: float) -> float:
+    kg = (kg_euro or 1.0) if cat == "EURO" else (kg_ind or 1.0)
+    return kg if heavy else kg * light_factor
+
+def cog_2d(rects: List[Tuple], kg_euro: int, kg_ind: int, light_factor: float = LIGHT_FACTOR) -> Cog2D:
+    """rects wie rows_to_rects_with_weights (7-Tupel mit Schwer-Flag)."""
+    W = Mx = My = 0.0
+    any_heavy = any(r[6] for r in rects)
+    for (x, y, w, h, c, cat, hv) in rects:
+        wt = _rect_weight(cat, hv or not any_heavy, kg_euro, kg_ind, light_factor)
+        W += wt; Mx += wt * (x + w / 2.0); My += wt * (y + h / 2.0)
+    if W <= 0: return Cog2D(TRAILER_LEN_CM / 2.0, TRAILER_W_CM / 2.0, 0.0, 0.5, 0.5)
+    x, y = Mx / W, My / W
+    return Cog2D(x, y, W, x / TRAILER_LEN_CM, 1.0 - y / TRAILER_W_CM)
+
+def caption_cog(c: Cog2D) -> str:
+    if c.total <= 0: return ""
+    txt = (f"Schwerpunkt: x ≈ {c.x_cm:.0f} cm, y ≈ {c.y_cm:.0f} cm "
+           f"(links {c.left_share*100:.0f} % / rechts {(1-c.left_share)*100:.0f} %)")
+    if c.lateral_dev > LATERAL_TOL: txt += " – ⚠️ seitlich unausgeglichen"
+    return txt
+
+# ------------------ Stapeln: zweite Lage (Höhe, stapelbar, Auflast) ------------------
+# Bodenlayout wie Clean (Euro vorne, Industrie dahinter), nur so viele Paletten oben wie auf dem Boden
+# keinen Platz finden. Welche Bodenplätze eine zweite Lage bekommen, entscheidet eine DP je Bodenplatz:
+# je Kategorie erreichbare Moment-Summen als Bitmaske je Stapelanzahl (x-Mitten liegen im 20-cm-Raster),
+# danach die Kombination Euro/Industrie, die dem Ziel-Heckanteil am nächsten kommt.
+MAX_LOAD_HEIGHT_CM = 270
+_STACK_GRID_CM = 20
+
+class PalletSpec(NamedTuple):
+    height_cm: int = 120
+    stackable: bool = False
+    top_load_kg: int = 1000       # max. Auflast auf dieser Palette
+
+class StackPlan(NamedTuple):
+    rows: List[Dict]              # Bodenlayout
+    tiers: Tuple[int, ...]        # je Boden-Rechteck (Reihenfolge wie rows_to_rects): 1 oder 2 Lagen
+    stacked_euro: int
+    stacked_ind: int
+
+def can_stack(spec: PalletSpec, kg_top: int, max_height_cm: int = MAX_LOAD_HEIGHT_CM) -> Tuple[bool, str]:
+    if not spec.stackable: return False, "nicht stapelbar"
+    if 2 * spec.height_cm > max_height_cm: return False, f"2×{spec.height_cm} cm > {max_height_cm} cm"
+    if kg_top > spec.top_load_kg: return False, f"Auflast {kg_top} kg > {spec.top_load_kg} kg"
+    return True, "ok"
+
+def _floor_rows(euro_n: int, ind_n: int) -> List[Dict]:
+    euro = layout_for_preset_euro_stable(euro_n, singles_front=0) if euro_n > 0 else []
+    ind = layout_for_preset_industry(ind_n) if ind_n > 0 else []
+    if rows_length_cm(euro + ind) > TRAILER_LEN_CM and euro_n % 3 == 1 and euro_n >= 4:
+        euro = [euro_row_trans2(), euro_row_trans2()] + [euro_row_long()] * ((euro_n - 4) // 3)   # 40 cm je Palette statt 1-quer
+    return euro + ind
+
+def _stack_choices(units: List[int], k: int) -> Tuple[List[int], List[List[int]]]:
+    """DP je Bodenplatz: reach[j][c] = Bitmaske der Summen mit c Stapeln unter den ersten j Plätzen."""
+    reach = [[0] * (k + 1) for _ in range(len(units) + 1)]
+    reach[0][0] = 1
+    for j, u in enumerate(units):
+        prev, cur = reach[j], reach[j + 1]
+        for c in range(k + 1):
+            cur[c] = prev[c] | (prev[c - 1] << u if c else 0)
+    sums = [b for b in range(reach[-1][k].bit_length()) if reach[-1][k] >> b & 1]
+    return sums, reach
+
+def _stack_backtrack(units: List[int], reach: List[List[int]], k: int, total: int) -> List[int]:
+    picked = []
+    for j in range(len(units), 0, -1):
+        if k and total >= units[j - 1] and reach[j - 1][k - 1] >> (total - units[j - 1]) & 1:
+            picked.append(j - 1); total -= units[j - 1]; k -= 1
+    return picked
+
+def plan_stacked(euro_n: int, ind_n: int, spec_euro: PalletSpec, spec_ind: PalletSpec,
+                 kg_euro: int = 0, kg_ind: int = 0, max_height_cm: int = MAX_LOAD_HEIGHT_CM,
+                 target_rear_share: float = 0.52) -> Optional[StackPlan]:
+    """Stapel-Plan mit möglichst wenigen Stapeln; None, wenn es auch gestapelt nicht passt."""
+    ok_e = euro_n > 0 and can_stack(spec_euro, kg_euro, max_height_cm)[0]
+    ok_i = ind_n > 0 and can_stack(spec_ind, kg_ind, max_height_cm)[0]
+    lo_e = (euro_n + 1) // 2 if ok_e else euro_n
+    lo_i = (ind_n + 1) // 2 if ok_i else ind_n
+    best = None
+    for stacks in range(0, (euro_n - lo_e) + (ind_n - lo_i) + 1):
+        for s_e in range(min(stacks, euro_n - lo_e), -1, -1):
+            s_i = stacks - s_e
+            if s_i > ind_n - lo_i: continue
+            rows = _floor_rows(euro_n - s_e, ind_n - s_i)
+            if rows_length_cm(rows) <= TRAILER_LEN_CM and rows_pallets(rows) == euro_n + ind_n - stacks:
+                best = (rows, s_e, s_i); break
+        if best: break
+    if best is None: return None
+    rows, s_e, s_i = best
+    rects = rows_to_rects(rows)
+    if s_e == 0 and s_i == 0:
+        return StackPlan(rows, tuple(1 for _ in rects), 0, 0)
+
+    we = kg_euro or 1.0; wi = kg_ind or 1.0
+    idx_e = [k for k, r in enumerate(rects) if r[5] == "EURO"]
+    idx_i = [k for k, r in enumerate(rects) if r[5] == "IND"]
+    unit = lambda k: int(round((rects[k][0] + rects[k][2] / 2.0) / _STACK_GRID_CM))
+    u_e = [unit(k) for k in idx_e]; u_i = [unit(k) for k in idx_i]
+    W = we * euro_n + wi * ind_n
+    M_floor = sum((we if r[5] == "EURO" else wi) * (r[0] + r[2] / 2.0) for r in rects)
+    want = target_rear_share * TRAILER_LEN_CM * W - M_floor        # gewünschtes Zusatzmoment der oberen Lage
+    sums_e, reach_e = _stack_choices(u_e, s_e)
+    sums_i, reach_i = _stack_choices(u_i, s_i)
+    g = float(_STACK_GRID_CM)
+    best_pair, best_err = None, float("inf")
+    for a in sums_e:
+        rest = (want - we * g * a) / (wi * g)
+        j = bisect.bisect_left(sums_i, rest)
+        for b in sums_i[max(0, j - 1):j + 1]:
+            err = abs(we * g * a + wi * g * b - want)
+            if err < best_err: best_pair, best_err = (a, b), err
+    a, b = best_pair
+    tiers = [1] * len(rects)
+    for j in _stack_backtrack(u_e, reach_e, s_e, a): tiers[idx_e[j]] = 2
+    for j in _stack_backtrack(u_i, reach_i, s_i, b): tiers[idx_i[j]] = 2
+    return StackPlan(rows, tuple(tiers), s_e, s_i)
+
+def estimate_axle_loads_stacked(plan: StackPlan, kg_euro: int, kg_ind: int) -> Tuple[float, float, float]:
+    """Wie estimate_axle_loads, obere Lage zählt mit (gleiche x-Mitte wie die Palette darunter)."""
+    if kg_euro <= 0 and kg_ind <= 0: return (0.0, 0.0, 0.0)
+    we = max(0, kg_euro); wi = max(0, kg_ind)
+    W = M = 0.0
+    for (x, y, w, h, color, cat, hv), t in zip(rows_to_rects(plan.rows), plan.tiers):
+        kg = (we if cat == "EURO" else wi) * t
+        W += kg; M += kg * (x + w / 2.0)
+    if W <= 0: return (0.0, 0.0, 0.0)
+    R_rear = M / float(TRAILER_LEN_CM)
+    return (max(0.0, W - R_rear), max(0.0, R_rear), W)
+
+# ------------------ Mehrere Abladestellen (Multi-Drop) ------------------
+# Stopp 1 wird zuerst entladen → sitzt am Heck; der letzte Stopp ganz vorne. Jeder Stopp ist ein
+# zusammenhängender Reihenblock (keine gemischten Reihen) – so bleibt jeder Stopp von den Hecktüren erreichbar.
+# Je Stopp wenige Block-Optionen (Anzahl 2-quer, 2-quer vorne/hinten im Block, Industrie vorne/hinten);
+# DP über die Blöcke (von vorne nach hinten) mit Zustand (Startposition, Heckanteil in ‰, letzte Reihe quer?),
+# je Zustand nur die wenigsten Wechsel. Die Endkandidaten werden exakt mit score_layout_grog bewertet.
+class Stop(NamedTuple):
+    name: str
+    euro_n: int
+    ind_n: int
+
+class MultiDropPlan(NamedTuple):
+    rows: List[Dict]
+    stop_of_row: Tuple[int, ...]     # Index in `stops` je Reihe
+    score: float
+    rear_share: float
+
+def _stop_block_options(euro_n: int, ind_n: int) -> List[List[Dict]]:
+    euro_opts: List[List[Dict]] = []
+    if euro_n == 1:
+        euro_opts.append([euro_row_trans1()])
+    elif euro_n > 1:
+        ks = [k for k in range(euro_n // 2 + 1) if (euro_n - 2 * k) % 3 == 0][:3]
+        for k in ks:
+            longs = [euro_row_long()] * ((euro_n - 2 * k) // 3)
+            euro_opts.append([euro_row_trans2()] * k + longs)
+            if k and longs: euro_opts.append(longs + [euro_row_trans2()] * k)
+    else:
+        euro_opts.append([])
+    ind = layout_for_preset_industry(ind_n)
+    out: List[List[Dict]] = []
+    for e in euro_opts:
+        out.append(ind + e)
+        if ind and e: out.append(e + ind)
+    return out
+
+def plan_multidrop(stops: List[Stop], kg_euro: int, kg_ind: int,
+                   target_rear_share: float = 0.52, keep_final: int = 8) -> Optional[MultiDropPlan]:
+    """Bestes Layout mit Stopp-Blöcken in Entladereihenfolge; None, wenn es nicht auf den Trailer passt."""
+    if not stops: return None
+    we = kg_euro or 1.0; wi = kg_ind or 1.0
+    L = float(TRAILER_LEN_CM)
+    W = sum(we * s.euro_n + wi * s.ind_n for s in stops)
+    if W <= 0: return None
+    is_qu = lambda r: r["type"] in ("EURO_2_TRANS", "EURO_1_TRANS")
+    # Blöcke von vorne nach hinten: letzter Stopp zuerst
+    order = list(range(len(stops)))[::-1]
+    blocks = []
+    for si in order:
+        opts = []
+        for rows in _stop_block_options(stops[si].euro_n, stops[si].ind_n):
+            x = 0; m = 0.0; wb = 0.0
+            for r in rows:
+                wr = r["pallets"] * (wi if r["type"].startswith("IND") else we)
+                m += wr * (x + r["len_cm"] / 2.0); wb += wr; x += r["len_cm"]
+            sw = sum(1 for a, b in zip(rows, rows[1:]) if is_qu(a) != is_qu(b))
+            opts.append((rows, x, wb, m, sw))
+        blocks.append((si, opts))
+    # Zustand: (x, Heckanteil-Bucket ‰, letzte Reihe quer) -> (Wechsel, Moment, Pfad)
+    states: Dict[Tuple[int, int, Optional[bool]], Tuple[int, float, Tuple[int, ...]]] = {(0, 0, None): (0, 0.0, ())}
+    for si, opts in blocks:
+        nxt: Dict[Tuple[int, int, Optional[bool]], Tuple[int, float, Tuple[int, ...]]] = {}
+        for (x, _b, last_qu), (sw, M, path) in states.items():
+            for oi, (rows, length, wb, m, swb) in enumerate(opts):
+                if x + length > TRAILER_LEN_CM: continue
+                nM = M + wb * x + m
+                nsw = sw + swb
+                if rows and last_qu is not None and is_qu(rows[0]) != last_qu: nsw += 1
+                key = (x + length, int(round(nM / (L * W) * 1000)), is_qu(rows[-1]) if rows else last_qu)
+                cur = nxt.get(key)
+                if cur is None or nsw < cur[0]:
+                    nxt[key] = (nsw, nM, path + (oi,))
+        states = nxt
+        if not states: return None
+    # Endkandidaten: nach grober Schätzung vorsortieren, dann exakt bewerten
+    def rough(item):
+        (x, b, _q), (sw, M, _p) = item
+        dev = M / (L * W) - target_rear_share
+        return 0.6 * (TRAILER_LEN_CM - x) + 220.0 * dev * dev + 3.5 * sw
+    best = None
+    for (_k, (_sw, _M, path)) in sorted(states.items(), key=rough)[:max(1, keep_final)]:
+        rows: List[Dict] = []; owner: List[int] = []
+        for (si, opts), oi in zip(blocks, path):
+            rows += opts[oi][0]; owner += [si] * len(opts[oi][0])
+        sc = score_layout_grog(rows, kg_euro=kg_euro, kg_ind=kg_ind, target_rear_share=target_rear_share)
+        if best is None or sc < best.score:
+            best = MultiDropPlan(rows, tuple(owner), sc, _weight_split_grog(rows, kg_euro, kg_ind))
+    return best
+
+# ---------- GROG: Auto-Scorer & Auswahl ----------
+def _has_tail_single(rows: List[Dict]) -> bool:
+    return layout_metrics(rows).tail_single
+
+def _last_row_full(rows: List[Dict]) -> bool:
+    return layout_metrics(rows).last_full
+
+def _weight_split_grog(rows: List[Dict], kg_euro: int, kg_ind: int) -> float:
+    return _rear_share_of(layout_metrics(rows), kg_euro, kg_ind)
+
+def _rear_share_of(m: LayoutMetrics, kg_euro: int, kg_ind: int) -> float:
+    if m.n_euro + m.n_ind == 0: return 0.5
+    L = float(TRAILER_LEN_CM)
+    we = kg_euro or 1.0; wi = kg_ind or 1.0
+    W = we * m.n_euro + wi * m.n_ind
+    M_front = we * m.sx_euro + wi * m.sx_ind
+    if W <= 0: return 0.5
+    rear = M_front / L
+    rear_share = max(0.0, min(1.0, rear / W))
+    return rear_share
+
+def score_layout_grog(rows: List[Dict],
+                      kg_euro: int = 0,
+                      kg_ind: int = 0,
+                      target_rear_share: float = 0.52,
+                      w_tail_single: float = 1000.0,
+                      w_last_not_full: float = 80.0,
+                      w_unused_cm: float = 0.6,
+                      w_rear_dev: float = 220.0,
+                      w_switch: float = 3.5) -> float:
+    m = layout_metrics(rows)
+    s = 0.0
+    if m.tail_single: s += w_tail_single
+    if not m.last_full: s += w_last_not_full
+    unused = max(0, TRAILER_LEN_CM - m.used_cm)
+    s += w_unused_cm * unused
+    rear_share = _rear_share_of(m, kg_euro, kg_ind)
+    dev = rear_share - target_rear_share
+    s += w_rear_dev * (dev * dev)
+    s += w_switch * m.switches
+    return s
+
+def grog_pick_best(variants: List[Tuple[str, List[Dict]]],
+                   kg_euro: int,
+                   kg_ind: int,
+                   target_rear_share: float,
+                   topk: int = 4) -> List[Tuple[str, List[Dict], float, float]]:
+    scored = []
+    for title, rows in variants:
+        sc = score_layout_grog(rows, kg_euro=kg_euro, kg_ind=kg_ind,
+                               target_rear_share=target_rear_share)
+        rear = _weight_split_grog(rows, kg_euro, kg_ind)
+        scored.append((title, rows, sc, rear))
+    scored.sort(key=lambda t: t[2])
+    return scored[:topk]
+
+# ---------- GROG: Rangfolge über den ganzen Ziel-Heckanteil-Bereich ----------
+# score_i(t) = c_i + w·(r_i − t)² = (c_i + w·r_i²) − 2·w·r_i·t + w·t². Der Term w·t² ist für alle gleich,
+# die Reihenfolge ist also die von Geraden a_i − b_i·t und ändert sich nur an deren Schnittpunkten.
+# Einmal per Kinetic-Sweep (nur Nachbarn tauschen) alle Knickstellen im Slider-Bereich bestimmen,
+# danach ist jede Slider-Position ein bisect-Lookup. Der Sweep läuft nur über Geraden, die im Bereich
+# überhaupt in die Top-`keep` kommen können – kalt (neue kg) kostet er damit etwa so viel wie grog_pick_best.
+class GrogRanking:
+    def __init__(self, variants: List[Tuple[str, List[Dict]]], kg_euro: int, kg_ind: int,
+                 t_lo: float = 0.40, t_hi: float = 0.65, keep: int = 8, w_rear_dev: float = 220.0):
+        self.variants = list(variants)
+        self.t_lo, self.t_hi, self.w = float(t_lo), float(t_hi), float(w_rear_dev)
+        self.rear = [_weight_split_grog(rows, kg_euro, kg_ind) for _, rows in self.variants]
+        # fester Anteil c_i = Score bei Ziel == eigener Heckanteil
+        self.fixed = [score_layout_grog(rows, kg_euro=kg_euro, kg_ind=kg_ind, target_rear_share=r, w_rear_dev=w_rear_dev)
+                      for (_, rows), r in zip(self.variants, self.rear)]
+        self.breaks: List[float] = []                 # Knickstellen (aufsteigend, offen)
+        self.tops: List[Tuple[int, ...]] = []         # Top-`keep` je Intervall: len(breaks)+1 Einträge
+        self._sweep(max(1, keep))
+
+    def _line(self, i: int) -> Tuple[float, float]:
+        r = self.rear[i]
+        return self.fixed[i] + self.w * r * r, 2.0 * self.w * r
+
+    def _sweep(self, keep: int):
+        lines = [self._line(i) for i in range(len(self.variants))]
+        lo, hi = self.t_lo, self.t_hi
+        # Start-Reihenfolge bei t_lo; bei Gleichstand (bis auf Rundung) fällt die steilere Gerade zuerst,
+        # dann Eingabe-Reihenfolge
+        order = sorted(range(len(lines)), key=lambda i: (round(lines[i][0] - lines[i][1] * lo, 9), -lines[i][1], i))
+        # Vorfilter: liegen schon `keep` Geraden bei t_lo und bei t_hi davor, dann (Geraden!) im ganzen Bereich –
+        # die Gerade kommt nie in die Top-`keep` und braucht keine Schnittpunkte. Übrig bleibt meist nur der Rand.
+        near: List[int] = []
+        at_hi: List[float] = []                   # Max-Heap (negiert) der `keep` kleinsten Werte bei t_hi davor
+        for i in order:
+            v = lines[i][0] - lines[i][1] * hi
+            if len(at_hi) >= keep and -at_hi[0] <= v: continue
+            near.append(i)
+            heapq.heappush(at_hi, -v)
+            if len(at_hi) > keep: heapq.heappop(at_hi)
+        order = near
+        n = len(order)
+        heap: List[Tuple[float, int, int, int]] = []
+
+        def push(pos: int, t_now: float):
+            if pos < 0 or pos + 1 >= n: return
+            u, v = order[pos], order[pos + 1]
+            (au, bu), (av, bv) = lines[u], lines[v]
+            if bv <= bu: return                     # v fällt nicht schneller -> überholt u nie
+            t = (av - au) / (bv - bu)
+            if t_now - 1e-12 <= t < self.t_hi and t > lo:
+                heapq.heappush(heap, (max(t, t_now), pos, u, v))
+
+        for p in range(n - 1): push(p, lo)
+        self.tops = [tuple(order[:keep])]
+        while heap:
+            t = heap[0][0]
+            # alle Tausche an derselben Stelle (mehrere Geraden durch einen Punkt) in einem Rutsch
+            while heap and heap[0][0] - t <= 1e-12:
+                _, pos, u, v = heapq.heappop(heap)
+                if order[pos] != u or order[pos + 1] != v: continue   # veraltet
+                order[pos], order[pos + 1] = v, u
+                push(pos - 1, t); push(pos + 1, t)
+            top = tuple(order[:keep])
+            if top != self.tops[-1]:
+                self.breaks.append(t); self.tops.append(top)
+
+    def _interval(self, t: float) -> int:
+        return bisect.bisect_right(self.breaks, t)
+
+    def score_at(self, i: int, t: float) -> float:
+        d = self.rear[i] - t
+        return self.fixed[i] + self.w * d * d
+
+    def top(self, t: float, topk: int = 4) -> List[Tuple[str, List[Dict], float, float]]:
+        """Wie grog_pick_best(..., target_rear_share=t, topk) – ohne neu zu bewerten."""
+        out = []
+        for i in self.tops[self._interval(t)][:topk]:
+            title, rows = self.variants[i]
+            out.append((title, rows, self.score_at(i, t), self.rear[i]))
+        return out
+
+    def best_ranges(self, title: str) -> List[Tuple[float, float]]:
+        """Ziel-Bereiche [t0, t1], in denen die Variante `title` auf Platz 1 liegt."""
+        edges = [self.t_lo] + self.breaks + [self.t_hi]
+        out: List[Tuple[float, float]] = []
+        for k, top in enumerate(self.tops):
+            if top and self.variants[top[0]][0] == title:
+                if out and abs(out[-1][1] - edges[k]) < 1e-12: out[-1] = (out[-1][0], edges[k + 1])
+                else: out.append((edges[k], edges[k + 1]))
+        return out
+
+@lru_cache(maxsize=256)
+def _grog_ranking_cached(key: Tuple[Tuple[str, bytes], ...], kg_euro: int, kg_ind: int,
+                         t_lo: float, t_hi: float) -> GrogRanking:
+    return GrogRanking([(title, decode_rows(code)) for title, code in key], kg_euro, kg_ind, t_lo, t_hi)
+
+def grog_ranking(variants: List[Tuple[str, List[Dict]]], kg_euro: int, kg_ind: int,
+                 t_lo: float = 0.40, t_hi: float = 0.65) -> GrogRanking:
+    """Einmal je (Varianten, kg, Bereich) – Slider-Bewegungen treffen den Cache."""
+    key = tuple((title, encode_rows(rows)) for title, rows in variants)
+    return _grog_ranking_cached(key, int(kg_euro), int(kg_ind), float(t_lo), float(t_hi))
+
+# ------------------ Vordefinierte Varianten (Euro) + neue Typen ------------------
+# ---------- GROG: Pareto-Front statt fester Gewichte ----------
+# Ziele (alle minimieren): Einzel am Heck, ungenutzte Länge, |Heckanteil − Ziel|, Längs/Quer-Wechsel
+PARETO_OBJECTIVES = ("tail_single", "unused_cm", "rear_dev", "switches")
+
+def pareto_objectives(rows: List[Dict], kg_euro: int, kg_ind: int,
+                      target_rear_share: float = 0.52) -> Tuple[int, int, float, int]:
+    m = layout_metrics(rows)
+    dev = abs(_rear_share_of(m, kg_euro, kg_ind) - target_rear_share)
+    return (int(m.tail_single), max(0, TRAILER_LEN_CM - m.used_cm), round(dev, 9), m.switches)
+
+def _dominates(a: Tuple, b: Tuple) -> bool:
+    return a != b and all(x <= y for x, y in zip(a, b))
+
+def pareto_front(variants: List[Tuple[str, List[Dict]]],
+                 kg_euro: int,
+                 kg_ind: int,
+                 target_rear_share: float = 0.52) -> List[Tuple[str, List[Dict], Tuple[int, int, float, int]]]:
+    """Nicht dominierte Varianten (Sort-Filter-Skyline).
+
+    Nach Zielvektor lexikografisch sortiert kann ein Kandidat nur von einem früheren dominiert werden –
+    es reicht also der Vergleich gegen die bisherige Front (und nur gegen deren verschiedene Vektoren).
+    Gleiche Zielvektoren dominieren sich nicht und bleiben alle drin. Ausgabe in Sortier-Reihenfolge.
+    """
+    cand = [(pareto_objectives(rows, kg_euro, kg_ind, target_rear_share), i, title, rows)
+            for i, (title, rows) in enumerate(variants)]
+    cand.sort(key=lambda c: (c[0], c[1]))
+    front: List[Tuple[str, List[Dict], Tuple[int, int, float, int]]] = []
+    seen: List[Tuple] = []          # verschiedene Vektoren der Front
+    last = None
+    for obj, _i, title, rows in cand:
+        if obj != last:
+            if any(_dominates(f, obj) for f in seen):
+                continue
+            seen.append(obj); last = obj
+        front.append((title, rows, obj))
+    return front
+
+def _choose_k_for_no_single(n: int, k_max: int) -> int:
+    k_cap = min(k_max, n // 2)
+    want = (3 - (n % 3)) % 3  # k ≡ -n (mod 3)
+    for k in range(k_cap, -1, -1):
+        if k % 3 == want:
+            return k
+    return 0
+
+def build_euro_all_long(n: int, exact_tail: bool) -> List[Dict]:
+    return build_euro_exact_tail(n) if exact_tail else layout_for_preset_euro_stable(n, singles_front=0)
+
+def build_euro_rear_2trans_block(n: int, approx_block: int, exact_tail: bool) -> List[Dict]:
+    if n <= 0: return []
+    if exact_tail: return build_euro_exact_tail(n)
+    k = _choose_k_for_no_single(n, k_max=max(0, approx_block))
+    if k == 0: return build_euro_all_long(n, exact_tail=False)
+    long_cnt = (n - 2*k) // 3
+    rows = [euro_row_long() for _ in range(long_cnt)] + [euro_row_trans2() for _ in range(k)]
+    return enforce_tail_no_single(rows, n)
+
+def build_euro_mixed_periodic(n: int, period: int, exact_tail: bool) -> List[Dict]:
+    if n <= 0: return []
+    if exact_tail: return build_euro_exact_tail(n)
+    approx_k = max(1, n // period)
+    k = _choose_k_for_no_single(n, k_max=approx_k)
+    if k == 0: return build_euro_all_long(n, exact_tail=False)
+    long_cnt = (n - 2*k) // 3
+    out: List[Dict] = []
+    quota = max(1e-9, long_cnt / (k + 1))
+    used_long = 0; used_k = 0
+    cursor = 0.0
+    while used_long + used_k < long_cnt + k:
+        if used_k < k and (used_long + used_k) >= cursor + quota * (used_k + 1):
+            out.append(euro_row_trans2()); used_k += 1
+        else:
+            out.append(euro_row_long()); used_long += 1
+    return enforce_tail_no_single(out, n)
+
+def build_euro_alt_pattern(n: int, exact_tail: bool) -> List[Dict]:
+    if n <= 0: return []
+    if exact_tail: return build_euro_exact_tail(n)
+    approx_block = max(1, n // 6)
+    return build_euro_rear_2trans_block(n, approx_block=approx_block, exact_tail=False)
+
+# --- NEU: recipe / heavy_auto_rear / light_auto_mix ---
+def build_euro_recipe(rowspec: list) -> List[Dict]:
+    rows: List[Dict] = []
+    for r in rowspec:
+        if r == 3: rows.append(euro_row_long())
+        elif r == 2: rows.append(euro_row_trans2())
+        elif r == 1: rows.append(euro_row_trans1())
+    return enforce_tail_no_single(rows, sum(rowspec))
+
+def build_euro_heavy_auto_rear(n: int, exact_tail: bool, params: dict) -> List[Dict]:
+    if n <= 0: return []
+    if exact_tail: return build_euro_exact_tail(n)
+    target_share = float(params.get("target_rear_share", 0.42))
+    min_k = int(params.get("min_k", 3))
+    max_k = n // 2
+    k_guess = max(min_k, min(max_k, int(round(target_share * n / 2.0))))
+    k = _choose_k_for_no_single(n, k_max=k_guess)
+    if k == 0: return build_euro_all_long(n, exact_tail=False)
+    long_cnt = (n - 2*k) // 3
+    rows = [euro_row_long() for _ in range(long_cnt)] + [euro_row_trans2() for _ in range(k)]
+    return enforce_tail_no_single(rows, n)
+
+def build_euro_light_auto_mix(n: int, exact_tail: bool, params: dict) -> List[Dict]:
+    if n <= 0: return []
+    period = int(params.get("period", 4))
+    return build_euro_mixed_periodic(n, period=period, exact_tail=exact_tail)
+
+def combine_with_industry_pos(euro_rows: List[Dict], ind_n: int, pos: str) -> List[Dict]:
+    if ind_n <= 0:
+        return euro_rows
+    ind_rows = layout_for_preset_industry(ind_n)
+    return cap_to_trailer(ind_rows + euro_rows) if pos == "front" else cap_to_trailer(euro_rows + ind_rows)
+
+# ---------- Industrie frei einmischen (Branch & Bound) ----------
+# combine_with_industry_pos kennt nur "Industrie-Block vorne/hinten". Hier: alle Verschränkungen der festen
+# Euro-Reihenfolge mit den Industrie-Reihen (Multimenge, auch in mehreren Blöcken), exakt nach Grog bewertet.
+# Schranken je Knoten: Länge (Gesamtlänge muss passen), Moment (Rest frei nach Smith-Regel sortiert →
+# kleinster/größter erreichbarer Heckanteil), bisherige Wechsel. Zeitbudget: bestes bis dahin gefundenes.
+MIX_BUDGET_S = 0.25
+
+def mix_industry_rows(euro_rows: List[Dict], ind_n: int, kg_euro: int, kg_ind: int,
+                      target_rear_share: float = 0.52, topk: int = 4, budget_s: float = MIX_BUDGET_S,
+                      w_tail_single: float = 1000.0, w_last_not_full: float = 80.0, w_unused_cm: float = 0.6,
+                      w_rear_dev: float = 220.0, w_switch: float = 3.5) -> List[Tuple[List[Dict], float, float]]:
+    """Top-k Verschränkungen als (rows, score, rear) – score wie score_layout_grog."""
+    euro = list(encode_rows(euro_rows))
+    ind_cnt = [0] * len(ROWS)
+    for c in encode_rows(layout_for_preset_industry(ind_n)): ind_cnt[c] += 1
+    lens = [r["len_cm"] for r in ROWS]
+    total_len = sum(lens[c] for c in euro) + sum(lens[c] * k for c, k in enumerate(ind_cnt))
+    if total_len > TRAILER_LEN_CM or not euro and not any(ind_cnt): return []
+    we = kg_euro or 1.0; wi = kg_ind or 1.0
+    wt = [r["pallets"] * (wi if r["type"].startswith("IND") else we) for r in ROWS]
+    qu = [r["type"] in ("EURO_2_TRANS", "EURO_1_TRANS") for r in ROWS]
+    LW = float(TRAILER_LEN_CM) * sum([wt[c] for c in euro] + [wt[c] * k for c, k in enumerate(ind_cnt)])
+    s_fixed = w_unused_cm * (TRAILER_LEN_CM - total_len)
+    # Restmengen der Euro-Folge ab Index i (je Reihen-Code)
+    suf = [[0] * len(ROWS) for _ in range(len(euro) + 1)]
+    for i in range(len(euro) - 1, -1, -1):
+        suf[i] = suf[i + 1][:]; suf[i][euro[i]] += 1
+    by_ratio = sorted(range(len(ROWS)), key=lambda c: lens[c] / wt[c])   # vorne: viel Gewicht je cm
+
+    def moment_range(x: float, rest: List[int]) -> Tuple[float, float]:
+        lo = hi = 0.0; xl = xh = x
+        for c in by_ratio:
+            k = rest[c]
+            if k: lo += wt[c] * (k * xl + lens[c] * k * k / 2.0); xl += k * lens[c]
+        for c in reversed(by_ratio):
+            k = rest[c]
+            if k: hi += wt[c] * (k * xh + lens[c] * k * k / 2.0); xh += k * lens[c]
+        return lo, hi
+
+    best: List[Tuple[float, int, Tuple[int, ...]]] = []   # Max-Heap über -score
+    seq: List[int] = []
+    deadline = time.perf_counter() + budget_s
+    nodes = [0]; counter = [0]
+
+    def bound(x: float, M: float, sw: int, i: int) -> float:
+        rest = [a + b for a, b in zip(suf[i], ind_cnt)]
+        lo, hi = moment_range(x, rest)
+        r_lo, r_hi = (M + lo) / LW, (M + hi) / LW
+        d = r_lo - target_rear_share if r_lo > target_rear_share else (target_rear_share - r_hi if r_hi < target_rear_share else 0.0)
+        return s_fixed + w_rear_dev * d * d + w_switch * sw
+
+    def dfs(i: int, x: float, M: float, sw: int) -> bool:
+        nodes[0] += 1
+        if nodes[0] & 1023 == 0 and time.perf_counter() > deadline: return False
+        if i == len(euro) and not any(ind_cnt):
+            dev = max(0.0, min(1.0, M / LW)) - target_rear_share
+            sc = s_fixed + w_rear_dev * dev * dev + w_switch * sw
+            if any(c == 2 for c in seq[-4:]): sc += w_tail_single
+            if seq[-1] in (2, 4): sc += w_last_not_full
+            counter[0] += 1
+            item = (-sc, -counter[0], tuple(seq))
+            if len(best) < topk: heapq.heappush(best, item)
+            elif sc < -best[0][0]: heapq.heapreplace(best, item)
+            return True
+        kids = ([euro[i]] if i < len(euro) else []) + [c for c, k in enumerate(ind_cnt) if k]
+        scored = []
+        for c in kids:
+            nsw = sw + (1 if seq and qu[seq[-1]] != qu[c] else 0)
+            nM = M + wt[c] * (x + lens[c] / 2.0)
+            ni = i + 1 if (i < len(euro) and c == euro[i] and not ROWS[c]["type"].startswith("IND")) else i
+            if ni == i: ind_cnt[c] -= 1
+            b = bound(x + lens[c], nM, nsw, ni)
+            if ni == i: ind_cnt[c] += 1
+            scored.append((b, c, ni, nM, nsw))
+        scored.sort(key=lambda t: t[0])
+        for b, c, ni, nM, nsw in scored:
+            if len(best) == topk and b >= -best[0][0]: break   # sortiert: alle weiteren auch
+            if ni == i: ind_cnt[c] -= 1
+            seq.append(c)
+            ok = dfs(ni, x + lens[c], nM, nsw)
+            seq.pop()
+            if ni == i: ind_cnt[c] += 1
+            if not ok: return False
+        return True
+
+    dfs(0, 0.0, 0.0, 0)
+    out = []
+    for neg, _o, code in sorted(best, reverse=True):
+        rows = decode_rows(bytes(code))
+        out.append((rows, -neg, _weight_split_grog(rows, kg_euro, kg_ind)))
+    return out
+
+def _ind_blocks(rows: List[Dict]) -> int:
+    flags = [r["type"].startswith("IND") for r in rows]
+    return sum(1 for k, f in enumerate(flags) if f and (k == 0 or not flags[k - 1]))
+
+def mix_industry_variants(variants: List[Tuple[str, List[Dict]]], ind_n: int, kg_euro: int, kg_ind: int,
+                          target_rear_share: float = 0.52, topk: int = 4,
+                          budget_s: float = MIX_BUDGET_S) -> List[Tuple[str, List[Dict]]]:
+    """Je Variante die Euro-Folge behalten, Industrie frei einmischen; die besten neuen Layouts als Varianten."""
+    if ind_n <= 0: return []
+    known = {encode_rows(rows) for _t, rows in variants}
+    done: Set[bytes] = set()
+    jobs = []
+    for title, rows in variants:
+        euro_rows = [r for r in rows if not r["type"].startswith("IND")]
+        ec = encode_rows(euro_rows)
+        if ec in done: continue
+        done.add(ec); jobs.append((title, euro_rows))
+    found = []
+    for title, euro_rows in jobs:
+        for rows, sc, _rear in mix_industry_rows(euro_rows, ind_n, kg_euro, kg_ind, target_rear_share,
+                                                 topk=topk, budget_s=budget_s / max(1, len(jobs))):
+            code = encode_rows(rows)
+            if code in known: continue
+            known.add(code)
+            found.append((sc, len(found), f"{title} · Ind. gemischt ({_ind_blocks(rows)} Bl.)", rows))
+    found.sort(key=lambda t: (t[0], t[1]))
+    return [(title, rows) for _sc, _o, title, rows in found[:topk]]
+
+def build_euro_by_type(t: str, n: int, exact_tail: bool, params: dict) -> List[Dict]:
+    if t == "recipe":          return build_euro_recipe(params.get("rows", []))
+    if t == "heavy_auto_rear": return build_euro_heavy_auto_rear(n, exact_tail, params)
+    if t == "light_auto_mix":  return build_euro_light_auto_mix(n, exact_tail, params)
+    if t == "all_long":        return build_euro_all_long(n, exact_tail=exact_tail)
+    if t == "rear_block":      return build_euro_rear_2trans_block(n, approx_block=int(params.get("approx_block", 15)), exact_tail=exact_tail)
+    if t == "mixed_periodic":  return build_euro_mixed_periodic(n, period=int(params.get("period", 4)), exact_tail=exact_tail)
+    if t == "alt_block":       return build_euro_alt_pattern(n, exact_tail=exact_tail)
+    return build_euro_all_long(n, exact_tail=exact_tail)
+
+# ------------------ JSON-Filter & Variantenerzeugung ------------------
+def _passes_variant_filters(v: dict, euro_n: int, ind_n: int, weight_mode: bool) -> Tuple[bool, str]:
+    if "n_exact" in v:
+        try:
+            if int(v["n_exact"]) != euro_n:
+                return False, f"n_exact={v['n_exact']} passt nicht zu Euro={euro_n}"
+        except Exception:
+            return False, "n_exact ungültig"
+
+    for key, val, cur in [
+        ("euro_min", v.get("euro_min"), euro_n),
+        ("euro_max", v.get("euro_max"), euro_n),
+        ("ind_min",  v.get("ind_min"),  ind_n),
+        ("ind_max",  v.get("ind_max"),  ind_n),
+    ]:
+        if val is not None:
+            try:
+                val_i = int(val)
+            except Exception:
+                return False, f"{key} ungültig"
+            if key.endswith("_min") and cur < val_i: return False, f"{key}={val_i} nicht erfüllt (ist {cur})"
+            if key.endswith("_max") and cur > val_i: return False, f"{key}={val_i} überschritten (ist {cur})"
+
+    if v.get("weight_required") is True and not weight_mode:
+        return False, "weight_required, aber Gewichtsmodus ist AUS"
+    if v.get("weight_forbidden") is True and weight_mode:
+        return False, "weight_forbidden, aber Gewichtsmodus ist AN"
+
+    return True, "ok"
+
+def variant_specs(cfg: dict, euro_n: int, ind_n: int, weight_mode: bool = False):
+    """Nur filtern, nichts bauen: ([(idx, v), ...] der passenden Varianten, skipped). Billig auch bei 1000en."""
+    passed, skipped = [], []
+    for idx, v in enumerate(cfg.get("variants", [])):
+        ok, why = _passes_variant_filters(v, euro_n, ind_n, weight_mode)
+        if ok: passed.append((idx, v))
+        else: skipped.append((v.get("title", f"Var {idx+1}"), why))
+    return passed, skipped
+
+def build_variant(cfg: dict, idx: int, v: dict, euro_n: int, ind_n: int, exact_tail: bool) -> Tuple[str, List[Dict]]:
+    title = v.get("title", f"Var {idx+1}")
+    euro_rows = build_euro_by_type(v.get("type", "all_long"), euro_n, exact_tail, v)
+    letter = chr(ord('A') + idx)
+    pos = v.get("industry_position", cfg.get("industry_position", {}).get(letter, "front"))
+    return title, combine_with_industry_pos(euro_rows, ind_n, pos)
+
+def generate_variants_from_config(cfg: dict, euro_n: int, ind_n: int, exact_tail: bool, weight_mode: bool=False):
+    passed, skipped = variant_specs(cfg, euro_n, ind_n, weight_mode)
+    out = [build_variant(cfg, idx, v, euro_n, ind_n, exact_tail) for idx, v in passed]
+    return out, skipped, len(cfg.get("variants", []))
+
+def generate_variants_page(cfg: dict, euro_n: int, ind_n: int, exact_tail: bool, weight_mode: bool = False,
+                           page: int = 0, per_page: int = 4):
+    """Wie generate_variants_from_config, aber nur die Varianten einer Seite werden gebaut.
+    -> (variants, Anzahl passender Varianten, skipped, total)"""
+    passed, skipped = variant_specs(cfg, euro_n, ind_n, weight_mode)
+    window = passed[page * per_page:(page + 1) * per_page]
+    out = [build_variant(cfg, idx, v, euro_n, ind_n, exact_tail) for idx, v in window]
+    return out, len(passed), skipped, len(cfg.get("variants", []))
+
+# ------------------ Default-Konfig ------------------
+DEFAULT_CFG = {
+    "variants": [
+        { "title": "Var A – alles längs",         "type": "all_long" },
+        { "title": "Var B – 2×quer Heckblock",    "type": "rear_block",     "approx_block": 15 },
+        { "title": "Var C – gemischt (Periodik)", "type": "mixed_periodic", "period": 4 },
+        { "title": "Var D – alternative Blockung","type": "alt_block" }
+    ],
+    "industry_position": { "A":"front","B":"front","C":"front","D":"rear" }
+}
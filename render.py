@@ -0,0 +1,118 @@
+# render.py — Trailer-Grafik als PNG: matplotlib-OO-API (Figure + Agg-Canvas), ohne pyplot
+# - Kein globaler Zustand: keine pyplot-Figurenverwaltung, kein plt.close – jede Grafik hat ihre eigene Figure
+# - Gerendert wird in einem prozessweiten, begrenzten Thread-Pool (RENDER_WORKERS): gleichzeitige Sitzungen
+#   zeichnen parallel, ohne dass beliebig viele Figuren zugleich im Speicher liegen
+# - Ausgabe wie st.pyplot (savefig: PNG, dpi=200, bbox_inches="tight") → in der App per st.image
+# - Eigenes Modul (nicht app.py): app.py wird bei jedem Rerun neu ausgeführt, der Pool soll bleiben
+# - Fertige PNGs liegen im gemeinsamen Cache (shared_cache.CACHE): gleiche Grafik → einmal rendern für alle Sitzungen
+# - Darunter der Platten-Cache (disk_cache.DISK): nach einem Neustart kein matplotlib-Import für bekannte Grafiken
+# - Zwei Backends: "sprites" (Standard, sprites.py: Pillow + Icon-Atlas, schneller) und "matplotlib";
+#   Auswahl über PF_RENDER oder backend=…; beide teilen Schlüssel-Schema und Caches (eigene Namensräume)
+
+import io
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+import startup_profile as sp
+from planner import TRAILER_LEN_CM, TRAILER_W_CM, COLOR_HEAVY
+from disk_cache import DISK, code_fingerprint
+from shared_cache import CACHE
+import sprites
+
+RENDER_WORKERS = max(1, min(4, os.cpu_count() or 1))
+RENDER_DPI = 200
+BACKENDS = ("sprites", "matplotlib")
+RENDER_BACKEND = os.environ.get("PF_RENDER", "sprites").strip().lower()
+if RENDER_BACKEND not in BACKENDS: RENDER_BACKEND = "sprites"
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def _mpl():
+    """matplotlib erst beim ersten Zeichnen laden (größter Posten im Kaltstart) – ohne pyplot."""
+    figure = sp.lazy_import("matplotlib.figure")
+    agg = sp.lazy_import("matplotlib.backends.backend_agg")
+    patches = sp.lazy_import("matplotlib.patches")
+    return figure.Figure, agg.FigureCanvasAgg, patches.Rectangle
+
+@lru_cache(maxsize=2)
+def _fingerprint(backend: str) -> str:
+    if backend == "sprites":
+        return code_fingerprint(sys.modules[__name__], sprites, extra=sprites.fingerprint_extra())
+    from importlib.metadata import version   # Version ohne matplotlib zu importieren
+    return code_fingerprint(sys.modules[__name__], extra=f"matplotlib {version('matplotlib')}")
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="pf-render")
+    return _pool
+
+def trailer_png(title: str,
+                rects: Sequence[Tuple],
+                figsize: Tuple[float, float] = (8, 1.7),
+                weight_mode: bool = False,
+                tiers: Optional[Sequence[int]] = None,
+                sections: Optional[List[Tuple[float, str]]] = None,
+                dpi: int = RENDER_DPI) -> bytes:
+    """rects: (x, y, w, h, color, cat, heavy) wie planner.rows_to_rects_with_weights. Läuft in jedem Thread."""
+    Figure, FigureCanvasAgg, Rectangle = _mpl()
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.add_patch(Rectangle((0, 0), TRAILER_LEN_CM, TRAILER_W_CM,
+                           fill=False, linewidth=2, edgecolor="#333"))
+
+    for k, (x, y, w, h, c, cat, hvy) in enumerate(rects):
+        face = c; edge = "#4a4a4a"; lw = 0.8
+        if weight_mode and hvy:
+            edge = "#222222"; lw = 1.6
+            face = COLOR_HEAVY.get(c, c)
+        stacked = tiers is not None and k < len(tiers) and tiers[k] > 1
+        ax.add_patch(Rectangle((x, y), w, h, facecolor=face, edgecolor=edge, linewidth=lw,
+                               hatch="///" if stacked else None))
+        if stacked:
+            ax.text(x + w / 2, y + h / 2, f"{tiers[k]}×", ha="center", va="center", fontsize=7)
+
+    for x0, label in (sections or []):
+        if x0 > 0: ax.axvline(x0, color="#c0392b", linestyle="--", linewidth=1.2)
+        ax.text(x0 + 4, TRAILER_W_CM - 4, label, ha="left", va="top", fontsize=7, color="#c0392b")
+
+    ax.set_xlim(0, TRAILER_LEN_CM); ax.set_ylim(0, TRAILER_W_CM)
+    ax.set_aspect('equal'); ax.axis('off'); ax.set_title(title, fontsize=12, pad=6)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    return buf.getvalue()
+
+def submit_trailer_png(*args, **kwargs) -> "Future[bytes]":
+    """trailer_png im Render-Pool; mehrere Grafiken eines Laufs können so gleichzeitig entstehen."""
+    return _executor().submit(trailer_png, *args, **kwargs)
+
+def render_trailer_png(title: str,
+                       rects: Sequence[Tuple],
+                       figsize: Tuple[float, float] = (8, 1.7),
+                       weight_mode: bool = False,
+                       tiers: Optional[Sequence[int]] = None,
+                       sections: Optional[List[Tuple[float, str]]] = None,
+                       dpi: int = RENDER_DPI,
+                       backend: Optional[str] = None) -> bytes:
+    """Wie trailer_png, aber über den gemeinsamen Cache (Schlüssel = Layout + Darstellung) und das gewählte Backend."""
+    backend = backend or RENDER_BACKEND
+    ns = "sprite" if backend == "sprites" else "png"
+    key = (ns, title, tuple(rects), tuple(figsize), bool(weight_mode),
+           tuple(tiers) if tiers is not None else None,
+           tuple((float(x), str(l)) for x, l in sections) if sections else None, int(dpi))
+    def compute() -> bytes:
+        if backend == "sprites":   # schnell genug für den aufrufenden Thread, kein Pool nötig
+            return sprites.trailer_sprite_png(title, rects, figsize=figsize, weight_mode=weight_mode,
+                                              tiers=tiers, sections=sections, dpi=dpi)
+        return submit_trailer_png(title, rects, figsize=figsize, weight_mode=weight_mode,
+                                  tiers=tiers, sections=sections, dpi=dpi).result()
+    return CACHE.get_or_compute(key, lambda: DISK.get_or_compute(
+        ns, _fingerprint(backend), key, compute, dumps=bytes, loads=bytes))
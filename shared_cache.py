@@ -0,0 +1,118 @@
+# shared_cache.py — prozessweiter Cache für alle Sitzungen (Layouts, Varianten, Grog, PNGs)
+# - Ein Modul, eine Instanz (CACHE): Streamlit-Sitzungen laufen als Threads im selben Prozess und teilen ihn
+# - Obergrenze in Bytes (PF_CACHE_MB, Standard 128 MiB), LRU nach Größe: die ältesten Einträge fliegen,
+#   bis der neue passt; Einträge größer als 1/4 der Grenze werden gar nicht erst aufgenommen
+# - Thread-sicher (ein Lock, kurz gehalten); get_or_compute rechnet je Schlüssel nur einmal –
+#   gleichzeitige Anfragen nach demselben Schlüssel warten auf das erste Ergebnis
+# - Werte gelten als unveränderlich: nur Bytes, Tupel, Reihen-Codes o. Ä. ablegen, keine Listen, die der
+#   Aufrufer danach noch verändert
+# - stats(): Treffer, Fehlzugriffe, Verdrängungen, Bytes, Einträge (für das Diagnose-Panel)
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+DEFAULT_MAX_MB = 128
+_MAX_DEPTH = 6
+
+def approx_size(obj: Any) -> int:
+    """Grobe Größe in Bytes (sys.getsizeof, rekursiv über Container/Objekte, gemeinsame Objekte einmal)."""
+    seen = set()
+    def walk(o, depth):
+        if id(o) in seen: return 0
+        seen.add(id(o))
+        n = sys.getsizeof(o)
+        if depth >= _MAX_DEPTH or isinstance(o, (bytes, bytearray, str, int, float, bool)): return n
+        if isinstance(o, dict):
+            return n + sum(walk(k, depth + 1) + walk(v, depth + 1) for k, v in o.items())
+        if isinstance(o, (list, tuple, set, frozenset)):
+            return n + sum(walk(v, depth + 1) for v in o)
+        d = getattr(o, "__dict__", None)
+        return n + (walk(d, depth + 1) if d is not None else 0)
+    return walk(obj, 0)
+
+class SharedCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = int(max_bytes)
+        self._data: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, threading.Event] = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "rejected": 0, "waits": 0}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                self._stats["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+            return hit[0]
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None) -> bool:
+        size = approx_size(value) if size is None else int(size)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None: self._bytes -= old[1]
+            if size > self.max_bytes // 4:
+                self._stats["rejected"] += 1
+                return False
+            while self._data and self._bytes + size > self.max_bytes:
+                _k, (_v, sz) = self._data.popitem(last=False)
+                self._bytes -= sz
+                self._stats["evictions"] += 1
+            self._data[key] = (value, size)
+            self._bytes += size
+            return True
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], size: Optional[int] = None) -> Any:
+        while True:
+            with self._lock:
+                hit = self._data.get(key)
+                if hit is not None:
+                    self._data.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return hit[0]
+                ev = self._inflight.get(key)
+                if ev is None:
+                    self._stats["misses"] += 1
+                    ev = self._inflight[key] = threading.Event()
+                    owner = True
+                else:
+                    self._stats["waits"] += 1
+                    owner = False
+            if not owner:
+                ev.wait()
+                continue   # Ergebnis liegt jetzt im Cache (oder der Erste ist gescheitert → selbst rechnen)
+            try:
+                value = compute()
+                self.put(key, value, size)
+                return value
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                ev.set()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear(); self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            s.update(entries=len(self._data), bytes=self._bytes, max_bytes=self.max_bytes)
+        looked = s["hits"] + s["misses"]
+        s["hit_rate"] = round(s["hits"] / looked, 3) if looked else None
+        return s
+
+def _max_bytes_from_env() -> int:
+    try:
+        mb = float(os.environ.get("PF_CACHE_MB", DEFAULT_MAX_MB))
+    except ValueError:
+        mb = DEFAULT_MAX_MB
+    return int(max(1.0, mb) * 1024 * 1024)
+
+CACHE = SharedCache(_max_bytes_from_env())
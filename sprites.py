@@ -0,0 +1,173 @@
+# sprites.py — Trailer-Grafik als Pillow-Raster aus den Paletten-Icons (icons/*.png), ohne matplotlib
+# - Sprite-Atlas: alle Icons einmal dekodiert, auf ihren Rahmen zugeschnitten und in ein Blatt gepackt
+#   (atlas(), prozessweit, beim ersten Gebrauch geladen; preload() zum Vorwärmen)
+# - Je Zoomstufe (Pixelgröße) und Farbe wird ein Sprite einmal skaliert und eingefärbt (lru_cache),
+#   danach nur noch per paste auf den Trailer-Umriss kopiert
+# - Icon je Kategorie und Ausrichtung: Euro längs/quer, Industrie, Blumenwagen (CC-Container) längs/quer;
+#   passt kein Icon zur Ausrichtung des Rechtecks, wird es um 90° gedreht
+# - Gleiche Eingaben wie render.trailer_png (rects, weight_mode, tiers, sections, dpi), ähnliche Bildgröße;
+#   Schwer = dunkler Rahmen + kräftigere Farbe, gestapelt = Schraffur + „n×“, Abschnitte = rote Strichlinie
+# - Gecacht wird in render.render_trailer_png (gemeinsamer Cache + Platten-Cache, Schlüssel = Layout)
+
+import hashlib
+import importlib.util
+import io
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from planner import TRAILER_LEN_CM, TRAILER_W_CM, COLOR_HEAVY
+
+ICON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons")
+ICONS: Dict[str, Tuple[str, ...]] = {          # Kategorie → Icons (längs zuerst)
+    "EURO": ("euro_l", "euro_q"),
+    "IND": ("ind_q",),
+    "FLOWER": ("flower_l", "flower_q"),
+}
+AXES_FRAC = 0.775            # Anteil der Bildbreite für den Trailer (wie die matplotlib-Achse)
+_RED = "#c0392b"
+
+_FONTS: Dict[int, object] = {}
+
+def font(px: int):
+    """DejaVu Sans (liegt bei matplotlib bei: Umlaute, ≈, ·) in Pixelgröße; Fallback Pillow-Standard."""
+    if px not in _FONTS:
+        from PIL import ImageFont
+        spec = importlib.util.find_spec("matplotlib")   # nur der Pfad, kein Import
+        path = os.path.join(os.path.dirname(spec.origin), "mpl-data", "fonts", "ttf", "DejaVuSans.ttf") if spec else ""
+        _FONTS[px] = ImageFont.truetype(path, px) if os.path.exists(path) else ImageFont.load_default(size=px)
+    return _FONTS[px]
+
+# ------------------ Atlas ------------------
+def _frame_box(im) -> Tuple[int, int, int, int]:
+    """Rahmen des Icons: erste/letzte dunkle Pixel auf der Mittelzeile und -spalte (Beschriftung liegt außerhalb)."""
+    g = im.convert("L")
+    w, h = g.size
+    row = [x for x in range(w) if g.getpixel((x, h // 2)) < 128]
+    col = [y for y in range(h) if g.getpixel((w // 2, y)) < 128]
+    if not row or not col: return (0, 0, w, h)
+    return (row[0], col[0], row[-1] + 1, col[-1] + 1)
+
+class SpriteAtlas:
+    """Alle Icons in einem Blatt; boxes[name] = Ausschnitt im Blatt."""
+    def __init__(self, icon_dir: str = ICON_DIR):
+        from PIL import Image
+        crops, digest = {}, hashlib.sha256()
+        for name in sorted({n for names in ICONS.values() for n in names}):
+            with open(os.path.join(icon_dir, name + ".png"), "rb") as fh: data = fh.read()
+            digest.update(data)
+            im = Image.open(io.BytesIO(data)).convert("RGB")
+            c = im.crop(_frame_box(im))
+            fill = max(1, c.convert("L").getpixel((c.width // 2, c.height // 2)))
+            crops[name] = c.point(lambda v, f=fill: min(255, v * 255 // f))   # Fläche → weiß, Einfärben trifft die Farbe
+        self.sheet = Image.new("RGB", (sum(c.width for c in crops.values()), max(c.height for c in crops.values())), "white")
+        self.boxes: Dict[str, Tuple[int, int, int, int]] = {}
+        x = 0
+        for name, c in crops.items():
+            self.sheet.paste(c, (x, 0))
+            self.boxes[name] = (x, 0, x + c.width, c.height)
+            x += c.width
+        self.digest = digest.hexdigest()[:16]
+
+    def pick(self, cat: str, w: float, h: float) -> Tuple[str, bool]:
+        """(Icon, drehen?) für ein Rechteck w×h (cm, x = Trailerlänge)."""
+        names = ICONS.get(cat, ICONS["IND"])
+        for n in names:
+            x0, y0, x1, y1 = self.boxes[n]
+            if (x1 - x0 >= y1 - y0) == (w >= h): return n, False
+        return names[0], True
+
+_atlas: Optional[SpriteAtlas] = None
+_atlas_lock = threading.Lock()
+
+def atlas() -> SpriteAtlas:
+    global _atlas
+    if _atlas is None:
+        with _atlas_lock:
+            if _atlas is None: _atlas = SpriteAtlas()
+    return _atlas
+
+def preload():
+    """Atlas laden (z. B. beim Start), damit die erste Grafik nicht dekodieren muss."""
+    atlas()
+
+@lru_cache(maxsize=1)
+def fingerprint_extra() -> str:
+    from importlib.metadata import version
+    return f"Pillow {version('Pillow')} icons {atlas().digest}"
+
+def _rgb(color: str) -> Tuple[int, int, int]:
+    c = color.lstrip("#")
+    return int(c[0:2], 16), int(c[2:4], 16), int(c[4:6], 16)
+
+@lru_cache(maxsize=512)
+def _sprite(name: str, rotate: bool, w: int, h: int, face: str):
+    """Sprite in Zielgröße (Pixel), mit Flächenfarbe multipliziert (Icon ist grau, Rahmen dunkel)."""
+    from PIL import Image, ImageChops
+    a = atlas()
+    im = a.sheet.crop(a.boxes[name])
+    if rotate: im = im.transpose(Image.Transpose.ROTATE_90)
+    im = im.resize((max(1, w), max(1, h)), Image.BILINEAR)
+    return ImageChops.multiply(im, Image.new("RGB", im.size, _rgb(face)))
+
+@lru_cache(maxsize=64)
+def _hatch(w: int, h: int, step: int, lw: int):
+    """Schraffur „///“ als Maske (L) für gestapelte Stellplätze."""
+    from PIL import Image, ImageDraw
+    m = Image.new("L", (w, h), 0)
+    d = ImageDraw.Draw(m)
+    for k in range(-h, w, step): d.line([(k, h), (k + h, 0)], fill=255, width=lw)
+    return m
+
+# ------------------ Zeichnen ------------------
+def trailer_sprite_png(title: str,
+                       rects: Sequence[Tuple],
+                       figsize: Tuple[float, float] = (8, 1.7),
+                       weight_mode: bool = False,
+                       tiers: Optional[Sequence[int]] = None,
+                       sections: Optional[List[Tuple[float, str]]] = None,
+                       dpi: int = 200) -> bytes:
+    """rects: (x, y, w, h, color, cat, heavy) wie planner.rows_to_rects_with_weights. Thread-sicher."""
+    from PIL import Image, ImageDraw
+    a = atlas()
+    pt = dpi / 72.0
+    s = figsize[0] * dpi * AXES_FRAC / TRAILER_LEN_CM          # Pixel je cm (Zoomstufe)
+    frame = max(2, round(2 * pt))
+    m = frame + 2
+    title_h = round(12 * pt * 1.6) if title else 0
+    W = round(TRAILER_LEN_CM * s) + 2 * m
+    H = round(TRAILER_W_CM * s) + 2 * m + title_h
+    top = m + title_h
+    img = Image.new("RGB", (W, H), "white")
+    d = ImageDraw.Draw(img)
+
+    def px(x: float) -> int: return m + round(x * s)
+    def py(y: float) -> int: return top + round((TRAILER_W_CM - y) * s)   # y nach oben wie in matplotlib
+
+    small = font(max(8, round(7 * pt)))
+    for k, (x, y, w, h, c, cat, hvy) in enumerate(rects):
+        x0, x1, y0, y1 = px(x), px(x + w), py(y + h), py(y)
+        heavy = weight_mode and hvy
+        name, rot = a.pick(cat, w, h)
+        img.paste(_sprite(name, rot, x1 - x0, y1 - y0, COLOR_HEAVY.get(c, c) if heavy else c), (x0, y0))
+        if heavy:
+            d.rectangle([x0, y0, x1 - 1, y1 - 1], outline="#222222", width=max(2, round(1.6 * pt)))
+        if tiers is not None and k < len(tiers) and tiers[k] > 1:
+            img.paste("#4a4a4a", (x0, y0), _hatch(x1 - x0, y1 - y0, max(4, round(7 * pt)), max(1, round(0.7 * pt))))
+            d.text(((x0 + x1) / 2, (y0 + y1) / 2), f"{tiers[k]}×", font=small, fill="black", anchor="mm")
+
+    d.rectangle([m - frame, top - frame, px(TRAILER_LEN_CM) + frame - 1, py(0) + frame - 1],
+                outline="#333333", width=frame)
+    dash, lw = max(4, round(4 * pt)), max(1, round(1.2 * pt))
+    for x0, label in (sections or []):
+        if x0 > 0:
+            for yy in range(top, py(0), 2 * dash):
+                d.line([(px(x0), yy), (px(x0), min(py(0), yy + dash))], fill=_RED, width=lw)
+        d.text((px(x0 + 4), py(TRAILER_W_CM - 4)), label, font=small, fill=_RED, anchor="la")
+    if title:
+        d.text((W / 2, title_h / 2 + m / 2), title, font=font(round(12 * pt)), fill="black", anchor="mm")
+
+    buf = io.BytesIO()
+    img.save(buf, "PNG", compress_level=1)
+    return buf.getvalue()
@@ -0,0 +1,64 @@
+# startup_profile.py — Kaltstart-Profil (Importzeiten je Modul, Zeit bis zur ersten Grafik)
+# - Wird als ERSTES Modul importiert: Zeitpunkt 0 = Prozess lädt die App
+# - timed_import / lazy_import messen Importe (nur der erste, echte Import zählt)
+# - mark_first_paint() nach der ersten gezeichneten Grafik
+# - Ausgabe: as_dict() / dump(path); mit PF_STARTUP_PROFILE=<pfad> automatisch nach dem First Paint
+
+import importlib
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+_T0 = time.perf_counter()
+_IMPORTS: List[Dict] = []            # [{"module", "ms", "at_ms", "lazy"}]
+_MARKS: Dict[str, float] = {}        # Name -> ms seit Start
+_FIRST_PAINT_MS: Optional[float] = None
+
+def _now_ms() -> float:
+    return (time.perf_counter() - _T0) * 1000.0
+
+def timed_import(name: str, lazy: bool = False):
+    """Importiert `name` und protokolliert die Dauer, falls das Modul noch nicht geladen war."""
+    mod = sys.modules.get(name)
+    if mod is not None:
+        return mod
+    t = time.perf_counter()
+    mod = importlib.import_module(name)
+    _IMPORTS.append({"module": name, "ms": round((time.perf_counter() - t) * 1000.0, 2),
+                     "at_ms": round(_now_ms(), 2), "lazy": lazy})
+    return mod
+
+def lazy_import(name: str):
+    """Für schwere Abhängigkeiten: erst aufrufen, wenn die Ansicht sie wirklich braucht."""
+    return timed_import(name, lazy=True)
+
+def mark(name: str):
+    """Freie Messmarke (nur der erste Aufruf je Name zählt)."""
+    _MARKS.setdefault(name, round(_now_ms(), 2))
+
+def mark_first_paint():
+    global _FIRST_PAINT_MS
+    if _FIRST_PAINT_MS is not None:
+        return
+    _FIRST_PAINT_MS = round(_now_ms(), 2)
+    path = os.environ.get("PF_STARTUP_PROFILE")
+    if path:
+        try:
+            dump(path)
+        except OSError:
+            pass
+
+def as_dict() -> Dict:
+    return {
+        "python": sys.version.split()[0],
+        "first_paint_ms": _FIRST_PAINT_MS,
+        "imports": sorted(_IMPORTS, key=lambda r: -r["ms"]),
+        "import_total_ms": round(sum(r["ms"] for r in _IMPORTS), 2),
+        "marks": dict(_MARKS),
+    }
+
+def dump(path: str):
+    import json
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(as_dict(), fh, ensure_ascii=False, indent=2)
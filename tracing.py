@@ -0,0 +1,104 @@
+# tracing.py — leichte Spans für den Hot Path eines App-Laufs (Rerun)
+# - begin_run() schaltet die Aufzeichnung für den aktuellen Thread ein (Streamlit: ein Skript-Thread je Sitzung),
+#   end_run() liefert die Ereignisse und schaltet wieder aus
+# - Ohne begin_run() ist span() ein geteiltes No-op-Objekt: ein Attribut-Lookup, keine Zeitmessung
+# - summary(): je Span-Name Anzahl, Summe, Max (ms) – für das Diagnose-Panel
+# - chrome_trace(): Chrome-Trace-JSON ("X"-Events), lesbar in chrome://tracing bzw. ui.perfetto.dev
+# Hintergrund-Threads (Anytime-Suche) werden nicht aufgezeichnet.
+
+import os
+import threading
+import time
+from functools import wraps
+from typing import Dict, List, NamedTuple, Optional
+
+class Event(NamedTuple):
+    name: str
+    start_us: float      # relativ zu begin_run()
+    dur_us: float
+    depth: int
+    args: Optional[Dict]
+
+_local = threading.local()
+
+class _NoSpan:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NOOP = _NoSpan()
+
+class _Span:
+    __slots__ = ("_rec", "_name", "_args", "_t", "_depth")
+
+    def __init__(self, rec, name: str, args: Optional[Dict]):
+        self._rec, self._name, self._args = rec, name, args
+
+    def __enter__(self):
+        self._depth = self._rec["depth"]
+        self._rec["depth"] = self._depth + 1
+        self._t = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        t1 = time.perf_counter()
+        rec = self._rec
+        rec["depth"] = self._depth
+        rec["events"].append(Event(self._name, (self._t - rec["t0"]) * 1e6, (t1 - self._t) * 1e6,
+                                   self._depth, self._args))
+        return False
+
+def enabled() -> bool:
+    return getattr(_local, "rec", None) is not None
+
+def begin_run():
+    _local.rec = {"t0": time.perf_counter(), "depth": 0, "events": []}
+
+def end_run() -> List[Event]:
+    rec = getattr(_local, "rec", None)
+    _local.rec = None
+    return [] if rec is None else rec["events"]
+
+def span(name: str, **args):
+    """with span("grog", n=len(v)): … – ohne aktive Aufzeichnung ein No-op."""
+    rec = getattr(_local, "rec", None)
+    if rec is None: return _NOOP
+    return _Span(rec, name, args or None)
+
+def traced(name: Optional[str] = None):
+    """Dekorator: ganze Funktion als Span."""
+    def deco(fn):
+        label = name or fn.__name__
+        @wraps(fn)
+        def wrapper(*a, **kw):
+            if getattr(_local, "rec", None) is None: return fn(*a, **kw)
+            with span(label):
+                return fn(*a, **kw)
+        return wrapper
+    return deco
+
+# ------------------ Auswertung ------------------
+def summary(events: List[Event]) -> List[Dict]:
+    """Je Span-Name: Anzahl, Summe/Max in ms; sortiert nach Summe (absteigend)."""
+    agg: Dict[str, Dict] = {}
+    for e in events:
+        a = agg.setdefault(e.name, {"span": e.name, "n": 0, "total_ms": 0.0, "max_ms": 0.0, "depth": e.depth})
+        a["n"] += 1
+        a["total_ms"] += e.dur_us / 1000.0
+        a["max_ms"] = max(a["max_ms"], e.dur_us / 1000.0)
+        a["depth"] = min(a["depth"], e.depth)
+    out = sorted(agg.values(), key=lambda a: -a["total_ms"])
+    for a in out:
+        a["total_ms"] = round(a["total_ms"], 2); a["max_ms"] = round(a["max_ms"], 2)
+    return out
+
+def chrome_trace(events: List[Event], label: str = "Paletten Fuchs") -> Dict:
+    pid = os.getpid()
+    tid = threading.get_ident() & 0x7FFFFFFF
+    trace = [{"name": "process_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": label}}]
+    for e in sorted(events, key=lambda e: (e.start_us, e.depth)):
+        ev = {"name": e.name, "ph": "X", "ts": round(e.start_us, 1), "dur": round(e.dur_us, 1),
+              "pid": pid, "tid": tid, "cat": "pf"}
+        if e.args: ev["args"] = {k: (v if isinstance(v, (int, float, str, bool)) else repr(v)) for k, v in e.args.items()}
+        trace.append(ev)
+    return {"traceEvents": trace, "displayTimeUnit": "ms"}
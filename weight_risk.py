@@ -0,0 +1,117 @@
+# weight_risk.py — Achslast unter Gewichtsunsicherheit (Monte Carlo, NumPy-vektorisiert)
+# - Angegebene kg/Palette stimmen in der Praxis oft nur auf ±20 %: jede Palette bekommt ihr eigenes Zufallsgewicht
+# - Je Layout: x-Mittelpunkte aller Paletten (einmal je Layout-Code), dann S×N-Gewichtsmatrix → Front/Rear je Stichprobe
+# - Ergebnis: Mittel/Quantile Front/Rear, Wahrscheinlichkeit einer Überschreitung der Achslast-Grenzen
+# - Grog-Option: Score + w_risk · P(Überlast) (gleiche Zufallszahlen für alle Varianten → fairer Vergleich)
+# Gleiches Hebelmodell wie planner.estimate_axle_loads (Stützen an den Enden des 1360-cm-Rahmens).
+
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import startup_profile as sp
+from planner import (
+    TRAILER_LEN_CM, encode_rows, decode_rows, cap_to_trailer, rows_to_rects,
+    score_layout_grog, _weight_split_grog,
+)
+
+MC_SAMPLES     = 20000
+MC_REL_SPREAD  = 0.20        # ±20 % = 2σ (normal) bzw. Intervallgrenze (uniform)
+# Richtwerte Sattelauflast / Achsaggregat – in der UI anpassbar
+AXLE_LIMIT_FRONT_KG = 12000.0
+AXLE_LIMIT_REAR_KG  = 18000.0
+
+class AxleRisk(NamedTuple):
+    samples: int
+    front_mean: float
+    front_p05: float
+    front_p95: float
+    rear_mean: float
+    rear_p05: float
+    rear_p95: float
+    p_front_over: float
+    p_rear_over: float
+    p_over: float            # Front ODER Rear über Grenze
+
+def _np():
+    return sp.lazy_import("numpy")
+
+@lru_cache(maxsize=4096)
+def _pallet_x(code: bytes):
+    """x-Mittelpunkte (cm) je Palette, getrennt nach Euro/Industrie – als NumPy-Arrays."""
+    np = _np()
+    xe, xi = [], []
+    for (x, y, w, h, color, cat, hv) in rows_to_rects(decode_rows(code)):
+        (xe if cat == "EURO" else xi).append(x + w / 2.0)
+    return np.asarray(xe, dtype=np.float64), np.asarray(xi, dtype=np.float64)
+
+def _factors(rng, dist: str, rel_spread: float, shape: Tuple[int, int]):
+    np = _np()
+    if dist == "uniform":
+        f = rng.uniform(1.0 - rel_spread, 1.0 + rel_spread, size=shape)
+    elif dist == "normal":
+        f = rng.normal(1.0, rel_spread / 2.0, size=shape)
+    else:
+        raise ValueError(f"unbekannte Verteilung: {dist!r}")
+    return np.clip(f, 0.0, None, out=f)
+
+def sample_axle_loads(rows: List[Dict], kg_euro: int, kg_ind: int,
+                      samples: int = MC_SAMPLES, rel_spread: float = MC_REL_SPREAD,
+                      dist: str = "normal", seed: Optional[int] = 0):
+    """(front, rear, total) als Arrays der Länge `samples`; None ohne Gewicht."""
+    if kg_euro <= 0 and kg_ind <= 0: return None
+    np = _np()
+    xe, xi = _pallet_x(encode_rows(cap_to_trailer(rows)))
+    we = float(max(0, kg_euro)); wi = float(max(0, kg_ind))
+    rng = np.random.default_rng(seed)
+    L = float(TRAILER_LEN_CM)
+    W = np.zeros(samples); M = np.zeros(samples)
+    # Euro- und Industrie-Block je eine Matrix; Momente per Matrix-Vektor-Produkt
+    for kg, xs in ((we, xe), (wi, xi)):
+        if kg <= 0 or xs.size == 0: continue
+        wts = _factors(rng, dist, rel_spread, (samples, xs.size)) * kg
+        W += wts.sum(axis=1)
+        M += wts @ xs
+    rear = M / L
+    front = W - rear
+    return np.maximum(front, 0.0), np.maximum(rear, 0.0), W
+
+def axle_risk(rows: List[Dict], kg_euro: int, kg_ind: int,
+              limit_front_kg: float = AXLE_LIMIT_FRONT_KG, limit_rear_kg: float = AXLE_LIMIT_REAR_KG,
+              samples: int = MC_SAMPLES, rel_spread: float = MC_REL_SPREAD,
+              dist: str = "normal", seed: Optional[int] = 0) -> Optional[AxleRisk]:
+    res = sample_axle_loads(rows, kg_euro, kg_ind, samples, rel_spread, dist, seed)
+    if res is None: return None
+    np = _np()
+    front, rear, _W = res
+    f05, f95 = np.quantile(front, (0.05, 0.95))
+    r05, r95 = np.quantile(rear, (0.05, 0.95))
+    f_over = front > limit_front_kg
+    r_over = rear > limit_rear_kg
+    return AxleRisk(
+        samples=int(samples),
+        front_mean=float(front.mean()), front_p05=float(f05), front_p95=float(f95),
+        rear_mean=float(rear.mean()), rear_p05=float(r05), rear_p95=float(r95),
+        p_front_over=float(f_over.mean()), p_rear_over=float(r_over.mean()),
+        p_over=float((f_over | r_over).mean()),
+    )
+
+def caption_risk(r: AxleRisk) -> str:
+    return (f"Front {r.front_p05:.0f}–{r.front_p95:.0f} kg, Rear {r.rear_p05:.0f}–{r.rear_p95:.0f} kg (5–95 %) · "
+            f"P(Überlast) **{r.p_over*100:.1f} %** (Front {r.p_front_over*100:.1f} %, Rear {r.p_rear_over*100:.1f} %)")
+
+def grog_pick_robust(variants: List[Tuple[str, List[Dict]]],
+                     kg_euro: int,
+                     kg_ind: int,
+                     target_rear_share: float,
+                     topk: int = 4,
+                     w_risk: float = 1000.0,
+                     **risk_kw) -> List[Tuple[str, List[Dict], float, float, Optional[AxleRisk]]]:
+    """Wie grog_pick_best, Score zusätzlich + w_risk · P(Überlast). Alle Varianten mit demselben Seed."""
+    scored = []
+    for title, rows in variants:
+        sc = score_layout_grog(rows, kg_euro=kg_euro, kg_ind=kg_ind, target_rear_share=target_rear_share)
+        risk = axle_risk(rows, kg_euro, kg_ind, **risk_kw)
+        if risk is not None: sc += w_risk * risk.p_over
+        scored.append((title, rows, sc, _weight_split_grog(rows, kg_euro, kg_ind), risk))
+    scored.sort(key=lambda t: t[2])
+    return scored[:topk]